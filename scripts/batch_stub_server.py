@@ -0,0 +1,199 @@
+"""
+Serve a local stand-in for the OpenAI Files and Batches APIs.
+
+Batches uploaded by `--batch` runs are answered by sending each request to an
+OpenAI-compatible upstream (e.g. Ollama's http://localhost:11434/v1), or with
+a canned response when no upstream is given. A batch completes --delay
+seconds after its submission, so the polling of the client is exercised too.
+
+Usage: python scripts/batch_stub_server.py [--port 8099] [--delay 5]
+           [--upstream http://localhost:11434/v1] [--model phi4]
+Then run with OPENAI_BASE_URL=http://localhost:8099/v1 OPENAI_API_KEY=stub
+and LLM_BATCH_POLL_INTERVAL=1.
+"""
+
+import argparse
+import itertools
+import json
+import threading
+import time
+import urllib.request
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CANNED_RESPONSE = "```java\n@Test\npublic void test() {\n}\n```"
+
+
+class BatchStore:
+    def __init__(self, delay: float, upstream: str, model: str):
+        self.delay = delay
+        self.upstream = upstream.rstrip("/") if upstream else ""
+        self.model = model
+        self.files = {}
+        self.batches = {}
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+
+    def add_file(self, content: bytes) -> dict:
+        with self.lock:
+            file_id = f"file-{next(self.ids)}"
+            self.files[file_id] = content
+        return self._file_object(file_id, content)
+
+    def create_batch(self, request: dict) -> dict:
+        with self.lock:
+            batch_id = f"batch_{next(self.ids)}"
+            batch = {
+                "id": batch_id,
+                "object": "batch",
+                "endpoint": request["endpoint"],
+                "input_file_id": request["input_file_id"],
+                "completion_window": request.get("completion_window", "24h"),
+                "status": "in_progress",
+                "created_at": int(time.time()),
+                "output_file_id": None,
+                "error_file_id": None,
+            }
+            self.batches[batch_id] = batch
+        threading.Thread(target=self._run, args=(batch,), daemon=True).start()
+        return batch
+
+    def _run(self, batch: dict) -> None:
+        started = time.monotonic()
+        lines = []
+        for line in self.files[batch["input_file_id"]].decode().splitlines():
+            if line.strip():
+                request = json.loads(line)
+                lines.append(json.dumps(self._answer(request)))
+        time.sleep(max(0.0, self.delay - (time.monotonic() - started)))
+        output = self.add_file("\n".join(lines).encode())
+        with self.lock:
+            batch["output_file_id"] = output["id"]
+            batch["status"] = "completed"
+            batch["completed_at"] = int(time.time())
+        print(f"[INFO] {batch['id']}: {len(lines)} requests answered")
+
+    def _answer(self, request: dict) -> dict:
+        body = request["body"]
+        prompt = body.get("input") or body["messages"][-1]["content"]
+        text = self._complete(prompt) if self.upstream else CANNED_RESPONSE
+        if request["url"] == "/v1/responses":
+            output = [
+                {
+                    "type": "message",
+                    "role": "assistant",
+                    "content": [{"type": "output_text", "text": text}],
+                }
+            ]
+            response_body = {"object": "response", "output": output}
+        else:
+            message = {"role": "assistant", "content": text, "refusal": None}
+            response_body = {
+                "object": "chat.completion",
+                "choices": [{"index": 0, "message": message}],
+            }
+        return {
+            "id": f"req_{request['custom_id']}",
+            "custom_id": request["custom_id"],
+            "response": {"status_code": 200, "body": response_body},
+            "error": None,
+        }
+
+    def _complete(self, prompt: str) -> str:
+        payload = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+        }
+        request = urllib.request.Request(
+            f"{self.upstream}/chat/completions",
+            data=json.dumps(payload).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request) as response:
+            completion = json.load(response)
+        return completion["choices"][0]["message"]["content"]
+
+    @staticmethod
+    def _file_object(file_id: str, content: bytes) -> dict:
+        return {
+            "id": file_id,
+            "object": "file",
+            "bytes": len(content),
+            "created_at": int(time.time()),
+            "filename": f"{file_id}.jsonl",
+            "purpose": "batch",
+        }
+
+
+def make_handler(store: BatchStore):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if self.path == "/v1/files":
+                self._reply(store.add_file(self._uploaded_file(body)))
+            elif self.path == "/v1/batches":
+                self._reply(store.create_batch(json.loads(body)))
+            else:
+                self._reply({"error": {"message": "not found"}}, 404)
+
+        def do_GET(self):
+            parts = self.path.strip("/").split("/")
+            if parts[:2] == ["v1", "batches"] and len(parts) == 3:
+                batch = store.batches.get(parts[2])
+                self._reply(batch or {"error": {"message": "no such batch"}})
+            elif parts[:2] == ["v1", "files"] and parts[3:] == ["content"]:
+                content = store.files.get(parts[2])
+                if content is None:
+                    self._reply({"error": {"message": "no such file"}}, 404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/jsonl")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+            else:
+                self._reply({"error": {"message": "not found"}}, 404)
+
+        def _uploaded_file(self, body: bytes) -> bytes:
+            header = f"Content-Type: {self.headers['Content-Type']}\r\n\r\n"
+            message = BytesParser(policy=HTTP).parsebytes(header.encode() + body)
+            for part in message.iter_parts():
+                if part.get_param("name", header="content-disposition") == "file":
+                    return part.get_payload(decode=True)
+            return b""
+
+        def _reply(self, payload: dict, status: int = 200) -> None:
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument(
+        "--delay", type=float, default=5, help="Seconds a batch stays in progress."
+    )
+    parser.add_argument(
+        "--upstream", default="", help="OpenAI-compatible URL answering requests."
+    )
+    parser.add_argument("--model", default="phi4", help="Model of the upstream.")
+    args = parser.parse_args()
+
+    store = BatchStore(args.delay, args.upstream, args.model)
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(store))
+    print(f"[INFO] batch stand-in listening on http://127.0.0.1:{args.port}/v1")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Compare the streaming invs.csv filter with the previous pandas implementation.
+
+A synthetic InvariantChecker CSV of the requested size is generated, then each
+implementation filters it in a fresh interpreter so that the reported peak RSS
+only covers that implementation.
+
+Usage: python scripts/benchmark_invariant_filter.py [--size-mb 300] [--keep]
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+CLASS_FQ_NAME = "org.example.DataStructure"
+METHOD_NAME = "push"
+
+
+def generate_csv(path: str, size_mb: int) -> int:
+    """Write an invs.csv-like file of about size_mb megabytes."""
+    rng = random.Random(42)
+    methods = [METHOD_NAME, "pop", "peek", "size", "DataStructure", "isEmpty"]
+    ppts = []
+    for method in methods:
+        for suffix in ("ENTER", "EXIT12", "EXIT27"):
+            ppts.append(f"{CLASS_FQ_NAME}.{method}(int):::{suffix}")
+    ppts += [f"org.example.Helper{i}.run():::EXIT" for i in range(200)]
+
+    target = size_mb * 1024 * 1024
+    rows = 0
+    with open(path, "w") as file:
+        file.write("ppt,invariant,type,samples\n")
+        written = 0
+        while written < target:
+            lines = []
+            for _ in range(10000):
+                ppt = rng.choice(ppts)
+                invariant = (
+                    f"this.elements[{rng.randint(0, 99)}] <= "
+                    f"this.size + {rng.randint(0, 9999)}"
+                )
+                lines.append(f'{ppt},"{invariant}",falsified,{rng.randint(1, 500)}\n')
+            chunk = "".join(lines)
+            file.write(chunk)
+            written += len(chunk)
+            rows += len(lines)
+    return rows
+
+
+def run_pandas(specs_file: str, output_directory: str) -> None:
+    import pandas as pd
+
+    class_name = CLASS_FQ_NAME.split(".")[-1]
+
+    def is_of_interest(ppt):
+        if "ENTER" in ppt:
+            return False
+        obj_spec = f"{CLASS_FQ_NAME}.{class_name}("
+        return (METHOD_NAME in ppt) or (obj_spec in ppt)
+
+    input_specifications = pd.read_csv(specs_file)
+    interest_ppts = list(filter(is_of_interest, input_specifications["ppt"].unique()))
+    interest_filtered_specs = input_specifications[
+        input_specifications["ppt"].isin(interest_ppts)
+    ]
+    interest_filtered_specs.to_csv(
+        f"{output_directory}/interest-specs.csv", index=False
+    )
+    # The assertions step read the invariants back from interest-specs.csv
+    df = pd.read_csv(f"{output_directory}/interest-specs.csv")
+    set(df["invariant"].str.strip())
+
+
+def run_streaming(specs_file: str, output_directory: str) -> None:
+    sys.path.insert(0, SRC_DIR)
+    from invariant_filter.invariant_filter import InvariantFilter
+
+    InvariantFilter(CLASS_FQ_NAME, METHOD_NAME).filter_invariants_of_interest(
+        specs_file, output_directory
+    )
+
+
+def run_child(implementation: str, specs_file: str, output_directory: str) -> None:
+    os.makedirs(output_directory, exist_ok=True)
+    start = time.perf_counter()
+    if implementation == "pandas":
+        run_pandas(specs_file, output_directory)
+    else:
+        run_streaming(specs_file, output_directory)
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is reported in kilobytes on Linux
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({"seconds": elapsed, "peak_rss_mb": peak_rss_mb}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size-mb", type=int, default=300)
+    parser.add_argument("--keep", action="store_true", help="Keep the files.")
+    parser.add_argument("--child", nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(*args.child)
+        return
+
+    work_dir = tempfile.mkdtemp(prefix="specvalid-bench-")
+    try:
+        specs_file = os.path.join(work_dir, "invs.csv")
+        rows = generate_csv(specs_file, args.size_mb)
+        size_mb = os.path.getsize(specs_file) / (1024 * 1024)
+        print(f"Synthetic invs.csv: {size_mb:.0f} MB, {rows} rows")
+
+        results = {}
+        for implementation in ("pandas", "streaming"):
+            output_directory = os.path.join(work_dir, implementation)
+            completed = subprocess.run(
+                [
+                    sys.executable,
+                    os.path.abspath(__file__),
+                    "--child",
+                    implementation,
+                    specs_file,
+                    output_directory,
+                ],
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            results[implementation] = json.loads(completed.stdout.splitlines()[-1])
+
+        print(f"{'implementation':<16}{'time (s)':>10}{'peak RSS (MB)':>16}")
+        for implementation, result in results.items():
+            print(
+                f"{implementation:<16}{result['seconds']:>10.2f}"
+                f"{result['peak_rss_mb']:>16.0f}"
+            )
+    finally:
+        if args.keep:
+            print(f"Files kept in {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
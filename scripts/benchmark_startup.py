@@ -0,0 +1,81 @@
+"""
+Measure the start-up time of the listing commands of the CLI.
+
+Each command runs several times in a fresh interpreter and the median wall
+time is reported, together with the slowest imports from `python -X importtime`.
+Exits with a non-zero status when a command exceeds the budget.
+
+Usage: python scripts/benchmark_startup.py [--runs 5] [--budget-ms 200]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+COMMANDS = ["--list-prompts", "--list-llms"]
+
+
+def cli_invocation(flag: str) -> list:
+    code = f"import sys; sys.argv = ['specvalid', '{flag}']; import cli; cli.main()"
+    return [sys.executable, "-c", code]
+
+
+def time_command(flag: str, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            cli_invocation(flag),
+            cwd=SRC_DIR,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=True,
+        )
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def slowest_imports(flag: str, top: int) -> list:
+    """Return the (cumulative microseconds, module) pairs of the slowest imports."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime"] + cli_invocation(flag)[1:],
+        cwd=SRC_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    imports = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:") :].split("|")
+        imports.append((int(cumulative), module.strip()))
+    return sorted(imports, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=200)
+    parser.add_argument("--top", type=int, default=8, help="Imports to show.")
+    args = parser.parse_args()
+
+    over_budget = False
+    for flag in COMMANDS:
+        median_ms = time_command(flag, args.runs)
+        status = "ok" if median_ms <= args.budget_ms else "OVER BUDGET"
+        over_budget |= median_ms > args.budget_ms
+        print(f"specvalid {flag}: {median_ms:.0f} ms (median of {args.runs}) {status}")
+        for cumulative_us, module in slowest_imports(flag, args.top):
+            print(f"    {cumulative_us / 1000:8.1f} ms  {module}")
+
+    sys.exit(1 if over_budget else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,63 +1,27 @@
+import csv
 import os
 import sys
-import pandas as pd
 
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC_DIR)
 
-def write_specs_to_file(specs, filename):
-    with open(filename, "w") as file:
-        for spec in sorted(specs, reverse=True):
-            file.write(f"{spec}\n")
-
+from invariant_filter.invariant_filter import InvariantFilter  # noqa: E402
 
 specfuzzer_assertions_file = sys.argv[1]
 invalid_post_conditions_csv = sys.argv[2]
 
-# Read SpecFuzzer assertions file
-with open(specfuzzer_assertions_file, "r") as file:
-    set1 = {line.strip() for line in file}
-
-set1 = {
-    item
-    for item in set1
-    if item
-    and not item.startswith(
-        "==========================================================================="
-    )
-    and ":::OBJECT" not in item
-    and ":::ENTER" not in item
-    and ":::EXIT" not in item
-}
-
 # Read CSV file with post-conditions that Daikon considered invalid
-df = pd.read_csv(invalid_post_conditions_csv)
-set2 = set(df["invariant"].str.strip())
-
-# The specs that were filtered are those that are in both sets
-filtered_specs = set1 & set2
+with open(invalid_post_conditions_csv, newline="") as file:
+    invalid_invariants = {row["invariant"].strip() for row in csv.DictReader(file)}
 
-# Find difference
-difference = set1 - set2
-
-assertions_file_name = os.path.basename(specfuzzer_assertions_file)
-print(f"Specs from {assertions_file_name}: {len(set1)}")
-print(f"Filtered specs: {len(filtered_specs)}")
-for spec in sorted(filtered_specs):
-    print(f"  {spec}")
+result = InvariantFilter.compare_assertions(
+    specfuzzer_assertions_file, invalid_invariants
+)
+print(result.report(), end="")
 
 # Write remaining specifications to output file
 if len(sys.argv) > 3:
     class_name = sys.argv[3]
     method_name = sys.argv[4]
     output_directory = sys.argv[5]
-
-    os.makedirs(output_directory, exist_ok=True)
-
-    output_file = (
-        f"{output_directory}/{class_name}-{method_name}-specfuzzer-refined.assertions"
-    )
-
-    write_specs_to_file(difference, output_file)
-    write_specs_to_file(
-        filtered_specs,
-        f"{output_directory}/{class_name}-{method_name}-specvalid-filtered.assertions",
-    )
+    InvariantFilter.write_assertions(result, class_name, method_name, output_directory)
@@ -52,6 +52,38 @@ def _add_shared_subject_args(command_parser: argparse.ArgumentParser) -> None:
         help="Path to the specfuzzer <file>.assertions file. ",
         required=False,
     )
+    command_parser.add_argument(
+        "--stream",
+        dest="stream",
+        action="store_true",
+        help="Stream the LLM responses and stop each one as soon as it holds a "
+        "complete test (or verdict), skipping the rest of the generation.",
+        required=False,
+    )
+    command_parser.add_argument(
+        "--batch",
+        dest="batch",
+        action="store_true",
+        help="Submit every prompt up front through the OpenAI and Gemini batch "
+        "APIs and wait for the results; other models are queried as usual.",
+        required=False,
+    )
+    command_parser.add_argument(
+        "--hedge",
+        dest="hedge",
+        action="store_true",
+        help="Send a duplicate of the remote LLM requests that take longer than "
+        "the provider's p95 latency and keep the first response "
+        "(capped by LLM_HEDGE_MAX and LLM_HEDGE_RATIO).",
+        required=False,
+    )
+    command_parser.add_argument(
+        "--no-llm-cache",
+        dest="no_llm_cache",
+        action="store_true",
+        help="Always query the LLMs instead of reusing cached responses.",
+        required=False,
+    )
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -96,6 +128,43 @@ def build_parser() -> argparse.ArgumentParser:
         help="Reuse existing raw tests if available instead of generating new ones.",
         required=False,
     )
+    testgen.add_argument(
+        "--no-pipeline",
+        dest="no_pipeline",
+        action="store_true",
+        help="Generate all tests before fixing and compiling them, "
+        "instead of streaming them through the stages.",
+        required=False,
+    )
+    testgen.add_argument(
+        "--javac",
+        dest="javac",
+        action="store_true",
+        help="Compile generated tests with a persistent javac server instead of Gradle.",
+        required=False,
+    )
+    testgen.add_argument(
+        "--no-compile-cache",
+        dest="no_compile_cache",
+        action="store_true",
+        help="Recompile every test instead of reusing cached compile results.",
+        required=False,
+    )
+    testgen.add_argument(
+        "--recompute-dyncomp",
+        dest="recompute_dyncomp",
+        action="store_true",
+        help="Run DynComp again instead of reusing the cached comparability file.",
+        required=False,
+    )
+    testgen.add_argument(
+        "--single-trace",
+        dest="single_trace",
+        action="store_true",
+        help="Trace the tests of all models in one Daikon run and split the "
+        "trace per model before checking the invariants.",
+        required=False,
+    )
     _add_shared_subject_args(testgen)
 
     # mutgen command (placeholder)
@@ -1,5 +1,4 @@
 from argsparser.parser import build_parser
-from core import Core
 from llmservice.llm_service import LLMService
 from prompt.prompt_template import PromptID
 
@@ -78,6 +77,9 @@ def main():
             )
             return
 
+    # Imported here so that --list-llms and --list-prompts start quickly
+    from core import Core
+
     core = Core(args)
     print(f"> Running Specvalid for subject: {core.subject_id}")
     if args.command == "testgen":
@@ -1,11 +1,15 @@
 import json
 import os
 import shutil
-import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
 
-from daikon.daikon import Daikon
+from daikon.daikon import INVARIANT_CHECKER_HEAP_GB, Daikon
+from daikon.dtrace_splitter import DTraceSplitter
 from file_operations.file_ops import FileOperations
 from generators.verification_only import VerificationOnlyGenerator
+from invariant_filter.invariant_filter import InvariantFilter
 from java_test_appender.java_test_appender import JavaTestApender
 from java_test_compiler.java_test_compiler import JavaTestCompiler
 from java_test_driver.java_test_driver import JavaTestDriver
@@ -66,6 +70,61 @@ def select_prompts(prompts_list):
     return prompt_IDs
 
 
+def create_llm_service(args) -> LLMService:
+    return LLMService(
+        use_cache=not getattr(args, "no_llm_cache", False),
+        hedge=getattr(args, "hedge", False),
+    )
+
+
+def create_test_compiler(args) -> JavaTestCompiler:
+    return JavaTestCompiler(
+        args.target_class_src,
+        with_tool=not args.javac,
+        use_cache=not args.no_compile_cache,
+    )
+
+
+# Files and directories left out of the per-model copies of the project
+_WORKSPACE_IGNORE = shutil.ignore_patterns("build", ".gradle", ".git")
+
+# Name prefix of the generated tests in the single-trace mode; the model index
+# follows it, e.g. llmTestM2_0 is the first test of the third model
+SINGLE_TRACE_TEST_PREFIX = "llmTestM"
+
+
+def daikon_workers(models_count: int) -> int:
+    """
+    Number of models whose Daikon runs can proceed at once: bounded by the
+    cores and by the memory available for the InvariantChecker heaps.
+    Overridable with DAIKON_WORKERS.
+    """
+    configured = os.getenv("DAIKON_WORKERS")
+    if configured:
+        return max(1, min(int(configured), models_count))
+
+    workers = os.cpu_count() or 1
+    try:
+        available = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_AVPHYS_PAGES")
+        workers = min(workers, available // (INVARIANT_CHECKER_HEAP_GB * 1024**3))
+    except (ValueError, OSError, AttributeError):
+        pass
+    return max(1, min(workers, models_count))
+
+
+def _run_model_invariant_filter(args, model_id: str, log_path: str) -> None:
+    """Process pool entry point: filter the invariants of a single model."""
+    core = Core(args)
+    logger = Logger(log_path)
+    try:
+        # The parent already ran DynComp: the workers only read its cached file
+        core._process_model_invariant_filter(
+            model_id, core.subject, logger, dyn_comp_cached=True
+        )
+    finally:
+        logger.close()
+
+
 def _create_subject_output_directory(output_base_dir, subject_id):
     subject_output_dir = os.path.join(output_base_dir, subject_id)
     os.makedirs(subject_output_dir, exist_ok=True)
@@ -142,7 +201,16 @@ class Core:
                 generated_test_suite,
                 generated_test_driver,
             )
-            java_test_generator = JavaTestGenerator(subject, logger)
+            test_compiler = create_test_compiler(args)
+            java_test_generator = JavaTestGenerator(
+                subject,
+                logger,
+                create_llm_service(args),
+                test_compiler,
+                stream=getattr(args, "stream", False),
+            )
+
+            model_processor = ModelTestProcessor(logger, java_class_src, test_compiler)
 
             # Service for test generation
             testgen_service = JavaLLMTestGenService(
@@ -155,6 +223,10 @@ class Core:
             )
             prompt_IDs = select_prompts(args.prompts_list)
 
+            # Stats are only available here when the streaming pipeline ran;
+            # otherwise the tests are fixed and compiled below.
+            model_stats = None
+
             # Check if we should reuse existing raw tests
             if args.reuse_tests:
                 existing_tests_loaded = self._load_existing_raw_tests(
@@ -164,13 +236,17 @@ class Core:
                 if not existing_tests_loaded:
                     # Run test generation using LLM's
                     logger.log("No existing raw tests found. Generating new tests...")
-                    testgen_service.run(prompts=prompt_IDs, models=models)
+                    model_stats = self._generate_tests(
+                        args, testgen_service, model_processor, prompt_IDs, models
+                    )
                 else:
                     logger.log("Reusing existing raw tests. Skipping LLM generation.")
             else:
                 # Always run test generation using LLM's
                 logger.log("Generating tests with LLMs...")
-                testgen_service.run(prompts=prompt_IDs, models=models)
+                model_stats = self._generate_tests(
+                    args, testgen_service, model_processor, prompt_IDs, models
+                )
 
             subject.test_suite.write_test_suites_by_model(
                 subject_output_testgen_dir, "raw"
@@ -184,14 +260,21 @@ class Core:
                 f"Processing {len(subject.test_suite.test_list)} tests for {subject_id}."
             )
 
-            model_processor = ModelTestProcessor(logger, java_class_src)
-            model_stats = model_processor.process_tests_by_model(
-                subject.test_suite, subject_output_testgen_dir
-            )
+            if model_stats is None:
+                model_stats = model_processor.process_tests_by_model(
+                    subject.test_suite, subject_output_testgen_dir
+                )
+            else:
+                model_processor.write_model_stats(
+                    model_stats, subject_output_testgen_dir
+                )
 
             model_processor.generate_model_comparison_report(
                 model_stats, subject_output_testgen_dir
             )
+            self._report_llm_retries(
+                java_test_generator.llm_service, subject_output_testgen_dir, logger
+            )
 
             for model_id, stats in model_stats.items():
                 raw_count = stats["raw"]["count"]
@@ -221,6 +304,52 @@ class Core:
             print(f"❌ Error: {e}")
             exit(1)
 
+    def _generate_tests(
+        self, args, testgen_service, model_processor, prompt_IDs, models
+    ):
+        """
+        Generate tests with the LLMs. Returns the per-model stats when the
+        streaming pipeline also fixed and compiled them, None otherwise.
+        """
+        if getattr(args, "batch", False):
+            testgen_service.prefetch_batch(prompt_IDs, models)
+        if args.no_pipeline:
+            testgen_service.run(prompts=prompt_IDs, models=models)
+            return None
+        return testgen_service.run_pipeline(
+            prompts=prompt_IDs, models=models, model_processor=model_processor
+        )
+
+    def _report_llm_retries(self, llm_service, output_dir, logger):
+        """
+        Log and save the retries of the LLM requests. Failed responses are not
+        cached, so rerunning the subject only repeats the failed requests.
+        """
+        retry_stats = llm_service.retry_stats.snapshot()
+        if not retry_stats:
+            return
+        for model_id, stats in retry_stats.items():
+            logger.log(
+                f"Model {model_id}: {stats['requests']} LLM requests, "
+                f"{stats['retries']} retries, {stats['recovered']} recovered, "
+                f"{stats['failed']} failed, {stats['skipped']} skipped"
+            )
+        analysis_dir = os.path.join(output_dir, "analysis")
+        os.makedirs(analysis_dir, exist_ok=True)
+        with open(os.path.join(analysis_dir, "llm_retries.json"), "w") as f:
+            json.dump(retry_stats, f, indent=2)
+        if llm_service.hedge:
+            hedger = llm_service.hedger
+            logger.log(
+                f"Hedged {hedger.hedges} of {hedger.requests} remote LLM requests, "
+                f"{hedger.hedges_won} answered first by the duplicate"
+            )
+        if llm_service.single_flight.shared:
+            logger.log(
+                f"{llm_service.single_flight.shared} LLM requests shared the "
+                f"response of an identical request in flight"
+            )
+
     def run_invariant_filter(self):
         subject = self.subject
         logger = Logger(self.logs_output_dir + "/invfilter.log")
@@ -241,12 +370,224 @@ class Core:
             f"{available_models}"
         )
 
-        for model in available_models:
-            print(f"> Running invariant filtering for tests from model: {model}")
+        if not available_models:
+            return
+
+        if getattr(self.args, "single_trace", False):
+            self._run_single_trace_invariant_filter(available_models, subject, logger)
+            return
+
+        # Comparability does not depend on the tests, so DynComp runs once
+        # here and every model's Chicory reuses its file from the cache
+        self._prime_dyn_comp(available_models, subject, logger)
+
+        # Every model runs in its own copy of the project, so the models are
+        # independent and their Daikon runs can proceed in parallel. Each one
+        # writes its own log, appended to invfilter.log in model order.
+        workers = daikon_workers(len(available_models))
+        logger.log(f"Running invariant filtering with {workers} workers")
+        model_logs = {
+            model: os.path.join(models_dir, model, "invfilter.log")
+            for model in available_models
+        }
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {}
+            for model in available_models:
+                print(f"> Running invariant filtering for tests from model: {model}")
+                futures[model] = executor.submit(
+                    _run_model_invariant_filter, self.args, model, model_logs[model]
+                )
+            for model in available_models:
+                logger.log(f"Running invariant filtering for tests from model: {model}")
+                try:
+                    futures[model].result()
+                except Exception as e:
+                    logger.log_error(f"❌ Error during invariant filtering: {e}")
+                    print(f"❌ Error during invariant filtering: {e}")
+                if os.path.exists(model_logs[model]):
+                    logger.append_file(model_logs[model])
+
+    def _prime_dyn_comp(self, models, subject, logger) -> None:
+        """
+        Run DynComp on the tests of the first model that has any, storing the
+        comparability file in the DynComp cache for the per-model workers.
+        """
+        models_dir = f"{self.output_dir}/test/by_model"
+        for model in models:
+            tests = JavaTestSuite.extract_tests_from_file(
+                f"{models_dir}/{model}/compiled_tests.java"
+            )
+            if tests:
+                break
+        else:
+            return
+
+        driver_name, driver_fq_name = self._augmented_driver_names(subject)
+        workspace = None
+        try:
+            workspace = self._create_model_workspace(subject)
+            self._prepare_augmented_project(
+                subject,
+                workspace,
+                subject.test_suite._rename_test_methods(tests, "llmTest"),
+                logger,
+            )
+            daikon = Daikon(
+                subject,
+                driver_name,
+                driver_fq_name,
+                str(workspace.parent),
+                project_root=str(workspace),
+                recompute_dyn_comp=getattr(self.args, "recompute_dyncomp", False),
+            )
+            logger.log(f"Run Dynamic Comparability Analysis from driver: {driver_name}")
+            if daikon.run_dyn_comp():
+                logger.log("Reused cached DynComp comparability file.")
+        except Exception as e:
+            logger.log_error(f"Error during DynComp: {e}")
+        finally:
+            if workspace is not None:
+                shutil.rmtree(workspace.parent, ignore_errors=True)
+
+    def _create_model_workspace(self, subject) -> Path:
+        """Copy the subject project, without build outputs, to a new directory."""
+        workspace = Path(tempfile.mkdtemp(prefix="specvalid-daikon-")) / "project"
+        shutil.copytree(subject.root_dir, workspace, ignore=_WORKSPACE_IGNORE)
+        return workspace
+
+    @staticmethod
+    def _path_in_workspace(path: str, subject, workspace: Path) -> str:
+        relative = Path(path).resolve().relative_to(Path(subject.root_dir).resolve())
+        return str(workspace / relative)
+
+    def _run_single_trace_invariant_filter(self, models, subject, logger):
+        """
+        Trace the tests of every model in a single augmented driver, then split
+        the trace per model and check the invariants of each slice.
+        """
+        models_dir = f"{self.output_dir}/test/by_model"
+        tagged_tests = []
+        traced_models = {}
+        for m_idx, model in enumerate(models):
+            final_tests = JavaTestSuite.extract_tests_from_file(
+                f"{models_dir}/{model}/compiled_tests.java"
+            )
+            if final_tests:
+                # The model index in the test names attributes the samples
+                traced_models[model] = str(m_idx)
+                tagged_tests += subject.test_suite._rename_test_methods(
+                    final_tests, f"{SINGLE_TRACE_TEST_PREFIX}{m_idx}_"
+                )
+
+        model_logs = {
+            model: os.path.join(models_dir, model, "invfilter.log")
+            for model in traced_models
+        }
+        workspace = None
+        try:
+            if traced_models:
+                logger.log(
+                    f"Tracing {len(tagged_tests)} tests from {len(traced_models)} "
+                    "models in a single Daikon run"
+                )
+                workspace = self._create_model_workspace(subject)
+                self._trace_and_check_slices(
+                    subject, workspace, tagged_tests, traced_models, model_logs, logger
+                )
+        except Exception as e:
+            logger.log_error(f"❌ Error during invariant filtering: {e}")
+            print(f"❌ Error during invariant filtering: {e}")
+        finally:
+            if workspace is not None:
+                shutil.rmtree(workspace.parent, ignore_errors=True)
+
+        for model in models:
             logger.log(f"Running invariant filtering for tests from model: {model}")
-            self._process_model_invariant_filter(model, subject, logger)
+            if model not in traced_models:
+                self._log_model_without_tests(logger)
+            elif os.path.exists(model_logs[model]):
+                logger.append_file(model_logs[model])
+
+    def _trace_and_check_slices(
+        self, subject, workspace, tagged_tests, traced_models, model_logs, logger
+    ):
+        driver_name, driver_fq_name = self._augmented_driver_names(subject)
+        self._prepare_augmented_project(subject, workspace, tagged_tests, logger)
+
+        daikon = Daikon(
+            subject,
+            driver_name,
+            driver_fq_name,
+            _init_subdirectory(f"{self.output_dir}/test", "daikon"),
+            project_root=str(workspace),
+            recompute_dyn_comp=getattr(self.args, "recompute_dyncomp", False),
+        )
+        self._run_daikon_front_ends(daikon, driver_name, logger)
+
+        # One slice per model: the base suite samples plus its own tests
+        models_dir = f"{self.output_dir}/test/by_model"
+        model_daikon_dirs = {
+            model: _init_subdirectory(f"{models_dir}/{model}", "daikon")
+            for model in traced_models
+        }
+        suite_fq_name = (
+            subject.test_driver.get_package_name()
+            + "."
+            + os.path.basename(self.args.test_suite).replace(".java", "")
+            + "Augmented"
+        )
+        splitter = DTraceSplitter(suite_fq_name, SINGLE_TRACE_TEST_PREFIX)
+        samples = splitter.split(
+            f"{daikon.output_dir}/{driver_name}.dtrace.gz",
+            {
+                tag: f"{model_daikon_dirs[model]}/{driver_name}.dtrace.gz"
+                for model, tag in traced_models.items()
+            },
+        )
+        logger.log(f"Split the trace into {len(traced_models)} model slices")
 
-    def _process_model_invariant_filter(self, model_id, subject, logger):
+        def check_slice(model: str) -> None:
+            model_logger = Logger(model_logs[model])
+            try:
+                model_logger.log(
+                    f"Trace slice with {samples[traced_models[model]]} samples "
+                    "from the model tests"
+                )
+                slice_daikon = Daikon(
+                    subject,
+                    driver_name,
+                    driver_fq_name,
+                    model_daikon_dirs[model],
+                    project_root=str(workspace),
+                )
+                slice_daikon.objs_file = daikon.objs_file
+                model_logger.log(
+                    f"Run Daikon Invariant Checker from driver: {driver_name}"
+                )
+                invalid_invs = slice_daikon.run_invariant_checker(
+                    self.args.specfuzzer_invs_file
+                )
+                self._filter_model_specs(
+                    invalid_invs,
+                    _init_subdirectory(f"{models_dir}/{model}", "specs"),
+                    model_logger,
+                )
+            except Exception as e:
+                model_logger.log_error(f"❌ Error during invariant filtering: {e}")
+                print(f"❌ Error during invariant filtering: {e}")
+            finally:
+                model_logger.close()
+
+        # InvariantChecker runs in its own JVM, so threads are enough here
+        with ThreadPoolExecutor(
+            max_workers=daikon_workers(len(traced_models))
+        ) as executor:
+            list(executor.map(check_slice, traced_models))
+
+    def _process_model_invariant_filter(
+        self, model_id, subject, logger, dyn_comp_cached: bool = False
+    ):
+        workspace = None
         try:
             model_output_dir = f"{self.output_dir}/test/by_model/{model_id}"
 
@@ -255,43 +596,7 @@ class Core:
             )
 
             if not final_tests:
-                try:
-                    with open(self.args.specfuzzer_assertions_file, "r") as file:
-                        set1 = {line.strip() for line in file}
-                except FileNotFoundError:
-                    msg = (
-                        f"❌ Assertions file not found: "
-                        f"{self.args.specfuzzer_assertions_file}"
-                    )
-                    logger.log_error(msg)
-                    print(msg)
-                    return
-                except PermissionError:
-                    msg = (
-                        f"❌ Permission denied when accessing assertions file: "
-                        f"{self.args.specfuzzer_assertions_file}"
-                    )
-                    logger.log_error(msg)
-                    print(msg)
-                    return
-                set1 = {
-                    item
-                    for item in set1
-                    if item
-                    and not item.startswith(
-                        "==========================================================================="
-                    )
-                    and ":::OBJECT" not in item
-                    and ":::ENTER" not in item
-                    and ":::EXIT" not in item
-                }
-                assertions_file_name = os.path.basename(
-                    self.args.specfuzzer_assertions_file
-                )
-                logger.log(f"Specs from {assertions_file_name}: {len(set1)}")
-                logger.log(
-                    "No tests found in all_compiled_tests.java - skipping Daikon"
-                )
+                self._log_model_without_tests(logger)
                 return
 
             logger.log(f"Found {len(final_tests)} tests to validate against")
@@ -305,105 +610,139 @@ class Core:
             model_specs_dir = _init_subdirectory(model_output_dir, "specs")
 
             # Prepare the augmented test driver name for Daikon
-            augmented_test_driver_name = (
-                os.path.basename(self.args.test_driver).replace(".java", "")
-                + "Augmented"
-            )
-            augmented_test_driver_fq_name = (
-                subject.test_driver.get_package_name()
-                + "."
-                + augmented_test_driver_name
-            )
-
-            # Set up the suite and driver for append the generated tests
-            new_test_suite_path = JavaTestFileUpdater.prepare_test_file(
-                self.args.test_suite, "Augmented", is_driver=False
+            augmented_test_driver_name, augmented_test_driver_fq_name = (
+                self._augmented_driver_names(subject)
             )
-            new_test_driver_path = JavaTestFileUpdater.prepare_test_file(
-                self.args.test_driver, "Augmented", is_driver=True
-            )
-
-            # Clean first to remove any cached build artifacts
-            self.compiler.compile_project(clean=True)
-            logger.log("Project cleaned and compiled successfully.")
-
-            # Append the tests to the suite and driver
-            appender = JavaTestApender()
-            appender.insert_tests_into_suite(new_test_suite_path, renamed_tests)
-            appender.insert_tests_into_driver(new_test_driver_path, renamed_tests)
 
-            # Compile again with the Augmented files
-            self.compiler.compile_project(clean=False)
-            logger.log("Augmented files compiled successfully.")
+            # The Augmented files and the build output live in a private copy
+            # of the project, so concurrent models do not overwrite each other
+            workspace = self._create_model_workspace(subject)
+            self._prepare_augmented_project(subject, workspace, renamed_tests, logger)
 
             daikon = Daikon(
                 subject,
                 augmented_test_driver_name,
                 augmented_test_driver_fq_name,
                 model_daikon_dir,
+                project_root=str(workspace),
+                recompute_dyn_comp=not dyn_comp_cached
+                and getattr(self.args, "recompute_dyncomp", False),
             )
-
-            logger.log(
-                f"Run Dynamic Comparability Analysis from driver: "
-                f"{augmented_test_driver_name}"
-            )
-            try:
-                daikon.run_dyn_comp()
-            except RuntimeError as e:
-                logger.log_error(f"Error during DynComp: {e}")
-
-            logger.log(
-                f"Run Chicory DTrace generation from driver: "
-                f"{augmented_test_driver_name}"
+            self._run_daikon_front_ends(
+                daikon,
+                augmented_test_driver_name,
+                logger,
+                store_dyn_comp=not dyn_comp_cached,
             )
-            try:
-                daikon.run_chicory_dtrace_generation()
-            except RuntimeError as e:
-                logger.log_error(f"Error during Chicory DTrace generation: {e}")
 
             logger.log(
                 f"Run Daikon Invariant Checker from driver: {augmented_test_driver_name}"
             )
             invalid_invs = daikon.run_invariant_checker(self.args.specfuzzer_invs_file)
-
-            # Build fully-qualified class name relative to src/main/java
-            full_qualified_class_name = self.args.target_class_src.replace("\\", "/")
-            if "/src/main/java/" in full_qualified_class_name:
-                full_qualified_class_name = full_qualified_class_name.split(
-                    "/src/main/java/"
-                )[1]
-            full_qualified_class_name = full_qualified_class_name.rstrip(".java")
-            if full_qualified_class_name.endswith(".java"):
-                full_qualified_class_name = full_qualified_class_name[:-5]
-
-            full_qualified_class_name = full_qualified_class_name.replace("/", ".")
-
-            cmd = [
-                "python3",
-                "scripts/filter_invariants_of_interest.py",
-                invalid_invs,
-                full_qualified_class_name,
-                self.args.method,
-                model_specs_dir,
-            ]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            logger.log(result.stdout)
-
-            cmd = [
-                "python3",
-                "scripts/extract_non_filtered_assertions.py",
-                self.args.specfuzzer_assertions_file,
-                f"{model_specs_dir}/interest-specs.csv",
-                self.class_name,
-                self.args.method,
-                model_specs_dir,
-            ]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            logger.log(result.stdout)
+            self._filter_model_specs(invalid_invs, model_specs_dir, logger)
         except Exception as e:
             logger.log_error(f"❌ Error during invariant filtering: {e}")
             print(f"❌ Error during invariant filtering: {e}")
             return
+        finally:
+            if workspace is not None:
+                shutil.rmtree(workspace.parent, ignore_errors=True)
+
+    def _log_model_without_tests(self, logger):
+        try:
+            specs = InvariantFilter.load_assertions(
+                self.args.specfuzzer_assertions_file
+            )
+        except FileNotFoundError:
+            msg = (
+                f"❌ Assertions file not found: "
+                f"{self.args.specfuzzer_assertions_file}"
+            )
+            logger.log_error(msg)
+            print(msg)
+            return
+        except PermissionError:
+            msg = (
+                f"❌ Permission denied when accessing assertions file: "
+                f"{self.args.specfuzzer_assertions_file}"
+            )
+            logger.log_error(msg)
+            print(msg)
+            return
+        assertions_file_name = os.path.basename(self.args.specfuzzer_assertions_file)
+        logger.log(f"Specs from {assertions_file_name}: {len(specs)}")
+        logger.log("No tests found in all_compiled_tests.java - skipping Daikon")
+
+    def _augmented_driver_names(self, subject):
+        augmented_test_driver_name = (
+            os.path.basename(self.args.test_driver).replace(".java", "") + "Augmented"
+        )
+        augmented_test_driver_fq_name = (
+            subject.test_driver.get_package_name() + "." + augmented_test_driver_name
+        )
+        return augmented_test_driver_name, augmented_test_driver_fq_name
+
+    def _prepare_augmented_project(self, subject, workspace, tests, logger):
+        # Set up the suite and driver for append the generated tests
+        new_test_suite_path = JavaTestFileUpdater.prepare_test_file(
+            self._path_in_workspace(self.args.test_suite, subject, workspace),
+            "Augmented",
+            is_driver=False,
+        )
+        new_test_driver_path = JavaTestFileUpdater.prepare_test_file(
+            self._path_in_workspace(self.args.test_driver, subject, workspace),
+            "Augmented",
+            is_driver=True,
+        )
+
+        # Clean first to remove any cached build artifacts
+        self.compiler.compile_project(clean=True, project_root=workspace)
+        logger.log("Project cleaned and compiled successfully.")
+
+        # Append the tests to the suite and driver
+        appender = JavaTestApender()
+        appender.insert_tests_into_suite(new_test_suite_path, tests)
+        appender.insert_tests_into_driver(new_test_driver_path, tests)
+
+        # Compile again with the Augmented files
+        self.compiler.compile_project(clean=False, project_root=workspace)
+        logger.log("Augmented files compiled successfully.")
+
+    def _run_daikon_front_ends(self, daikon, driver_name, logger, store_dyn_comp=True):
+        logger.log(f"Run Dynamic Comparability Analysis from driver: {driver_name}")
+        try:
+            if daikon.run_dyn_comp(store=store_dyn_comp):
+                logger.log("Reused cached DynComp comparability file.")
+        except RuntimeError as e:
+            logger.log_error(f"Error during DynComp: {e}")
+
+        logger.log(f"Run Chicory DTrace generation from driver: {driver_name}")
+        try:
+            daikon.run_chicory_dtrace_generation()
+        except RuntimeError as e:
+            logger.log_error(f"Error during Chicory DTrace generation: {e}")
+
+    def _filter_model_specs(self, invalid_invs, model_specs_dir, logger):
+        # Build fully-qualified class name relative to src/main/java
+        full_qualified_class_name = self.args.target_class_src.replace("\\", "/")
+        if "/src/main/java/" in full_qualified_class_name:
+            full_qualified_class_name = full_qualified_class_name.split(
+                "/src/main/java/"
+            )[1]
+        full_qualified_class_name = full_qualified_class_name.rstrip(".java")
+        if full_qualified_class_name.endswith(".java"):
+            full_qualified_class_name = full_qualified_class_name[:-5]
+
+        full_qualified_class_name = full_qualified_class_name.replace("/", ".")
+
+        invariant_filter = InvariantFilter(full_qualified_class_name, self.args.method)
+        for message in invariant_filter.run(
+            invalid_invs,
+            self.args.specfuzzer_assertions_file,
+            model_specs_dir,
+            class_name=self.class_name,
+        ):
+            logger.log(message)
 
     def _load_existing_raw_tests(self, output_dir: str, subject, logger) -> bool:
         """
@@ -466,7 +805,12 @@ class Core:
             )
             by_model_dir = _init_subdirectory(verification_output_dir, "by_model")
 
-            generator = VerificationOnlyGenerator(subject, logger)
+            generator = VerificationOnlyGenerator(
+                subject,
+                logger,
+                create_llm_service(self.args),
+                stream=getattr(self.args, "stream", False),
+            )
             verification_service = VerificationOnlyService(subject, generator, logger)
 
             models = select_models(
@@ -479,6 +823,8 @@ class Core:
                 f"{len(prompt_ids)} prompts"
             )
 
+            if getattr(self.args, "batch", False):
+                verification_service.prefetch_batch(prompt_ids, models)
             results_by_model = verification_service.run(prompt_ids, models)
 
             if not results_by_model:
@@ -1,12 +1,19 @@
+import glob
+import hashlib
 import os
-from pathlib import Path
+import shutil
 import subprocess
+import tempfile
+from pathlib import Path
 from typing import Optional
+
+from cache.disk_cache import default_cache_dir
 from file_operations.file_ops import FileOperations
 from subject.subject import Subject
 
 DEFAULT_FRONTEND_TIMEOUT = 3600  # seconds
 DEFAULT_INVARIANT_TIMEOUT = 3600  # seconds
+INVARIANT_CHECKER_HEAP_GB = 8
 
 
 class Daikon:
@@ -19,6 +26,8 @@ class Daikon:
         output_dir: str,
         front_end_timeout: int = DEFAULT_FRONTEND_TIMEOUT,
         invariant_timeout: int = DEFAULT_INVARIANT_TIMEOUT,
+        project_root: Optional[str] = None,
+        recompute_dyn_comp: bool = False,
     ) -> None:
         self.subject = subject
         self.test_driver = driver
@@ -26,25 +35,41 @@ class Daikon:
         self.output_dir = output_dir
         self.front_end_timeout = front_end_timeout
         self.invariant_timeout = invariant_timeout
+        self.recompute_dyn_comp = recompute_dyn_comp
+
+        # The classes may come from a copy of the project instead of the subject
+        root_dir = os.path.abspath(project_root or subject.root_dir)
 
         # Use build/classes for Gradle projects, fallback to build/libs if it exists
-        main_classes = os.path.join(
-            subject.root_dir, "build", "classes", "java", "main"
-        )
-        test_classes = os.path.join(
-            subject.root_dir, "build", "classes", "java", "test"
-        )
-        build_libs = os.path.join(subject.root_dir, "build", "libs", "*")
+        main_classes = os.path.join(root_dir, "build", "classes", "java", "main")
+        test_classes = os.path.join(root_dir, "build", "classes", "java", "test")
+        build_libs = os.path.join(root_dir, "build", "libs", "*")
+        self.main_classes = main_classes
         self.subject_cp = os.pathsep.join([main_classes, test_classes, build_libs])
 
-        # Include both project-specific libs and global libs in classpath
-        project_libs = os.path.join(subject.root_dir, "libs", "*")
-        self.cp_for_daikon = os.pathsep.join([project_libs, "libs/*", self.subject_cp])
+        # Include both project-specific libs and global libs in classpath.
+        # Paths are absolute because InvariantChecker runs inside output_dir.
+        project_libs = os.path.join(root_dir, "libs", "*")
+        global_libs = os.path.join(os.path.abspath("libs"), "*")
+        self.cp_for_daikon = os.pathsep.join(
+            [project_libs, global_libs, self.subject_cp]
+        )
 
         self.objs_file: Optional[str] = None
 
-    def run_dyn_comp(self) -> None:
-        Path(f"{self.output_dir}/{self.test_driver}.decls-DynComp").touch()
+    def run_dyn_comp(self, store: bool = True) -> bool:
+        """
+        Produce the comparability file for the driver. Returns True when it
+        was reused from the DynComp cache instead of running DynComp; a file
+        computed here is added to the cache unless store is False.
+        """
+        cmp_file = f"{self.output_dir}/{self.test_driver}.decls-DynComp"
+        cached_file = self._dyn_comp_cache_file()
+        if not self.recompute_dyn_comp and os.path.isfile(cached_file):
+            shutil.copyfile(cached_file, cmp_file)
+            return True
+
+        Path(cmp_file).touch()
         try:
             cmd = [
                 "java",
@@ -63,6 +88,47 @@ class Daikon:
                 "DynComp did not finish before the timeout "
                 f"({self.front_end_timeout}s)."
             ) from e
+        if store:
+            self._store_dyn_comp(cmp_file, cached_file)
+        return False
+
+    def _dyn_comp_cache_file(self) -> str:
+        """
+        Comparability only depends on the class under test, not on the tests
+        driving it, so the cache key hashes the production bytecode and the
+        jars on the classpath together with the driver being instrumented.
+        """
+        digest = hashlib.sha256(self.test_driver_fq_name.encode("utf-8"))
+        for class_file in sorted(Path(self.main_classes).rglob("*.class")):
+            digest.update(str(class_file.relative_to(self.main_classes)).encode())
+            digest.update(class_file.read_bytes())
+        for entry in self.cp_for_daikon.split(os.pathsep):
+            if not entry.endswith("*"):
+                continue
+            for jar in sorted(glob.glob(os.path.join(entry[:-1], "*.jar"))):
+                stat = os.stat(jar)
+                jar_id = f"{os.path.basename(jar)}:{stat.st_size}:{stat.st_mtime_ns}"
+                digest.update(jar_id.encode())
+        return os.path.join(
+            default_cache_dir(), "dyncomp", f"{digest.hexdigest()}.decls-DynComp"
+        )
+
+    @staticmethod
+    def _store_dyn_comp(cmp_file: str, cached_file: str) -> None:
+        if not os.path.isfile(cmp_file) or os.path.getsize(cmp_file) == 0:
+            return
+        cache_dir = os.path.dirname(cached_file)
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write next to the final file and rename, so concurrent models never
+        # read a partially written comparability file
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            shutil.copyfile(cmp_file, tmp_path)
+            os.replace(tmp_path, cached_file)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
 
     def run_chicory_dtrace_generation(self):
         self.objs_file = f"{self.output_dir}/{self.test_driver}-objects.xml"
@@ -109,24 +175,26 @@ class Daikon:
         try:
             cmd = [
                 "java",
-                "-Xmx8g",
+                f"-Xmx{INVARIANT_CHECKER_HEAP_GB}g",
                 "-cp",
                 self.cp_for_daikon,
                 "daikon.tools.InvariantChecker",
                 "--conf",
                 "--serialiazed-objects",
-                self.objs_file,
-                inv_gz_file,
-                dtrace_file,
+                os.path.abspath(str(self.objs_file)),
+                os.path.abspath(inv_gz_file),
+                os.path.abspath(dtrace_file),
             ]
+            # InvariantChecker writes invs.csv and invs_file.xml to its CWD;
+            # running it in output_dir keeps concurrent runs apart.
             subprocess.run(
                 cmd,
                 check=True,
                 stdout=subprocess.DEVNULL,
                 timeout=self.invariant_timeout,
+                cwd=self.output_dir,
             )
-            FileOperations.move_file("invs.csv", self.output_dir)
-            FileOperations.remove_file("invs_file.xml")
+            FileOperations.remove_file(os.path.join(self.output_dir, "invs_file.xml"))
             return f"{self.output_dir}/invs.csv"
         except subprocess.CalledProcessError as e:
             raise RuntimeError(f"Error running Invariant Checker: {e}")
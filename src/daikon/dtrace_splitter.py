@@ -0,0 +1,100 @@
+import gzip
+import re
+from typing import Dict, Iterator, List, Optional
+
+# Header and comment lines of a Daikon trace; declaration blocks start with
+# "ppt <name>" while samples start with the bare program point name
+_DECLARATION_PREFIXES = (
+    "ppt ",
+    "decl-version",
+    "var-comparability",
+    "input-language",
+    "//",
+)
+
+
+class DTraceSplitter:
+    """
+    Splits one Chicory trace of the augmented driver into one trace per owner
+    of the generated tests.
+
+    The driver calls every test sequentially, so each sample belongs to the
+    test method whose ENTER record precedes it. Tests are named
+    "<prefix><owner>_<n>" and every sample recorded inside one of them goes to
+    that owner's trace only; declarations and the samples of the base suite go
+    to every trace. A test that throws has no EXIT record, so a test also ends
+    at the ENTER of the next test method of the suite class.
+    """
+
+    def __init__(self, suite_class_fq_name: str, test_prefix: str):
+        suite = re.escape(suite_class_fq_name)
+        self.test_enter = re.compile(rf"^{suite}\.(\w+)\(\):::ENTER$")
+        self.test_exit = re.compile(rf"^{suite}\.(\w+)\(\):::EXIT\d*$")
+        self.tagged_test = re.compile(rf"^{re.escape(test_prefix)}(\w+?)_\d+$")
+
+    def split(self, dtrace_file: str, outputs: Dict[str, str]) -> Dict[str, int]:
+        """
+        Write the slice of each owner in outputs ({owner: dtrace path}).
+
+        Returns:
+            Number of samples attributed to each owner's tests.
+        """
+        writers = {owner: gzip.open(path, "wt") for owner, path in outputs.items()}
+        samples = {owner: 0 for owner in outputs}
+        current: Optional[str] = None
+        try:
+            for block in self._read_blocks(dtrace_file):
+                first_line = block[0]
+                if first_line.startswith(_DECLARATION_PREFIXES):
+                    targets = list(writers)
+                else:
+                    current = self._owner_after(first_line, current)
+                    # Boundary records of the test methods are kept too, so
+                    # ENTER/EXIT pairs stay complete in each slice
+                    owner = current or self._exiting_owner(first_line)
+                    if owner is None:
+                        targets = list(writers)
+                    elif owner in writers:
+                        targets = [owner]
+                        samples[owner] += 1
+                    else:
+                        targets = []
+                    if current is not None and self.test_exit.match(first_line):
+                        current = None
+                text = "\n".join(block) + "\n\n"
+                for owner in targets:
+                    writers[owner].write(text)
+        finally:
+            for writer in writers.values():
+                writer.close()
+        return samples
+
+    def _owner_after(self, ppt: str, current: Optional[str]) -> Optional[str]:
+        match = self.test_enter.match(ppt)
+        if match is None:
+            return current
+        return self._owner_of(match.group(1))
+
+    def _exiting_owner(self, ppt: str) -> Optional[str]:
+        match = self.test_exit.match(ppt)
+        return self._owner_of(match.group(1)) if match else None
+
+    def _owner_of(self, method_name: str) -> Optional[str]:
+        match = self.tagged_test.match(method_name)
+        return match.group(1) if match else None
+
+    @staticmethod
+    def _read_blocks(dtrace_file: str) -> Iterator[List[str]]:
+        """Yield the blank-line separated records of a (gzipped) trace."""
+        opener = gzip.open if dtrace_file.endswith(".gz") else open
+        block: List[str] = []
+        with opener(dtrace_file, "rt") as trace:
+            for line in trace:
+                line = line.rstrip("\n")
+                if line:
+                    block.append(line)
+                elif block:
+                    yield block
+                    block = []
+        if block:
+            yield block
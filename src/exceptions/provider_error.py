@@ -0,0 +1,47 @@
+from typing import Optional
+
+
+class ProviderError(Exception):
+    """
+    A failed request to an LLM provider. status is the HTTP status when the
+    provider answered, retry_after the delay, in seconds, the provider asked
+    for, timed_out whether the request was abandoned for taking too long and
+    connection_failed whether the provider could not be reached at all.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        message: str,
+        status: Optional[int] = None,
+        retry_after: Optional[float] = None,
+        timed_out: bool = False,
+        connection_failed: bool = False,
+    ):
+        super().__init__(message)
+        self.provider = provider
+        self.status = status
+        self.retry_after = retry_after
+        self.timed_out = timed_out
+        self.connection_failed = connection_failed
+
+    @property
+    def throttled(self) -> bool:
+        return self.status == 429
+
+    @property
+    def overloaded(self) -> bool:
+        """The provider is rate limiting us, failing under load or not answering."""
+        return self.throttled or self.unavailable
+
+    @property
+    def unavailable(self) -> bool:
+        """The provider timed out, could not be reached or failed (5xx)."""
+        if self.timed_out or self.connection_failed:
+            return True
+        # A missing status is a failure on our side, not the provider's
+        return self.status is not None and self.status >= 500
+
+    def __str__(self) -> str:
+        status = f" (status={self.status})" if self.status is not None else ""
+        return f"{self.provider}: {super().__str__()}{status}"
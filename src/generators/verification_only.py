@@ -5,17 +5,26 @@ from prompt.template_factory import PromptTemplateFactory
 from subject.subject import Subject
 from verification.verdict_parser import (
     InvalidVerificationResponseError,
+    VerdictDetector,
     VerificationVerdict,
     parse_verification_response,
 )
 
 
 class VerificationOnlyGenerator:
-    def __init__(self, subject: Subject, logger: Logger):
+    def __init__(
+        self,
+        subject: Subject,
+        logger: Logger,
+        llm_service: LLMService | None = None,
+        stream: bool = False,
+    ):
         self.prompts = []
         self.logger = logger
         self.subject = subject
-        self.llm_service = LLMService()
+        self.llm_service = llm_service or LLMService()
+        # When streaming, responses are cut once they hold a JSON verdict
+        self.stop_detector = VerdictDetector if stream else None
 
     def generate_verification(
         self,
@@ -58,7 +67,10 @@ class VerificationOnlyGenerator:
                 continue
 
             response = self.llm_service.execute_prompt(
-                mid, prompt.generate_prompt(), prompt.format_instructions
+                mid,
+                prompt.generate_prompt(),
+                prompt.format_instructions,
+                stop_detector=self.stop_detector,
             )
 
             if response is not None:
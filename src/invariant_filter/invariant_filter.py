@@ -1,4 +1,189 @@
+import csv
+import os
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+_ASSERTIONS_SEPARATOR = (
+    "==========================================================================="
+)
+
+
+# Invariants over large collections can exceed csv's default field size
+csv.field_size_limit(sys.maxsize)
+
+# Rows of invs.csv as (ppt, invariant, all fields of the row)
+InvariantRow = Tuple[str, str, List[str]]
+
+
+class InvariantsCsvReader:
+    """
+    Iterates over the rows of an InvariantChecker CSV one at a time, so the
+    memory used does not depend on the size of the trace or of the file.
+    """
+
+    def __init__(self, specs_file: str):
+        self.specs_file = specs_file
+        self.header: List[str] = []
+
+    def __iter__(self) -> Iterator[InvariantRow]:
+        with open(self.specs_file, newline="") as file:
+            reader = csv.reader(file)
+            self.header = next(reader, [])
+            if not self.header:
+                return
+            ppt_col = self.header.index("ppt")
+            inv_col = self.header.index("invariant")
+            for row in reader:
+                if len(row) <= max(ppt_col, inv_col):
+                    continue
+                yield row[ppt_col], row[inv_col], row
+
+
+class FilterResult:
+    """Outcome of checking the SpecFuzzer assertions against Daikon's verdicts."""
+
+    def __init__(self, assertions_file_name: str, specs: Set[str], filtered: Set[str]):
+        self.assertions_file_name = assertions_file_name
+        self.specs = specs
+        self.filtered = filtered
+
+    @property
+    def refined(self) -> Set[str]:
+        """Assertions that no generated test falsified."""
+        return self.specs - self.filtered
+
+    def report(self) -> str:
+        lines = [
+            f"Specs from {self.assertions_file_name}: {len(self.specs)}",
+            f"Filtered specs: {len(self.filtered)}",
+        ]
+        lines += [f"  {spec}" for spec in sorted(self.filtered)]
+        return "\n".join(lines) + "\n"
+
+
 class InvariantFilter:
-    def __init__(self):
-        # The idea is to implement the functionality of the two scripts using this class
-        raise NotImplementedError("Invariant filtering is not implemented yet.")
+    """
+    Keeps the invariants falsified at the program points of the method under
+    test (and the class constructors), and splits the SpecFuzzer assertions
+    into the ones the generated tests refuted and the ones that survived.
+    """
+
+    def __init__(self, full_qualified_class_name: str, method_name: str):
+        self.full_qualifier = full_qualified_class_name
+        self.class_name = full_qualified_class_name.split(".")[-1]
+        self.method_name = method_name
+        self._constructor_ppt = f"{self.full_qualifier}.{self.class_name}("
+        # The same ppt appears on many rows, so each one is matched only once
+        self._ppt_matches: Dict[str, bool] = {}
+
+    def is_of_interest(self, ppt: str) -> bool:
+        matches = self._ppt_matches.get(ppt)
+        if matches is None:
+            matches = "ENTER" not in ppt and (
+                self.method_name in ppt or self._constructor_ppt in ppt
+            )
+            self._ppt_matches[ppt] = matches
+        return matches
+
+    def iter_invariants_of_interest(
+        self, reader: InvariantsCsvReader
+    ) -> Iterator[InvariantRow]:
+        for ppt, invariant, row in reader:
+            if self.is_of_interest(ppt):
+                yield ppt, invariant, row
+
+    def filter_invariants_of_interest(
+        self, specs_file: str, output_directory: str
+    ) -> Set[str]:
+        """
+        Stream the InvariantChecker CSV once, writing each row of interest to
+        interest-specs.csv as soon as it is read.
+
+        Returns:
+            The stripped invariants of the rows of interest.
+        """
+        invariants = set()
+        reader = InvariantsCsvReader(specs_file)
+        with open(self.interest_specs_file(output_directory), "w", newline="") as dst:
+            writer = csv.writer(dst, lineterminator="\n")
+            header_written = False
+            for _, invariant, row in self.iter_invariants_of_interest(reader):
+                if not header_written:
+                    writer.writerow(reader.header)
+                    header_written = True
+                writer.writerow(row)
+                invariants.add(invariant.strip())
+            if not header_written and reader.header:
+                writer.writerow(reader.header)
+        return invariants
+
+    @staticmethod
+    def interest_specs_file(output_directory: str) -> str:
+        return f"{output_directory}/interest-specs.csv"
+
+    @staticmethod
+    def load_assertions(assertions_file: str) -> Set[str]:
+        """Read the postconditions of a SpecFuzzer .assertions file."""
+        with open(assertions_file, "r") as file:
+            specs = {line.strip() for line in file}
+        return {
+            item
+            for item in specs
+            if item
+            and not item.startswith(_ASSERTIONS_SEPARATOR)
+            and ":::OBJECT" not in item
+            and ":::ENTER" not in item
+            and ":::EXIT" not in item
+        }
+
+    @staticmethod
+    def compare_assertions(
+        assertions_file: str, invalid_invariants: Iterable[str]
+    ) -> FilterResult:
+        specs = InvariantFilter.load_assertions(assertions_file)
+        return FilterResult(
+            os.path.basename(assertions_file),
+            specs,
+            specs & set(invalid_invariants),
+        )
+
+    @staticmethod
+    def write_assertions(
+        result: FilterResult, class_name: str, method_name: str, output_directory: str
+    ) -> None:
+        os.makedirs(output_directory, exist_ok=True)
+        prefix = f"{output_directory}/{class_name}-{method_name}"
+        _write_specs(result.refined, f"{prefix}-specfuzzer-refined.assertions")
+        _write_specs(result.filtered, f"{prefix}-specvalid-filtered.assertions")
+
+    def run(
+        self,
+        invs_file: str,
+        assertions_file: str,
+        output_directory: str,
+        class_name: Optional[str] = None,
+    ) -> List[str]:
+        """
+        Filter one model's falsified invariants and write its specs outputs.
+
+        Returns:
+            The report messages, in the format printed by the scripts.
+        """
+        invalid_invariants = self.filter_invariants_of_interest(
+            invs_file, output_directory
+        )
+        saved = (
+            "Filtered specifications saved to "
+            f"{self.interest_specs_file(output_directory)}\n"
+        )
+        result = self.compare_assertions(assertions_file, invalid_invariants)
+        self.write_assertions(
+            result, class_name or self.class_name, self.method_name, output_directory
+        )
+        return [saved, result.report()]
+
+
+def _write_specs(specs: Set[str], filename: str) -> None:
+    with open(filename, "w") as file:
+        for spec in sorted(specs, reverse=True):
+            file.write(f"{spec}\n")
@@ -1,6 +1,41 @@
 import re
 from typing import List, Set, Tuple
 
+from llmservice.streaming import ThinkBlockFilter
+
+_TEST_START_PATTERN = re.compile(r"^\s*@Test")
+
+
+class StreamingTestDetector:
+    """
+    Line-by-line version of the brace balancing of parse_test_from_string,
+    fed with a streamed LLM response. feed returns True as soon as a complete
+    @Test method has been read outside the <think> blocks.
+    """
+
+    def __init__(self) -> None:
+        self.think_filter = ThinkBlockFilter()
+        self.complete = False
+        self._line = ""
+        self._test_started = False
+        self._brace_count = 0
+
+    def feed(self, chunk: str) -> bool:
+        self._line += self.think_filter.feed(chunk)
+        *lines, self._line = self._line.split("\n")
+        for line in lines:
+            if not self.complete:
+                self.complete = self._scan_line(line)
+        return self.complete
+
+    def _scan_line(self, line: str) -> bool:
+        if _TEST_START_PATTERN.match(line):
+            self._test_started = True
+        if not self._test_started:
+            return False
+        self._brace_count += line.count("{") - line.count("}")
+        return self._brace_count == 0 and line.strip().endswith("}")
+
 
 class JavaCodeExtractor:
     def __init__(self) -> None:
@@ -0,0 +1,100 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from cache.disk_cache import DiskCache
+from java_test_compiler.template import TEST_TEMPLATE
+
+COMPILE_CACHE_MAX_MB = int(os.getenv("COMPILE_CACHE_MAX_MB", "256"))
+
+_BUILD_FILES = (
+    "build.gradle",
+    "build.gradle.kts",
+    "settings.gradle",
+    "settings.gradle.kts",
+    "pom.xml",
+)
+
+
+def normalize_test_source(test: str) -> str:
+    """
+    Drop trailing whitespace, which never shows in a diagnostic. Lines and
+    indentation are kept: the cached errors point at them by line and column.
+    """
+    return "\n".join(line.rstrip() for line in test.splitlines())
+
+
+class CompileCache:
+    """
+    Persistent map from (normalized test source, production classpath) to the
+    compile outcome and its diagnostics.
+
+    The classpath fingerprint covers every file under src/main/java, the build
+    files and the project's jars, so editing the subject, even in the middle of
+    a run, invalidates all of its entries without any explicit bookkeeping.
+    """
+
+    def __init__(self, project_root: Path, backend: str):
+        self.project_root = Path(project_root)
+        self.backend = backend
+        self.store = DiskCache(
+            "compile_results", max_bytes=COMPILE_CACHE_MAX_MB * 1024 * 1024
+        )
+        # (size and mtime of the fingerprinted files, fingerprint)
+        self._fingerprint: Optional[Tuple[Tuple, str]] = None
+
+    def lookup(self, test: str) -> Optional[Tuple[bool, str]]:
+        value = self.store.get(self._key(test))
+        if value is None:
+            return None
+        outcome = json.loads(value)
+        return outcome["success"], outcome["errors"]
+
+    def record(self, test: str, success: bool, errors: str = "") -> None:
+        self.store.put(
+            self._key(test), json.dumps({"success": success, "errors": errors})
+        )
+
+    def _key(self, test: str) -> str:
+        return DiskCache.make_key(
+            self.backend,
+            self.classpath_fingerprint(),
+            TEST_TEMPLATE,
+            normalize_test_source(test),
+        )
+
+    def classpath_fingerprint(self) -> str:
+        # Sources are only hashed again when one of them was touched
+        files = self._source_files()
+        stats = tuple(
+            (str(path), stat.st_size, stat.st_mtime_ns)
+            for path, stat in ((path, path.stat()) for path in files)
+        )
+        cached = self._fingerprint
+        if cached is not None and cached[0] == stats:
+            return cached[1]
+        fingerprint = self._compute_fingerprint(files)
+        self._fingerprint = (stats, fingerprint)
+        return fingerprint
+
+    def _source_files(self) -> List[Path]:
+        prod_src = self.project_root / "src" / "main" / "java"
+        files = sorted(prod_src.rglob("*")) if prod_src.exists() else []
+        files += [self.project_root / name for name in _BUILD_FILES]
+        return [path for path in files if path.is_file()]
+
+    def _compute_fingerprint(self, files: List[Path]) -> str:
+        digest = hashlib.sha256()
+        for path in files:
+            digest.update(str(path.relative_to(self.project_root)).encode("utf-8"))
+            digest.update(path.read_bytes())
+
+        # Jars are identified by name, size and modification time
+        libs_dir = self.project_root / "libs"
+        jars = sorted(libs_dir.glob("*.jar")) if libs_dir.exists() else []
+        for jar in jars:
+            stat = jar.stat()
+            digest.update(f"{jar.name}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+        return digest.hexdigest()
@@ -0,0 +1,102 @@
+COMPILE_SERVER_CLASS = "CompileServer"
+
+# Long-running javac front-end used by JavacCompiler. It reads requests of the
+# form "<byte length>\n<source>" from stdin, compiles each source as
+# GeneratedTest.java with the javax.tools API and answers
+# "OK <length>\n" or "ERROR <length>\n" followed by the error diagnostics.
+COMPILE_SERVER_SOURCE = """
+import java.io.BufferedInputStream;
+import java.io.BufferedOutputStream;
+import java.io.ByteArrayOutputStream;
+import java.io.DataInputStream;
+import java.io.IOException;
+import java.io.OutputStream;
+import java.net.URI;
+import java.nio.charset.StandardCharsets;
+import java.util.Arrays;
+import java.util.Collections;
+import java.util.List;
+import java.util.Locale;
+import javax.tools.Diagnostic;
+import javax.tools.DiagnosticCollector;
+import javax.tools.JavaCompiler;
+import javax.tools.JavaFileObject;
+import javax.tools.SimpleJavaFileObject;
+import javax.tools.StandardJavaFileManager;
+import javax.tools.ToolProvider;
+
+public class CompileServer {
+    public static void main(String[] args) throws IOException {
+        JavaCompiler compiler = ToolProvider.getSystemJavaCompiler();
+        if (compiler == null) {
+            System.err.println("No system Java compiler available (a JDK is required)");
+            System.exit(2);
+        }
+        StandardJavaFileManager fileManager =
+            compiler.getStandardFileManager(null, Locale.ROOT, StandardCharsets.UTF_8);
+        List<String> options = Arrays.asList(
+            "-classpath", args[0], "-d", args[1], "-proc:none", "-nowarn", "-g:none");
+        DataInputStream in = new DataInputStream(new BufferedInputStream(System.in));
+        OutputStream out = new BufferedOutputStream(System.out);
+
+        String header;
+        while ((header = readLine(in)) != null) {
+            byte[] buffer = new byte[Integer.parseInt(header.trim())];
+            in.readFully(buffer);
+            String source = new String(buffer, StandardCharsets.UTF_8);
+
+            DiagnosticCollector<JavaFileObject> diagnostics = new DiagnosticCollector<>();
+            StringBuilder report = new StringBuilder();
+            boolean success;
+            try {
+                success = compiler.getTask(null, fileManager, diagnostics, options, null,
+                    Collections.singletonList(new SourceFile(source))).call();
+            } catch (RuntimeException e) {
+                success = false;
+                report.append("error: compiler crashed: ").append(e).append('\\n');
+            }
+            for (Diagnostic<? extends JavaFileObject> d : diagnostics.getDiagnostics()) {
+                if (d.getKind() != Diagnostic.Kind.ERROR) {
+                    continue;
+                }
+                if (d.getLineNumber() != Diagnostic.NOPOS) {
+                    report.append("GeneratedTest.java:").append(d.getLineNumber()).append(": ");
+                }
+                report.append("error: ").append(d.getMessage(Locale.ROOT)).append('\\n');
+            }
+
+            byte[] body = report.toString().getBytes(StandardCharsets.UTF_8);
+            String status = (success ? "OK " : "ERROR ") + body.length + "\\n";
+            out.write(status.getBytes(StandardCharsets.UTF_8));
+            out.write(body);
+            out.flush();
+        }
+    }
+
+    private static String readLine(DataInputStream in) throws IOException {
+        ByteArrayOutputStream line = new ByteArrayOutputStream();
+        int b;
+        while ((b = in.read()) != -1 && b != '\\n') {
+            line.write(b);
+        }
+        if (b == -1 && line.size() == 0) {
+            return null;
+        }
+        return new String(line.toByteArray(), StandardCharsets.UTF_8);
+    }
+
+    private static class SourceFile extends SimpleJavaFileObject {
+        private final String source;
+
+        SourceFile(String source) {
+            super(URI.create("string:///GeneratedTest.java"), Kind.SOURCE);
+            this.source = source;
+        }
+
+        @Override
+        public CharSequence getCharContent(boolean ignoreEncodingErrors) {
+            return source;
+        }
+    }
+}
+"""
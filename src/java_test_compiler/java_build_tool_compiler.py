@@ -1,28 +1,134 @@
-from pathlib import Path
+import atexit
+import os
+import queue
 import shutil
 import subprocess
 import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
 
 from exceptions.java_test_compilation_exception import JavaTestCompilationException
 from java_test_compiler.template import TEST_TEMPLATE
 
+# Number of warm project copies kept per project for concurrent compilations
+COMPILE_WORKSPACES = int(os.getenv("COMPILE_WORKSPACES", "2"))
+
+# Project files and directories mirrored into every workspace
+_BUILD_FILES = (
+    "pom.xml",
+    "build.gradle",
+    "build.gradle.kts",
+    "settings.gradle",
+    "settings.gradle.kts",
+    "gradlew",
+    "gradlew.bat",
+)
+_SYNCED_DIRS = (Path("gradle"), Path("libs"), Path("src") / "main" / "java")
+
+
+class _WorkspacePool:
+    """Prepared copies of a project that are reused across compilations."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max(1, max_size)
+        self.idle: "queue.Queue[Path]" = queue.Queue()
+        self.created: List[Path] = []
+        # workspace -> fingerprint of the project files it was synced from
+        self.synced: Dict[Path, Tuple] = {}
+        self.lock = threading.Lock()
+
 
 class JavaBuildToolCompiler:
+    _pools: Dict[Path, _WorkspacePool] = {}
+    _pools_lock = threading.Lock()
+
     def __init__(self, project_root: Path = Path(".")):
         self.project_root = project_root
         self.build_tool = self._detect_build_tool()
 
     def compile(self, test: str) -> None:
-        with tempfile.TemporaryDirectory() as tmp:
-            tmp_dir = Path(tmp)
-            self._prepare_workspace(tmp_dir)
-            self._write_test_file(tmp_dir, test)
-            return self._invoke_build(tmp_dir)
+        with self._acquire_workspace() as work_dir:
+            self._write_test_file(work_dir, test)
+            return self._invoke_build(work_dir)
 
     def _compile_with_maven(self, work_dir: Path) -> None:
         raise NotImplementedError("Maven compilation not implemented yet")
 
+    @contextmanager
+    def _acquire_workspace(self) -> Iterator[Path]:
+        """
+        Borrow a warm workspace for the project, preparing a new one only when
+        every existing workspace is busy and the pool is not full yet.
+        """
+        pool = self._pool_for_project()
+        try:
+            work_dir = pool.idle.get_nowait()
+        except queue.Empty:
+            work_dir = None
+            with pool.lock:
+                if len(pool.created) < pool.max_size:
+                    work_dir = Path(tempfile.mkdtemp(prefix="specvalid-ws-"))
+                    pool.created.append(work_dir)
+            if work_dir is None:
+                work_dir = pool.idle.get()
+        # A workspace copied before the subject changed is synced again; its
+        # build outputs are kept so the build stays incremental
+        fingerprint = self._project_fingerprint()
+        if pool.synced.get(work_dir) != fingerprint:
+            try:
+                self._prepare_workspace(work_dir)
+            except Exception:
+                with pool.lock:
+                    pool.created.remove(work_dir)
+                    pool.synced.pop(work_dir, None)
+                shutil.rmtree(work_dir, ignore_errors=True)
+                raise
+            pool.synced[work_dir] = fingerprint
+        try:
+            yield work_dir
+        finally:
+            pool.idle.put(work_dir)
+
+    def _pool_for_project(self) -> _WorkspacePool:
+        root = Path(self.project_root).resolve()
+        with self._pools_lock:
+            pool = self._pools.get(root)
+            if pool is None:
+                pool = _WorkspacePool(COMPILE_WORKSPACES)
+                self._pools[root] = pool
+            return pool
+
+    @classmethod
+    def release_workspaces(cls) -> None:
+        """Remove every workspace created by this process."""
+        with cls._pools_lock:
+            pools = list(cls._pools.values())
+            cls._pools.clear()
+        for pool in pools:
+            for work_dir in pool.created:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+    def _project_fingerprint(self) -> Tuple:
+        """Path, size and mtime of every project file copied to workspaces."""
+        entries = []
+        paths = [self.project_root / name for name in _BUILD_FILES]
+        for rel_dir in _SYNCED_DIRS:
+            for dirpath, _, filenames in os.walk(self.project_root / rel_dir):
+                paths.extend(Path(dirpath) / name for name in filenames)
+        for path in paths:
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((str(path), stat.st_size, stat.st_mtime_ns))
+        return tuple(sorted(entries))
+
     def _prepare_workspace(self, tmp_dir: Path) -> None:
+        # Copies left from a previous sync would keep deleted sources around
+        for rel_dir in _SYNCED_DIRS:
+            shutil.rmtree(tmp_dir / rel_dir, ignore_errors=True)
         self._copy_build_files(tmp_dir)
         prod_src = self.project_root / "src" / "main" / "java"
         if prod_src.exists():
@@ -52,9 +158,11 @@ class JavaBuildToolCompiler:
         return "javac"
 
     def _compile_with_gradle(self, work_dir: Path) -> None:
+        # No "clean": the workspace is reused, so Gradle only recompiles
+        # GeneratedTest.java and the daemon stays warm between calls.
         try:
             result = subprocess.run(
-                ["./gradlew", "clean", "testClasses"],
+                ["./gradlew", "--daemon", "testClasses"],
                 cwd=work_dir,
                 capture_output=True,
                 text=True,
@@ -90,3 +198,6 @@ class JavaBuildToolCompiler:
         libs_dir = self.project_root / "libs"
         if libs_dir.exists():
             shutil.copytree(libs_dir, target_dir / "libs")
+
+
+atexit.register(JavaBuildToolCompiler.release_workspaces)
@@ -1,29 +1,134 @@
+import os
 from pathlib import Path
+import re
 import subprocess
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
 from exceptions.java_test_compilation_exception import JavaTestCompilationException
+from java_test_compiler.compile_cache import CompileCache
 from java_test_compiler.java_build_tool_compiler import JavaBuildToolCompiler
 from java_test_compiler.javac_compiler import JavacCompiler
+from java_test_compiler.template import TEST_TEMPLATE
+
+# Maximum number of tests compiled together in a single generated class
+BATCH_COMPILE_SIZE = int(os.getenv("BATCH_COMPILE_SIZE", "50"))
+
+# First line of the test method inside the generated test class (1-based)
+_TEMPLATE_FIRST_TEST_LINE = TEST_TEMPLATE.split("{test_method}")[0].count("\n") + 1
+
+_DIAGNOSTIC_PATTERN = re.compile(
+    r"^.*GeneratedTest\.java:(\d+): (error|warning): ", re.MULTILINE
+)
+_METHOD_NAME_PATTERN = re.compile(r"((?:public\s+)?void)\s+(\w+)\s*\(")
+# javac messages of the parser: a syntax error in one test of a batch makes it
+# report errors in the tests that follow, so their line ranges prove nothing
+_PARSE_ERROR_PATTERN = re.compile(
+    r": error: (.* expected|illegal start of|reached end of file while parsing"
+    r"|not a statement|unclosed |illegal character|orphaned )"
+)
+
+
+def parse_compilation_errors(output: str) -> List[Tuple[int, str]]:
+    """
+    Split javac output into (line, message) pairs, one per reported error.
+    Each message keeps the source excerpt and symbol details javac prints
+    below the error line.
+    """
+    matches = list(_DIAGNOSTIC_PATTERN.finditer(output))
+    errors = []
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(output)
+        if match.group(2) != "error":
+            continue
+        errors.append((int(match.group(1)), output[match.start() : end].rstrip()))
+    return errors
+
+
+def _as_single_test_error(message: str, test: str, first_line: int, i: int) -> str:
+    """
+    Rewrite an error reported for the i-th test of a batch, whose method
+    starts at first_line, as if the test had been compiled on its own: the
+    line is shifted and batchTest<i> gets its original name back. Cached
+    errors end up in fix prompts, where they must match the single test.
+    """
+    match = _DIAGNOSTIC_PATTERN.match(message)
+    if match is not None:
+        line = int(match.group(1)) - first_line + _TEMPLATE_FIRST_TEST_LINE
+        message = f"{message[: match.start(1)]}{line}{message[match.end(1) :]}"
+    name = _METHOD_NAME_PATTERN.search(test)
+    if name is not None:
+        message = re.sub(rf"\bbatchTest{i}\b", name.group(2), message)
+    return message
 
 
 class JavaTestCompiler:
-    def __init__(self, class_path: str = "."):
+    def __init__(
+        self,
+        class_path: str = ".",
+        with_tool: bool = True,
+        use_cache: Optional[bool] = None,
+    ):
         self.class_path = Path(class_path).resolve()
         self.project_root = self._find_project_root()
+        # Default backend: the build tool (Gradle) or the javac compile server
+        self.with_tool = with_tool
+        self.build_compiler = JavaBuildToolCompiler(self.project_root)
+        self.javac_compiler = JavacCompiler(self.project_root)
+        if use_cache is None:
+            use_cache = os.getenv("COMPILE_CACHE", "true").lower() == "true"
+        self.use_cache = use_cache
+        self._compile_caches: Dict[bool, CompileCache] = {}
+
+    def compile(self, test: str, with_tool: Optional[bool] = None) -> None:
+        if with_tool is None:
+            with_tool = self.with_tool
+        cache = self._compile_cache(with_tool)
+        if cache is None:
+            return self._compile_uncached(test, with_tool)
+
+        cached = cache.lookup(test)
+        if cached is not None:
+            success, errors = cached
+            if success:
+                return
+            raise JavaTestCompilationException(errors)
 
-    def compile(self, test: str, with_tool: bool = True) -> None:
+        try:
+            self._compile_uncached(test, with_tool)
+        except JavaTestCompilationException as e:
+            # Only failures with javac diagnostics are a verdict on the test;
+            # build infrastructure problems must be retried next time.
+            if parse_compilation_errors(str(e)):
+                cache.record(test, False, str(e))
+            raise
+        cache.record(test, True)
+
+    def _compile_uncached(self, test: str, with_tool: bool) -> None:
         if with_tool:
             return self._compile_test_with_build_tool(test)
         return self._compile_test_with_javac(test)
 
-    def compile_project(self, clean: bool = False) -> None:
+    def _compile_cache(self, with_tool: bool) -> Optional[CompileCache]:
+        if not self.use_cache:
+            return None
+        cache = self._compile_caches.get(with_tool)
+        if cache is None:
+            backend = "build_tool" if with_tool else "javac"
+            cache = CompileCache(self.project_root, backend)
+            self._compile_caches[with_tool] = cache
+        return cache
+
+    def compile_project(
+        self, clean: bool = False, project_root: Optional[Path] = None
+    ) -> None:
+        if project_root is None:
+            project_root = self.project_root
         try:
             if clean:
                 # Clean first to remove any cached build artifacts
                 subprocess.run(
                     ["./gradlew", "clean"],
-                    cwd=self.project_root,
+                    cwd=project_root,
                     capture_output=True,
                     text=True,
                     check=True,
@@ -31,7 +136,7 @@ class JavaTestCompiler:
             # Compile
             subprocess.run(
                 ["./gradlew", "compileJava", "compileTestJava"],
-                cwd=self.project_root,
+                cwd=project_root,
                 capture_output=True,
                 text=True,
                 check=True,
@@ -55,15 +160,142 @@ class JavaTestCompiler:
         return self.class_path
 
     def _compile_test_with_build_tool(self, test: str) -> None:
-        build_compiler = JavaBuildToolCompiler(self.project_root)
-        build_compiler.compile(test)
+        self.build_compiler.compile(test)
 
     def _compile_test_with_javac(self, test: str) -> None:
-        javac_compiler = JavacCompiler()
-        javac_compiler.compile(test)
+        self.javac_compiler.compile(test)
+
+    def compile_batch(
+        self, tests: List[str], with_tool: Optional[bool] = None
+    ) -> List[Optional[str]]:
+        """
+        Compile many tests with as few compiler invocations as possible.
+
+        Tests are placed in one generated class as separately named methods and
+        compiled together; javac errors are mapped back to the test whose line
+        range contains them. Tests that cannot be judged that way, including
+        every test of a batch with syntax errors, are bisected.
+
+        Returns:
+            One entry per test: None if it compiles, its errors otherwise.
+        """
+        if with_tool is None:
+            with_tool = self.with_tool
+        results: List[Optional[str]] = [None] * len(tests)
+
+        # Tests judged in an earlier run are not compiled again
+        pending = []
+        cache = self._compile_cache(with_tool)
+        for i, test in enumerate(tests):
+            cached = cache.lookup(test) if cache is not None else None
+            if cached is None:
+                pending.append(i)
+            elif not cached[0]:
+                results[i] = cached[1]
+
+        for start in range(0, len(pending), BATCH_COMPILE_SIZE):
+            chunk = pending[start : start + BATCH_COMPILE_SIZE]
+            self._compile_group(tests, chunk, results, with_tool)
+        return results
+
+    def _compile_group(
+        self,
+        tests: List[str],
+        indices: List[int],
+        results: List[Optional[str]],
+        with_tool: bool,
+    ) -> None:
+        if not indices:
+            return
+
+        if len(indices) == 1:
+            results[indices[0]] = self._compile_single(tests[indices[0]], with_tool)
+            return
+
+        source, line_ranges = self._build_batch_source([tests[i] for i in indices])
+        cache = self._compile_cache(with_tool)
+        try:
+            self._compile_uncached(source, with_tool)
+            if cache is not None:
+                for i in indices:
+                    cache.record(tests[i], True)
+            return
+        except JavaTestCompilationException as e:
+            errors = parse_compilation_errors(str(e))
+        except Exception as e:
+            for i in indices:
+                results[i] = f"Unexpected error: {str(e)}"
+            return
+
+        if not errors or any(
+            _PARSE_ERROR_PATTERN.search(message) for _, message in errors
+        ):
+            middle = len(indices) // 2
+            self._compile_group(tests, indices[:middle], results, with_tool)
+            self._compile_group(tests, indices[middle:], results, with_tool)
+            return
+
+        attributed: Dict[int, List[str]] = {}
+        unattributed = False
+        for line, message in errors:
+            position = next(
+                (
+                    pos
+                    for pos, (first, last) in enumerate(line_ranges)
+                    if first <= line <= last
+                ),
+                None,
+            )
+            if position is None:
+                unattributed = True
+                continue
+            i = indices[position]
+            attributed.setdefault(i, []).append(
+                _as_single_test_error(
+                    message, tests[i], line_ranges[position][0], position
+                )
+            )
+
+        for i, messages in attributed.items():
+            results[i] = "\n".join(messages)
+            if cache is not None:
+                cache.record(tests[i], False, results[i])
+
+        remaining = [i for i in indices if i not in attributed]
+        if attributed and not unattributed:
+            # Type errors stop javac before flow analysis, which may hide
+            # errors in the others, so the rest are compiled again without the
+            # broken ones.
+            self._compile_group(tests, remaining, results, with_tool)
+            return
+
+        middle = len(remaining) // 2
+        self._compile_group(tests, remaining[:middle], results, with_tool)
+        self._compile_group(tests, remaining[middle:], results, with_tool)
+
+    def _compile_single(self, test: str, with_tool: bool) -> Optional[str]:
+        compilation = self._attempt_test_compilation([test], with_tool=with_tool)
+        if compilation["success"]:
+            return None
+        return "\n".join(compilation["errors"])
+
+    def _build_batch_source(
+        self, tests: List[str]
+    ) -> Tuple[str, List[Tuple[int, int]]]:
+        """Join tests under unique method names and record their line ranges."""
+        renamed = []
+        line_ranges = []
+        line = _TEMPLATE_FIRST_TEST_LINE
+        for i, test in enumerate(tests):
+            test = _METHOD_NAME_PATTERN.sub(rf"\1 batchTest{i}(", test, count=1)
+            last_line = line + test.count("\n")
+            renamed.append(test)
+            line_ranges.append((line, last_line))
+            line = last_line + 1
+        return "\n".join(renamed), line_ranges
 
     def _attempt_test_compilation(
-        self, tests: List[str], with_tool: bool = True
+        self, tests: List[str], with_tool: Optional[bool] = None
     ) -> Dict:
         try:
             test_suite = "\n".join(tests)
@@ -1,6 +1,189 @@
+import atexit
+import glob
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from cache.disk_cache import default_cache_dir
+from exceptions.java_test_compilation_exception import JavaTestCompilationException
+from java_test_compiler.compile_server import (
+    COMPILE_SERVER_CLASS,
+    COMPILE_SERVER_SOURCE,
+)
+from java_test_compiler.template import TEST_TEMPLATE
+
+
+class _CompileServerProcess:
+    """A running CompileServer JVM together with the lock serializing its use."""
+
+    def __init__(self, server_dir: Path, classpath: str):
+        self.server_dir = server_dir
+        self.classpath = classpath
+        self.output_dir = tempfile.mkdtemp(prefix="specvalid-javac-")
+        self.lock = threading.Lock()
+        self.process: Optional[subprocess.Popen] = None
+
+    def compile(self, source: str) -> Tuple[bool, str]:
+        with self.lock:
+            try:
+                return self._request(source)
+            except (BrokenPipeError, ConnectionError, EOFError):
+                # The JVM died (e.g. out of memory); start a new one and retry once
+                self.stop()
+                return self._request(source)
+
+    def _request(self, source: str) -> Tuple[bool, str]:
+        if self.process is None or self.process.poll() is not None:
+            self._start()
+        assert self.process is not None
+        assert self.process.stdin is not None and self.process.stdout is not None
+
+        payload = source.encode("utf-8")
+        self.process.stdin.write(f"{len(payload)}\n".encode("utf-8") + payload)
+        self.process.stdin.flush()
+
+        header = self.process.stdout.readline()
+        if not header:
+            raise EOFError("Compile server exited unexpectedly")
+        status, length = header.decode("utf-8").split()
+        body = self.process.stdout.read(int(length)).decode("utf-8")
+        return status == "OK", body
+
+    def _start(self) -> None:
+        self.process = subprocess.Popen(
+            [
+                "java",
+                "-cp",
+                str(self.server_dir),
+                COMPILE_SERVER_CLASS,
+                self.classpath,
+                self.output_dir,
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def stop(self) -> None:
+        if self.process is not None:
+            try:
+                if self.process.stdin:
+                    self.process.stdin.close()
+                self.process.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                self.process.kill()
+            self.process = None
+
+    def close(self) -> None:
+        self.stop()
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+
 class JavacCompiler:
-    def __init__(self):
-        pass
+    """
+    Compiles generated tests with a persistent javac server.
+
+    The project classpath (build/classes/java/main, the project's libs/ jars
+    and the tool's libs/ jars, which provide JUnit) is resolved, and the
+    production classes brought up to date, once per project; a single JVM is
+    kept alive to compile every test, so neither Gradle nor JVM startup is
+    paid per compilation. Extra entries can be given with JAVAC_CLASSPATH.
+    """
+
+    _servers: Dict[Path, _CompileServerProcess] = {}
+    _servers_lock = threading.Lock()
+
+    def __init__(self, project_root: Path = Path(".")):
+        self.project_root = Path(project_root).resolve()
 
     def compile(self, test: str) -> None:
-        raise NotImplementedError("Javac compilation not implemented yet")
+        source = TEST_TEMPLATE.replace("{test_method}", test)
+        success, diagnostics = self._server_for_project().compile(source)
+        if not success:
+            raise JavaTestCompilationException(diagnostics)
+
+    def _server_for_project(self) -> _CompileServerProcess:
+        with self._servers_lock:
+            server = self._servers.get(self.project_root)
+            if server is None:
+                server = _CompileServerProcess(
+                    self._ensure_server_classes(), self._resolve_classpath()
+                )
+                self._servers[self.project_root] = server
+            return server
+
+    def _resolve_classpath(self) -> str:
+        main_classes = self.project_root / "build" / "classes" / "java" / "main"
+        # Always brought up to date when the server starts: compileJava is
+        # incremental, and tests checked against stale classes would get wrong
+        # verdicts, which the compile cache would then keep
+        if (self.project_root / "gradlew").exists() or not main_classes.exists():
+            self._compile_production_classes()
+
+        entries: List[str] = [str(main_classes)]
+        for libs_dir in (self.project_root / "libs", Path("libs").resolve()):
+            entries.extend(sorted(glob.glob(str(libs_dir / "*.jar"))))
+        extra = os.getenv("JAVAC_CLASSPATH")
+        if extra:
+            entries.extend(extra.split(os.pathsep))
+        return os.pathsep.join(dict.fromkeys(entries))
+
+    def _compile_production_classes(self) -> None:
+        try:
+            subprocess.run(
+                ["./gradlew", "compileJava"],
+                cwd=self.project_root,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+        except subprocess.CalledProcessError as e:
+            raise JavaTestCompilationException(
+                f"Failed to compile production classes: {e.stderr}"
+            )
+
+    @staticmethod
+    def _ensure_server_classes() -> Path:
+        digest = hashlib.sha256(COMPILE_SERVER_SOURCE.encode("utf-8")).hexdigest()
+        server_dir = Path(default_cache_dir()) / "compile_server" / digest[:16]
+        if (server_dir / f"{COMPILE_SERVER_CLASS}.class").exists():
+            return server_dir
+
+        server_dir.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory(dir=server_dir) as tmp:
+            source_file = Path(tmp) / f"{COMPILE_SERVER_CLASS}.java"
+            source_file.write_text(COMPILE_SERVER_SOURCE)
+            try:
+                subprocess.run(
+                    ["javac", "-d", tmp, str(source_file)],
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                )
+            except subprocess.CalledProcessError as e:
+                raise JavaTestCompilationException(
+                    f"Failed to build the javac compile server: {e.stderr}"
+                )
+            # The main class goes last: its presence marks the build as complete
+            for class_file in sorted(
+                Path(tmp).glob("*.class"),
+                key=lambda f: f.name == f"{COMPILE_SERVER_CLASS}.class",
+            ):
+                os.replace(class_file, server_dir / class_file.name)
+        return server_dir
+
+    @classmethod
+    def shutdown_servers(cls) -> None:
+        with cls._servers_lock:
+            servers = list(cls._servers.values())
+            cls._servers.clear()
+        for server in servers:
+            server.close()
+
+
+atexit.register(JavacCompiler.shutdown_servers)
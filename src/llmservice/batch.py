@@ -0,0 +1,81 @@
+import os
+import time
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# Seconds between two status checks of a submitted batch
+LLM_BATCH_POLL_INTERVAL = float(os.getenv("LLM_BATCH_POLL_INTERVAL", "30"))
+# Seconds a batch may take before it is given up on (the providers allow 24h)
+LLM_BATCH_TIMEOUT = float(os.getenv("LLM_BATCH_TIMEOUT", str(24 * 3600)))
+# Requests per submitted batch, well below the providers' per-file limits
+LLM_BATCH_MAX_REQUESTS = int(os.getenv("LLM_BATCH_MAX_REQUESTS", "10000"))
+
+# (model id, prompt, format instructions) of a request to prefetch
+BatchRequest = Tuple[str, str, str]
+
+
+class BatchError(Exception):
+    """A batch that failed, expired or did not finish in time."""
+
+
+def wait_for_batch(
+    label: str,
+    poll: Callable[[], T],
+    finished: Callable[[T], bool],
+    interval: float = LLM_BATCH_POLL_INTERVAL,
+    timeout: float = LLM_BATCH_TIMEOUT,
+) -> T:
+    """Call poll every interval seconds until finished accepts its result."""
+    deadline = time.monotonic() + timeout
+    while True:
+        status = poll()
+        if finished(status):
+            return status
+        if time.monotonic() >= deadline:
+            raise BatchError(f"{label} did not finish within {timeout:.0f}s")
+        time.sleep(interval)
+
+
+def chunks(items: List[T], size: int = LLM_BATCH_MAX_REQUESTS) -> List[List[T]]:
+    size = max(1, size)
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+def run_batches(
+    groups: Dict[Tuple[str, str], List[str]],
+    execute: Callable[[str, str, List[str]], List[Optional[str]]],
+) -> Dict[Tuple[str, str, str], Optional[str]]:
+    """
+    Run the prompts of every (provider, model url) group through
+    execute(provider, model_url, prompts), the batches of all groups at once.
+
+    A batch that fails is reported and its prompts are left unanswered, so
+    they are sent as ordinary requests later on.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    jobs = [
+        (provider, model_url, chunk)
+        for (provider, model_url), prompts in groups.items()
+        for chunk in chunks(prompts)
+    ]
+    responses: Dict[Tuple[str, str, str], Optional[str]] = {}
+    if not jobs:
+        return responses
+    with ThreadPoolExecutor(
+        max_workers=len(jobs), thread_name_prefix="llm-batch"
+    ) as executor:
+        futures = [executor.submit(execute, *job) for job in jobs]
+        for (provider, model_url, prompts), future in zip(jobs, futures):
+            try:
+                answers = future.result()
+            except Exception as e:
+                print(
+                    f"[WARN] {provider} batch of {len(prompts)} requests to "
+                    f"{model_url} failed, they will be sent one by one: {e}"
+                )
+                continue
+            for prompt, answer in zip(prompts, answers):
+                responses[(provider, model_url, prompt)] = answer
+    return responses
@@ -0,0 +1,176 @@
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from exceptions.provider_error import ProviderError
+
+# Consecutive failed attempts that open the breaker of a model
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "3"))
+# Seconds an open breaker fast-fails before letting a probe request through
+LLM_BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", "300"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitBreaker:
+    """
+    Stops calling a model that keeps failing.
+
+    The breaker opens after failure_threshold consecutive attempts that timed
+    out, could not connect or got a 5xx, and then rejects every request for
+    cooldown seconds. Throttling (429) and other 4xx are left to the rate
+    limiter and the retry policy and do not count. It then turns half-open
+    and lets a single probe through: a success closes it, a failure opens it
+    again.
+    """
+
+    def __init__(
+        self,
+        model_id: str,
+        failure_threshold: int = LLM_BREAKER_FAILURES,
+        cooldown: float = LLM_BREAKER_COOLDOWN,
+        on_change=None,
+    ):
+        self.model_id = model_id
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        # Called with (breaker, previous state) after every transition
+        self.on_change = on_change
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.last_error: Optional[ProviderError] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a request to the model may be sent now."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.cooldown:
+                    return False
+                self._transition(HALF_OPEN)
+            # Half-open: only one probe at a time
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.consecutive_failures = 0
+            self._probing = False
+            if self.state != CLOSED:
+                self._transition(CLOSED)
+
+    def record_failure(self, error: ProviderError) -> None:
+        with self._lock:
+            if not error.unavailable:
+                # The model answered; a half-open breaker may probe again
+                self._probing = False
+                return
+            self.consecutive_failures += 1
+            self.last_error = error
+            probe_failed = self.state == HALF_OPEN and self._probing
+            self._probing = False
+            if probe_failed or (
+                self.state == CLOSED
+                and self.consecutive_failures >= self.failure_threshold
+            ):
+                self.opened_at = time.monotonic()
+                self._transition(OPEN)
+
+    def force_open(self) -> None:
+        """Open the breaker without waiting for failures."""
+        with self._lock:
+            self.opened_at = time.monotonic()
+            if self.state != OPEN:
+                self._transition(OPEN)
+
+    def _transition(self, state: str) -> None:
+        previous, self.state = self.state, state
+        if self.on_change is not None:
+            self.on_change(self, previous)
+
+
+class CircuitBreakers:
+    """
+    The CircuitBreaker of each model, created on first use.
+
+    While a breaker is open its model is listed in cold_models, timeout_models
+    or error_models, according to the failure that opened it. Models already in
+    one of those lists start with an open breaker, so they are only probed
+    once per cooldown.
+    """
+
+    def __init__(
+        self,
+        cold_models: List[str],
+        error_models: List[str],
+        timeout_models: List[str],
+        failure_threshold: int = LLM_BREAKER_FAILURES,
+        cooldown: float = LLM_BREAKER_COOLDOWN,
+    ):
+        self.cold_models = cold_models
+        self.error_models = error_models
+        self.timeout_models = timeout_models
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def for_model(self, model_id: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(model_id)
+            if breaker is None:
+                breaker = CircuitBreaker(
+                    model_id,
+                    self.failure_threshold,
+                    self.cooldown,
+                    on_change=self._on_change,
+                )
+                if self._listed(model_id):
+                    breaker.force_open()
+                self._breakers[model_id] = breaker
+            return breaker
+
+    def _listed(self, model_id: str) -> bool:
+        return any(model_id in models for models in self._lists())
+
+    def _lists(self):
+        return self.cold_models, self.error_models, self.timeout_models
+
+    def _on_change(self, breaker: CircuitBreaker, previous: str) -> None:
+        model_id = breaker.model_id
+        error = breaker.last_error
+        if breaker.state == OPEN:
+            cause = (
+                f"after {breaker.consecutive_failures} consecutive failures: {error}"
+                if error is not None
+                else "as it is listed as a cold, error or timeout model"
+            )
+            print(
+                f"[WARN] circuit breaker {model_id}: {previous} -> open for "
+                f"{breaker.cooldown:.0f}s {cause}"
+            )
+            if error is not None and not self._listed(model_id):
+                self._list_for(error).append(model_id)
+        else:
+            print(f"[INFO] circuit breaker {model_id}: {previous} -> {breaker.state}")
+            if breaker.state == CLOSED:
+                for models in self._lists():
+                    if model_id in models:
+                        models.remove(model_id)
+
+    def _list_for(self, error: ProviderError) -> List[str]:
+        if error.timed_out:
+            return self.timeout_models
+        # Hugging Face answers 503 while a cold model is being loaded
+        if error.status == 503:
+            return self.cold_models
+        return self.error_models
@@ -0,0 +1,239 @@
+import itertools
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+from llmservice.providers.registry import PROVIDERS
+
+T = TypeVar("T")
+
+# Maximum number of in-flight requests per provider, or per host for Ollama
+# when OLLAMA_HOST lists several. Each value can be overridden with
+# LLM_CONCURRENCY_<PROVIDER> (e.g. LLM_CONCURRENCY_OLLAMA=4).
+DEFAULT_PROVIDER_CONCURRENCY = {
+    "ollama": 2,
+    "openai": 8,
+    "gemini": 4,
+    "huggingface": 4,
+}
+
+# Providers whose requests are served one model at a time (comma separated in
+# LLM_MODEL_AFFINITY, empty to disable): a local Ollama host swaps the weights
+# of the model in GPU memory every time the requested model changes.
+MODEL_AFFINITY_PROVIDERS = {
+    provider.strip()
+    for provider in os.getenv("LLM_MODEL_AFFINITY", "ollama").split(",")
+    if provider.strip()
+}
+
+
+def _provider_limit_from_env(provider: str, default: int) -> int:
+    value = os.getenv(f"LLM_CONCURRENCY_{provider.upper()}")
+    if value is None:
+        return default
+    return max(1, int(value))
+
+
+def provider_backends(provider: str) -> int:
+    """
+    Number of servers answering the requests of provider independently (the
+    Ollama hosts); each one takes the configured concurrency.
+    """
+    try:
+        instance = PROVIDERS.provider(provider)
+    except ValueError:
+        return 1
+    return max(1, getattr(instance, "backend_count", 1))
+
+
+def provider_concurrency(provider: str) -> int:
+    """Configured maximum of in-flight requests for provider."""
+    limit = _provider_limit_from_env(
+        provider, DEFAULT_PROVIDER_CONCURRENCY.get(provider, 1)
+    )
+    return limit * provider_backends(provider)
+
+
+class AffinityExecutor:
+    """
+    Thread pool that runs the jobs of at most max_active_models models at a
+    time (one per Ollama host).
+
+    Jobs are queued per model. The workers keep taking jobs of the active
+    models; a model is only retired once its queue is empty and its running
+    jobs have finished, and the freed place goes to the model whose oldest
+    queued job has waited longest.
+    """
+
+    def __init__(
+        self, max_workers: int, thread_name_prefix: str, max_active_models: int = 1
+    ):
+        self.thread_name_prefix = thread_name_prefix
+        self.max_active_models = max(1, max_active_models)
+        # Active model -> number of its jobs running
+        self.active_models: Dict[str, int] = {}
+        self._queues: Dict[str, Deque[tuple]] = {}
+        self._order = itertools.count()
+        self._shutdown = False
+        self._condition = threading.Condition()
+        self._threads = [
+            threading.Thread(
+                target=self._work, name=f"{thread_name_prefix}_{i}", daemon=True
+            )
+            for i in range(max(1, max_workers))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, model_id: str, fn: Callable[..., T], *args, **kwargs) -> Future:
+        future: Future = Future()
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new futures after shutdown")
+            self._queues.setdefault(model_id, deque()).append(
+                (next(self._order), future, fn, args, kwargs)
+            )
+            self._condition.notify_all()
+        return future
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the workers once every queued job has run."""
+        with self._condition:
+            self._shutdown = True
+            self._condition.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _work(self) -> None:
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            model_id, (_, future, fn, args, kwargs) = job
+            if future.set_running_or_notify_cancel():
+                try:
+                    result = fn(*args, **kwargs)
+                except BaseException as exc:
+                    future.set_exception(exc)
+                else:
+                    future.set_result(result)
+            with self._condition:
+                self.active_models[model_id] -= 1
+                self._condition.notify_all()
+
+    def _next_job(self) -> Optional[Tuple[str, tuple]]:
+        with self._condition:
+            while True:
+                model_id = self._next_model()
+                if model_id is not None:
+                    self.active_models[model_id] += 1
+                    return model_id, self._queues[model_id].popleft()
+                if self._shutdown and not any(self._queues.values()):
+                    return None
+                self._condition.wait()
+
+    def _next_model(self) -> Optional[str]:
+        """The model to run a job of next, activating one if there is room."""
+        active = self._oldest_queued(self.active_models)
+        if active is not None:
+            return active
+        # Active models with requests still in flight keep their place
+        for model_id, running in list(self.active_models.items()):
+            if running == 0:
+                del self.active_models[model_id]
+        if len(self.active_models) >= self.max_active_models:
+            return None
+        model_id = self._oldest_queued(self._queues)
+        if model_id is None:
+            return None
+        print(
+            f"[INFO] {self.thread_name_prefix}: serving model {model_id} "
+            f"({len(self._queues[model_id])} queued requests)"
+        )
+        self.active_models[model_id] = 0
+        return model_id
+
+    def _oldest_queued(self, models) -> Optional[str]:
+        pending = [
+            (self._queues[model_id][0][0], model_id)
+            for model_id in models
+            if self._queues.get(model_id)
+        ]
+        return min(pending)[1] if pending else None
+
+
+class LLMDispatcher:
+    """
+    Bounded-concurrency executor for LLM requests.
+
+    Every provider gets its own thread pool sized to its concurrency limit, so a
+    slow backend never starves the others and no provider receives more
+    in-flight requests than it is allowed. The providers in
+    MODEL_AFFINITY_PROVIDERS get an AffinityExecutor instead, which drains the
+    pending requests of one model per host before moving on to the next one.
+    """
+
+    def __init__(self, llm_service, provider_limits: Optional[Dict[str, int]] = None):
+        self.llm_service = llm_service
+        limits = dict(DEFAULT_PROVIDER_CONCURRENCY)
+        limits.update(provider_limits or {})
+        self.provider_limits = {
+            provider: _provider_limit_from_env(provider, limit)
+            for provider, limit in limits.items()
+        }
+        self._executors: Dict[str, ThreadPoolExecutor | AffinityExecutor] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def max_concurrency(self) -> int:
+        return sum(self.provider_limits.values())
+
+    def submit(self, model_id: str, fn: Callable[..., T], *args, **kwargs) -> Future:
+        """Schedule fn on the pool of the provider serving model_id."""
+        provider = self.llm_service.get_provider(model_id)
+        executor = self._executor_for(provider)
+        if isinstance(executor, AffinityExecutor):
+            return executor.submit(model_id, fn, *args, **kwargs)
+        return executor.submit(fn, *args, **kwargs)
+
+    def map(self, jobs: Sequence[Tuple[str, Callable[[], T]]]) -> List[T]:
+        """
+        Run every (model_id, job) pair concurrently.
+
+        Returns:
+            The job results in the same order as the input, regardless of the
+            order in which they completed.
+        """
+        futures = [self.submit(model_id, job) for model_id, job in jobs]
+        return [future.result() for future in futures]
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executors = list(self._executors.values())
+            self._executors.clear()
+        for executor in executors:
+            executor.shutdown(wait=wait)
+
+    def _executor_for(self, provider: str) -> ThreadPoolExecutor | AffinityExecutor:
+        with self._lock:
+            executor = self._executors.get(provider)
+            if executor is None:
+                backends = provider_backends(provider)
+                limit = backends * self.provider_limits.get(
+                    provider, _provider_limit_from_env(provider, 1)
+                )
+                if provider in MODEL_AFFINITY_PROVIDERS:
+                    executor = AffinityExecutor(
+                        max_workers=limit,
+                        thread_name_prefix=f"llm-{provider}",
+                        max_active_models=backends,
+                    )
+                else:
+                    executor = ThreadPoolExecutor(
+                        max_workers=limit, thread_name_prefix=f"llm-{provider}"
+                    )
+                self._executors[provider] = executor
+            return executor
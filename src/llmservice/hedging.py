@@ -0,0 +1,211 @@
+import os
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+from exceptions.provider_error import ProviderError
+from llmservice.providers.errors import attempt_error
+from llmservice.rate_limiter import ProviderLimiter, estimate_tokens
+
+T = TypeVar("T")
+
+# Hedges allowed per run, in total and as a fraction of the hedgeable requests
+LLM_HEDGE_MAX = int(os.getenv("LLM_HEDGE_MAX", "100"))
+LLM_HEDGE_RATIO = float(os.getenv("LLM_HEDGE_RATIO", "0.1"))
+# Latencies kept per provider, and needed before the p95 is trusted
+LLM_HEDGE_WINDOW = int(os.getenv("LLM_HEDGE_WINDOW", "200"))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+_HEDGE_THREADS = 64
+
+
+class RequestHedger:
+    """
+    Duplicates the requests that outlive the provider's observed p95 latency
+    and keeps whichever copy answers first.
+
+    The duplicate is only sent while the run's budget allows it and the
+    provider's rate limiter admits it at once. On the async path the slower
+    copy is cancelled; blocking SDK calls cannot be interrupted, so on the
+    sync path its response is discarded when it arrives, and only then is its
+    limiter slot freed.
+    """
+
+    def __init__(
+        self,
+        max_hedges: int = LLM_HEDGE_MAX,
+        max_ratio: float = LLM_HEDGE_RATIO,
+        window: int = LLM_HEDGE_WINDOW,
+        min_samples: int = LLM_HEDGE_MIN_SAMPLES,
+    ):
+        self.max_hedges = max_hedges
+        self.max_ratio = max_ratio
+        self.window = window
+        self.min_samples = min_samples
+        self.requests = 0
+        self.hedges = 0
+        self.hedges_won = 0
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+        # ThreadPoolExecutor, created when the first request is timed
+        self._executor = None
+
+    def p95(self, provider: str) -> Optional[float]:
+        with self._lock:
+            latencies = sorted(self._latencies.get(provider, ()))
+        if len(latencies) < self.min_samples:
+            return None
+        return latencies[int(0.95 * (len(latencies) - 1))]
+
+    def call(
+        self,
+        provider: str,
+        call: Callable[[], T],
+        limiter: ProviderLimiter,
+        prompt_tokens: int,
+    ) -> T:
+        """Run call, hedging it once it takes longer than the p95."""
+        from concurrent.futures import FIRST_COMPLETED, wait
+        from concurrent.futures import TimeoutError as FutureTimeoutError
+
+        self._count_request()
+        threshold = self.p95(provider)
+        if threshold is None:
+            return self._timed(provider, call)
+        sent_at = time.monotonic()
+        primary = self._pool().submit(self._timed, provider, call)
+        try:
+            return primary.result(timeout=threshold)
+        except FutureTimeoutError:
+            pass
+        if not self._claim(limiter, prompt_tokens):
+            return primary.result()
+        hedged_at = time.monotonic()
+        hedge = self._pool().submit(self._timed, provider, call)
+        pending = {primary, hedge}
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None or not pending:
+                    self._settle(future is hedge, pending)
+                    # The caller frees one slot when this returns; the other
+                    # stays taken until the losing copy has really finished
+                    if future is hedge:
+                        self._release_when_done(provider, primary, limiter, sent_at)
+                    else:
+                        self._release_when_done(provider, hedge, limiter, hedged_at)
+                    return future.result()
+
+    async def call_async(
+        self,
+        provider: str,
+        call: Callable[[], Awaitable[T]],
+        limiter: ProviderLimiter,
+        prompt_tokens: int,
+    ) -> T:
+        import asyncio
+
+        self._count_request()
+        threshold = self.p95(provider)
+        if threshold is None:
+            return await self._timed_async(provider, call)
+        primary = asyncio.ensure_future(self._timed_async(provider, call))
+        done, _ = await asyncio.wait({primary}, timeout=threshold)
+        if done or not self._claim(limiter, prompt_tokens):
+            return await primary
+        hedge = asyncio.ensure_future(self._hedged_async(provider, call, limiter))
+        pending = {primary, hedge}
+        while True:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task.exception() is None or not pending:
+                    self._settle(task is hedge, pending)
+                    return task.result()
+
+    def _settle(self, hedge_won: bool, losers) -> None:
+        for loser in losers:
+            loser.cancel()
+        if hedge_won:
+            with self._lock:
+                self.hedges_won += 1
+
+    def _count_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def _claim(self, limiter: ProviderLimiter, prompt_tokens: int) -> bool:
+        with self._lock:
+            if (
+                self.hedges >= self.max_hedges
+                or self.hedges + 1 > self.max_ratio * self.requests
+            ):
+                return False
+            if not limiter.try_acquire(prompt_tokens):
+                return False
+            self.hedges += 1
+            return True
+
+    def _record(self, provider: str, latency: float) -> None:
+        with self._lock:
+            latencies = self._latencies.get(provider)
+            if latencies is None:
+                latencies = self._latencies[provider] = deque(maxlen=self.window)
+            latencies.append(latency)
+
+    def _timed(self, provider: str, call: Callable[[], T]) -> T:
+        # Slow copies are recorded too, so hedging does not hide the tail
+        start = time.monotonic()
+        response = call()
+        self._record(provider, time.monotonic() - start)
+        return response
+
+    async def _timed_async(self, provider: str, call) -> T:
+        start = time.monotonic()
+        response = await call()
+        self._record(provider, time.monotonic() - start)
+        return response
+
+    @staticmethod
+    def _release_when_done(
+        provider: str, future, limiter: ProviderLimiter, since: float
+    ) -> None:
+        def release(future) -> None:
+            response = error = None
+            if future.cancelled():
+                # Never sent: nothing to learn about the provider (499)
+                error = ProviderError(provider, "hedge cancelled", status=499)
+            elif future.exception() is not None:
+                error = attempt_error(provider, future.exception())
+            else:
+                response = future.result()
+            limiter.release(
+                time.monotonic() - since, estimate_tokens(response), error=error
+            )
+
+        future.add_done_callback(release)
+
+    async def _hedged_async(self, provider: str, call, limiter: ProviderLimiter):
+        start = time.monotonic()
+        response = error = None
+        try:
+            response = await self._timed_async(provider, call)
+            return response
+        except BaseException as e:
+            error = attempt_error(provider, e)
+            raise
+        finally:
+            limiter.release(
+                time.monotonic() - start, estimate_tokens(response), error=error
+            )
+
+    def _pool(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=_HEDGE_THREADS, thread_name_prefix="llm-hedge"
+                )
+            return self._executor
@@ -1,16 +1,30 @@
 import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
 
-from google import genai
-from huggingface_hub import InferenceClient
-from openai import OpenAI
-from pydantic import ValidationError
+from cache.disk_cache import DiskCache
+from exceptions.provider_error import ProviderError
+from llmservice.batch import BatchRequest, run_batches
+from llmservice.circuit_breaker import CircuitBreakers
+from llmservice.hedging import RequestHedger
+from llmservice.providers.errors import attempt_error
+from llmservice.providers.registry import PROVIDERS, ModelRecord
+from llmservice.rate_limiter import RateLimiter, estimate_tokens
+from llmservice.retry_policy import RetryPolicy, RetryStats
+from llmservice.single_flight import SingleFlight
+from llmservice.streaming import StopDetectorFactory
 
-from llmservice.providers.ollama.ollama import OllamaProvider
+# Imported for their registration in PROVIDERS
+import llmservice.providers.gemini.gemini  # noqa: F401
+import llmservice.providers.huggingface.huggingface  # noqa: F401
+import llmservice.providers.ollama.ollama  # noqa: F401
+import llmservice.providers.openai.openai  # noqa: F401
 
+LLM_CACHE_MAX_MB = int(os.getenv("LLM_CACHE_MAX_MB", "1024"))
 
-class LLMService:
-    TIMEOUT = 600  # in seconds
 
+class LLMService:
     # key : model
     supported_models = {
         "L_Gemma31": "gemma3:1b",
@@ -127,6 +141,30 @@ class LLMService:
         "Gemini25Flash": "gemini-2.5-flash",
     }  # ["gpt-4o-mini", "meta-llama/Meta-Llama-3.1-70B-Instruct"]
 
+    def __init__(
+        self,
+        use_cache: bool | None = None,
+        retry_policy: RetryPolicy | None = None,
+        hedge: bool = False,
+    ):
+        if use_cache is None:
+            use_cache = os.getenv("LLM_CACHE", "true").lower() == "true"
+        # Responses keyed by hash(model_url, prompt, format_instructions)
+        self.response_cache = (
+            DiskCache("llm_responses", max_bytes=LLM_CACHE_MAX_MB * 1024 * 1024)
+            if use_cache
+            else None
+        )
+        self.retry_policy = retry_policy or RetryPolicy()
+        # Retries and abandoned requests of this service, by model
+        self.retry_stats = RetryStats()
+        # Duplicate the remote requests slower than the provider's p95
+        self.hedge = hedge
+        # Responses obtained ahead of time by prefetch_batch, keyed like the cache
+        self._batch_responses: Dict[str, str] = {}
+        # Identical requests running at the same time share one provider call
+        self.single_flight = SingleFlight()
+
     def print_supported_llms(self):
         print("List of supported LLMs:")
         for llm, url in self.supported_models.items():
@@ -141,36 +179,46 @@ class LLMService:
     #         'Falcon40BInstruct', 'FalconMamba7BInstruct', 'FalconMamba7B']
     timeout_models = []
 
-    try:
-        openai_api_key = os.environ.get("OPENAI_API_KEY")
-        if openai_api_key:
-            gpt_client = OpenAI(api_key=openai_api_key, timeout=TIMEOUT)
-        else:
-            print("OPENAI_API_KEY not set. GPT API will not be configured.")
-    except Exception as e:
-        print(f"Error initializing OpenAI client: {e}")
-
-    hf_api_key = os.environ.get("API_KEY_HUGGINGFACE")
-    if not hf_api_key:
-        print("API_KEY_HUGGINGFACE not set. Hugging Face API will not be configured.")
-
-    try:
-        gemini_api_key = os.environ.get("GOOGLE_API_KEY")
-        if gemini_api_key:
-            gemini_client = genai.Client(api_key=gemini_api_key)
-        else:
-            print("GOOGLE_API_KEY not set. Gemini API will not be configured.")
-    except Exception as e:
-        print(f"Error initializing Gemini client: {e}")
+    # The breakers, limiters and hedger below are class attributes on purpose:
+    # they track the providers and models, which every LLMService of the
+    # process shares (like the provider clients in PROVIDERS and the model
+    # lists above), so a second instance must not get a fresh request budget
+    # or forget that a model is failing.
+
+    # Fast-fails the models that keep failing, and keeps the lists above
+    # up to date with the models whose breaker is open
+    circuit_breakers = CircuitBreakers(cold_models, error_models, timeout_models)
+
+    # Request budgets and concurrency windows of every provider
+    rate_limiter = RateLimiter()
+
+    # Provider latencies and the hedging budget of the run
+    hedger = RequestHedger()
+
+    # Upper-cased model id -> ModelRecord, built once from supported_models
+    _model_index: Optional[Dict[str, ModelRecord]] = None
+    _model_index_lock = threading.Lock()
+
+    @classmethod
+    def model_index(cls) -> Dict[str, ModelRecord]:
+        if cls._model_index is None:
+            with cls._model_index_lock:
+                if cls._model_index is None:
+                    cls._model_index = PROVIDERS.build_index(cls.supported_models)
+        return cls._model_index
 
     def get_all_models(self):
         return list(self.supported_models.keys())
 
     def get_model_url(self, model_id: str) -> str:
-        for key in self.supported_models.keys():
-            if key.upper() == model_id.upper():
-                return self.supported_models.get(key) or ""
-        return ""
+        record = self.model_index().get(model_id.upper())
+        return record.model_url if record else ""
+
+    def get_provider(self, model_id: str) -> str:
+        record = self.model_index().get(model_id.upper())
+        if record is not None:
+            return record.provider_name
+        return PROVIDERS.provider_name_for(model_id)
 
     def get_model_ids_startswith(self, prefix: str):
         model_ids = []
@@ -179,114 +227,302 @@ class LLMService:
                 model_ids.append(key)
         return model_ids
 
-    def execute_prompt(self, model_id, prompt: str, format_instructions=""):
-        response = None
-        # avoid calling models currently cold/unsupported in HF or OPENAI
-        # if model_id not in self.cold_models and model_id not in self.unsupported_models:
-        # print(f"Executing prompt with model: {model_id}")
-        if model_id == "GPT35TurboInstruct":
-            response = self.gpt_old_execute_prompt(
-                model_id, prompt, format_instructions
-            )
-        elif model_id.startswith("GPT"):
-            response = self.gpt_execute_prompt(model_id, prompt, format_instructions)
-        elif model_id.startswith("L_"):
-            ollama = OllamaProvider()
-            model_url = self.get_model_url(model_id)
-            if model_url == "":
-                model_url = self.get_model_url("L_Phi4")
-            response = ollama.ollama_execute_prompt(
-                model_url, prompt, format_instructions
-            )
-        elif model_id.startswith("Gemini"):
-            response = self.gemini_execute_prompt(model_id, prompt, format_instructions)
-        elif model_id.startswith("Llama32"):
-            response = self.hf_execute_prompt(model_id, prompt, format_instructions)
-        else:  # use model from HF
-            response = self.hf_execute_prompt(model_id, prompt, format_instructions)
-        # else:
-        #     print("Model Skipped:{}".format(model_id))
-        return response
-
-    def gpt_execute_prompt(self, model_id, prompt="", format_instructions=""):
-        model_url = self.get_model_url(model_id)
-        if model_url == "":
-            model_url = self.get_model_url("GPT4oMini")
+    def execute_prompt(
+        self,
+        model_id,
+        prompt: str,
+        format_instructions="",
+        stop_detector: StopDetectorFactory | None = None,
+    ):
+        """
+        With a stop_detector the response is streamed, and the request is
+        cancelled as soon as the detector has seen what it waits for.
+        """
+        response = self._batched_response(model_id, prompt, format_instructions)
+        if response is not None:
+            return response
+        cache_key = self._cache_key(
+            model_id, prompt, format_instructions, stop_detector
+        )
+        if cache_key is not None:
+            response = self.response_cache.get(cache_key)
+            if response is None and stop_detector is not None:
+                # A complete response holds whatever a streamed one stops at
+                response = self.response_cache.get(
+                    self._cache_key(model_id, prompt, format_instructions)
+                )
+            if response is not None:
+                return response
 
-        try:
-            response = self.gpt_client.responses.create(
-                model=model_url,
-                input=prompt + format_instructions,
+        def execute():
+            response = self._execute_uncached(
+                model_id, prompt, format_instructions, stop_detector
             )
-            return response.output_text
-        except Exception as e:
-            print(f"gpt_execute_prompt: exception: {e}")
-            return None
+            self._store_response(cache_key, response)
+            return response
 
-    def gpt_old_execute_prompt(
-        self, model_id="GPT4oMini", prompt="", format_instructions=""
-    ):
-        model_url = self.get_model_url(model_id)
-        if model_url == "":
-            model_url = self.get_model_url("GPT4oMini")
-        try:
-            messages = [{"role": "user", "content": prompt + format_instructions}]
-            completion = self.gpt_client.chat.completions.create(
-                model=model_url, messages=messages
+        key = cache_key or self._request_key(
+            model_id, prompt, format_instructions, stop_detector
+        )
+        return self.single_flight.do(key, execute)
+
+    async def execute_prompt_async(self, model_id, prompt: str, format_instructions=""):
+        """
+        Non-blocking execute_prompt: the request runs on the provider's async
+        client, so many prompts can be in flight on a single event loop.
+        """
+        response = self._batched_response(model_id, prompt, format_instructions)
+        if response is not None:
+            return response
+        cache_key = self._cache_key(model_id, prompt, format_instructions)
+        if cache_key is not None:
+            response = self.response_cache.get(cache_key)
+            if response is not None:
+                return response
+
+        async def execute():
+            response = await self._execute_uncached_async(
+                model_id, prompt, format_instructions
             )
-            gpt_response = completion.choices[0].message
-            if gpt_response.refusal:
-                print("gpt_execute_prompt:gpt_response.refusal: ", gpt_response.refusal)
-                return None
-            else:
-                return gpt_response.content
-        except ValidationError as err:
-            print("gpt_execute_prompt:ValidationError: ", err)
-            return None
-        except Exception as exc:
-            print("gpt_execute_prompt: general exception: ", exc)
-            return None
+            self._store_response(cache_key, response)
+            return response
 
-    def gemini_execute_prompt(self, model_id, prompt: str, format_instructions=""):
-        model_url = self.get_model_url(model_id)
-        if model_url == "":
-            model_url = self.get_model_url("Gemini25Flash")
-        try:
+        key = cache_key or self._request_key(model_id, prompt, format_instructions)
+        return await self.single_flight.do_async(key, execute)
+
+    def prefetch_batch(self, requests: List[BatchRequest]) -> None:
+        """
+        Answer requests ahead of time through the batch APIs of the providers
+        that have one, which are cheaper and not rate limited like interactive
+        requests. execute_prompt then returns the batched responses; requests
+        that were not answered are sent as usual.
+        """
+        groups: Dict[Tuple[str, str], List[str]] = {}
+        pending: Dict[Tuple[str, str, str], str] = {}
+        seen = set(self._batch_responses)
+        unbatched = 0
+        for model_id, prompt, format_instructions in requests:
+            key = self._request_key(model_id, prompt, format_instructions)
+            if key in seen:
+                continue
+            seen.add(key)
+            if self.response_cache is not None and self.response_cache.get(key):
+                continue
+            provider_name, model_url = self._resolve_model(model_id)
+            if not hasattr(PROVIDERS.provider(provider_name), "execute_batch"):
+                unbatched += 1
+                continue
             full_prompt = prompt + format_instructions
-            response = self.gemini_client.models.generate_content(
-                model=model_url, contents=full_prompt
-            )
-            return response.text
-        except ValidationError as err:
-            print(f"[ERROR] gemini_execute_prompt:ValidationError: {err}")
+            groups.setdefault((provider_name, model_url), []).append(full_prompt)
+            pending[(provider_name, model_url, full_prompt)] = key
+
+        responses = run_batches(
+            groups,
+            lambda provider_name, model_url, prompts: PROVIDERS.provider(
+                provider_name
+            ).execute_batch(model_url, prompts),
+        )
+        answered = 0
+        for request, key in pending.items():
+            response = responses.get(request)
+            if response is None:
+                continue
+            self._batch_responses[key] = response
+            if self.response_cache is not None:
+                self.response_cache.put(key, response)
+            answered += 1
+        print(
+            f"[INFO] batch: {answered} of {len(pending)} requests answered, "
+            f"{unbatched} left to providers without a batch API"
+        )
+
+    def _batched_response(self, model_id, prompt: str, format_instructions: str):
+        if not self._batch_responses:
             return None
-        except Exception as exc:
-            print(f"[ERROR] gemini_execute_prompt: Excepción general: {exc}")
+        # A complete response also serves the streamed requests
+        return self._batch_responses.get(
+            self._request_key(model_id, prompt, format_instructions)
+        )
+
+    def _cache_key(
+        self,
+        model_id,
+        prompt: str,
+        format_instructions: str,
+        stop_detector: StopDetectorFactory | None = None,
+    ):
+        if self.response_cache is None:
             return None
+        return self._request_key(model_id, prompt, format_instructions, stop_detector)
 
-    def hf_execute_prompt(self, model_id, prompt: str, format_instructions=""):
-        model_url = self.get_model_url(model_id)
-        if model_url == "":
-            model_url = self.get_model_url("Llama323Instruct")
+    def _request_key(
+        self,
+        model_id,
+        prompt: str,
+        format_instructions: str,
+        stop_detector: StopDetectorFactory | None = None,
+    ) -> str:
+        parts = [self.get_model_url(model_id) or model_id, prompt, format_instructions]
+        if stop_detector is not None:
+            # Streamed responses are truncated, so they are kept apart
+            name = getattr(stop_detector, "__name__", type(stop_detector).__name__)
+            parts.append(f"stream:{name}")
+        return DiskCache.make_key(*parts)
 
-        try:
-            client = InferenceClient(
-                provider="auto",
-                api_key=self.hf_api_key,
-            )
-            completion = client.chat.completions.create(
-                model=model_url,
-                messages=[{"role": "user", "content": prompt + format_instructions}],
-            )
-            generated_text = completion.choices[0].message.content
-            if generated_text is not None and "error" in generated_text:
-                print("[ERROR] hf_execute_prompt: ", generated_text)
-                return None
+    def _store_response(self, cache_key, response) -> None:
+        # Failed requests return None and are never cached, so they get retried
+        if cache_key is not None and response is not None:
+            self.response_cache.put(cache_key, response)
+
+    def _execute_uncached(
+        self,
+        model_id,
+        prompt: str,
+        format_instructions="",
+        stop_detector: StopDetectorFactory | None = None,
+    ):
+        provider_name, model_url = self._resolve_model(model_id)
+        provider = PROVIDERS.provider(provider_name)
+        limiter = self.rate_limiter.for_provider(provider_name)
+        full_prompt = prompt + format_instructions
+        prompt_tokens = estimate_tokens(full_prompt)
+        breaker = self.circuit_breakers.for_model(model_id)
+        start = time.monotonic()
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                return self._skip_open_circuit(model_id, attempt)
+            try:
+                limiter.acquire(prompt_tokens)
+            except BaseException as exc:
+                breaker.record_failure(attempt_error(provider_name, exc))
+                raise
+            sent = time.monotonic()
+            try:
+                response = self._call_provider(
+                    provider_name,
+                    provider,
+                    model_url,
+                    full_prompt,
+                    stop_detector,
+                    limiter,
+                    prompt_tokens,
+                )
+            except ProviderError as error:
+                limiter.release(time.monotonic() - sent, error=error)
+                breaker.record_failure(error)
+                delay = self._retry_delay(model_id, error, attempt, start)
+                if delay is None:
+                    return None
+                time.sleep(delay)
+                attempt += 1
+            except BaseException as exc:
+                self._abandon_attempt(model_id, attempt, limiter, breaker, sent, exc)
+                raise
             else:
-                return generated_text
-        except ValidationError as err:
-            print("[ERROR] hf_execute_prompt:ValidationError: ", err)
-            return None
-        except Exception as exc:
-            print("[ERROR] hf_execute_prompt: general exception: ", exc)
-            return None
+                limiter.release(time.monotonic() - sent, estimate_tokens(response))
+                breaker.record_success()
+                self.retry_stats.record(model_id, attempt, succeeded=True)
+                return response
+
+    async def _execute_uncached_async(
+        self, model_id, prompt: str, format_instructions=""
+    ):
+        import asyncio
+
+        provider_name, model_url = self._resolve_model(model_id)
+        provider = PROVIDERS.provider(provider_name)
+        limiter = self.rate_limiter.for_provider(provider_name)
+        full_prompt = prompt + format_instructions
+        prompt_tokens = estimate_tokens(full_prompt)
+        breaker = self.circuit_breakers.for_model(model_id)
+        start = time.monotonic()
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                return self._skip_open_circuit(model_id, attempt)
+            try:
+                await limiter.acquire_async(prompt_tokens)
+            except BaseException as exc:
+                breaker.record_failure(attempt_error(provider_name, exc))
+                raise
+            sent = time.monotonic()
+            try:
+                if self.hedge and getattr(provider, "hedgeable", False):
+                    response = await self.hedger.call_async(
+                        provider_name,
+                        lambda: provider.execute_async(model_url, full_prompt),
+                        limiter,
+                        prompt_tokens,
+                    )
+                else:
+                    response = await provider.execute_async(model_url, full_prompt)
+            except ProviderError as error:
+                limiter.release(time.monotonic() - sent, error=error)
+                breaker.record_failure(error)
+                delay = self._retry_delay(model_id, error, attempt, start)
+                if delay is None:
+                    return None
+                await asyncio.sleep(delay)
+                attempt += 1
+            except BaseException as exc:
+                self._abandon_attempt(model_id, attempt, limiter, breaker, sent, exc)
+                raise
+            else:
+                limiter.release(time.monotonic() - sent, estimate_tokens(response))
+                breaker.record_success()
+                self.retry_stats.record(model_id, attempt, succeeded=True)
+                return response
+
+    def _call_provider(
+        self,
+        provider_name: str,
+        provider,
+        model_url: str,
+        prompt: str,
+        stop_detector: StopDetectorFactory | None,
+        limiter,
+        prompt_tokens: int,
+    ):
+        def call():
+            if stop_detector is not None and hasattr(provider, "execute_stream"):
+                return provider.execute_stream(model_url, prompt, stop_detector())
+            return provider.execute(model_url, prompt)
+
+        if self.hedge and getattr(provider, "hedgeable", False):
+            return self.hedger.call(provider_name, call, limiter, prompt_tokens)
+        return call()
+
+    def _abandon_attempt(self, model_id, attempt: int, limiter, breaker, sent, exc):
+        """
+        Free the rate limiter slot and the breaker probe of an attempt that
+        raised something other than a ProviderError, before it propagates.
+        """
+        error = attempt_error(limiter.provider, exc)
+        limiter.release(time.monotonic() - sent, error=error)
+        breaker.record_failure(error)
+        if isinstance(exc, Exception):
+            self.retry_stats.record(model_id, attempt, succeeded=False)
+
+    def _skip_open_circuit(self, model_id, attempt: int):
+        print(f"[WARN] {model_id}: circuit breaker open, request skipped")
+        self.retry_stats.record(model_id, attempt, succeeded=False, skipped=True)
+        return None
+
+    def _retry_delay(self, model_id, error: ProviderError, attempt: int, start):
+        """Seconds to wait before the next attempt, or None when giving up."""
+        delay = self.retry_policy.next_delay(error, attempt, time.monotonic() - start)
+        if delay is None:
+            print(f"[ERROR] {model_id}: {error} (gave up after {attempt + 1} attempts)")
+            self.retry_stats.record(model_id, attempt, succeeded=False)
+        else:
+            print(f"[WARN] {model_id}: {error}; retry {attempt + 1} in {delay:.1f}s")
+        return delay
+
+    def _resolve_model(self, model_id):
+        """Return the provider name and model url that serve model_id."""
+        provider_name = self.get_provider(model_id)
+        model_url = self.get_model_url(model_id)
+        if model_url == "":
+            model_url = self.get_model_url(PROVIDERS.default_model(provider_name))
+        return provider_name, model_url
@@ -0,0 +1,85 @@
+import time
+from typing import Optional
+
+from exceptions.provider_error import ProviderError
+
+
+def provider_error(provider: str, exc: Exception) -> ProviderError:
+    """
+    Wrap an SDK or HTTP exception, extracting the status code and Retry-After
+    header from the shapes used by openai, google-genai, huggingface_hub,
+    ollama, httpx and requests.
+    """
+    if isinstance(exc, ProviderError):
+        return exc
+    response = getattr(exc, "response", None)
+    status = None
+    for candidate in (
+        getattr(exc, "status_code", None),
+        getattr(exc, "code", None),
+        getattr(response, "status_code", None),
+    ):
+        if isinstance(candidate, int) and candidate >= 100:
+            status = candidate
+            break
+    headers = getattr(response, "headers", None)
+    retry_after = parse_retry_after(headers.get("retry-after") if headers else None)
+    return ProviderError(
+        provider,
+        str(exc) or type(exc).__name__,
+        status,
+        retry_after,
+        timed_out=_is_timeout(exc),
+        connection_failed=_is_connection_error(exc),
+    )
+
+
+def attempt_error(provider: str, exc: BaseException) -> ProviderError:
+    """The error an attempt that raised exc is recorded with."""
+    if isinstance(exc, Exception):
+        # A timeout or a lost connection counts against the provider, a bug
+        # on our side does not
+        return provider_error(provider, exc)
+    # A cancelled attempt (499, client closed request) says nothing about the
+    # provider: it neither shrinks the window nor counts as a failure
+    return ProviderError(provider, repr(exc), status=499)
+
+
+def _is_timeout(exc: BaseException) -> bool:
+    # openai.APITimeoutError, httpx.TimeoutException, requests.Timeout and the
+    # builtin TimeoutError, possibly as the cause of the SDK's own exception
+    while exc is not None:
+        if isinstance(exc, TimeoutError) or "Timeout" in type(exc).__name__:
+            return True
+        exc = exc.__cause__
+    return False
+
+
+def _is_connection_error(exc: BaseException) -> bool:
+    # openai.APIConnectionError, httpx.ConnectError and NetworkError,
+    # requests.ConnectionError and the builtin ConnectionError, again possibly
+    # as the cause of the SDK's own exception
+    while exc is not None:
+        if isinstance(exc, ConnectionError) or any(
+            "Connect" in cls.__name__ or "Network" in cls.__name__
+            for cls in type(exc).__mro__
+        ):
+            return True
+        exc = exc.__cause__
+    return False
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given either in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    from email.utils import parsedate_to_datetime
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
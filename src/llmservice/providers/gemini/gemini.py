@@ -0,0 +1,136 @@
+import os
+
+from llmservice.batch import BatchError, wait_for_batch
+from llmservice.providers.errors import provider_error
+from llmservice.providers.lazy_client import LazyClientProvider
+from llmservice.providers.registry import PROVIDERS
+from llmservice.streaming import read_until
+
+_BATCH_SUCCESS_STATES = {"JOB_STATE_SUCCEEDED", "JOB_STATE_PARTIALLY_SUCCEEDED"}
+_BATCH_FINAL_STATES = _BATCH_SUCCESS_STATES | {
+    "JOB_STATE_FAILED",
+    "JOB_STATE_CANCELLED",
+    "JOB_STATE_EXPIRED",
+}
+
+
+def _job_state(job) -> str:
+    return getattr(job.state, "name", None) or str(job.state)
+
+
+@PROVIDERS.register(
+    "gemini",
+    matches=lambda model_id: model_id.startswith("Gemini"),
+    default_model="Gemini25Flash",
+)
+class GeminiProvider(LazyClientProvider):
+    def _build_client(self):
+        api_key = os.environ.get("GOOGLE_API_KEY")
+        if not api_key:
+            print("GOOGLE_API_KEY not set. Gemini API will not be configured.")
+            return None
+        try:
+            from google import genai
+
+            return genai.Client(api_key=api_key)
+        except Exception as e:
+            print(f"Error initializing Gemini client: {e}")
+            return None
+
+    def _build_async_client(self):
+        if self.client is None:
+            return None
+        from google import genai
+
+        # A client per event loop, whose aio interface owns its async connections
+        return genai.Client(api_key=os.environ.get("GOOGLE_API_KEY")).aio
+
+    def execute(self, model_url: str, prompt: str):
+        from pydantic import ValidationError
+
+        client = self._configured(self.client)
+        if client is None:
+            return None
+        try:
+            response = client.models.generate_content(model=model_url, contents=prompt)
+            return response.text
+        except ValidationError as err:
+            print(f"[ERROR] gemini_execute_prompt:ValidationError: {err}")
+            return None
+        except Exception as exc:
+            raise provider_error("gemini", exc) from exc
+
+    def execute_stream(self, model_url: str, prompt: str, detector):
+        """Stream the response until detector is satisfied."""
+        client = self._configured(self.client)
+        if client is None:
+            return None
+        try:
+            stream = client.models.generate_content_stream(
+                model=model_url, contents=prompt
+            )
+            deltas = (chunk.text for chunk in stream)
+            return read_until(deltas, detector, getattr(stream, "close", None))
+        except Exception as exc:
+            raise provider_error("gemini", exc) from exc
+
+    async def execute_async(self, model_url: str, prompt: str):
+        from pydantic import ValidationError
+
+        client = self._configured(self.async_client)
+        if client is None:
+            return None
+        try:
+            response = await client.models.generate_content(
+                model=model_url, contents=prompt
+            )
+            return response.text
+        except ValidationError as err:
+            print(f"[ERROR] gemini_execute_prompt:ValidationError: {err}")
+            return None
+        except Exception as exc:
+            raise provider_error("gemini", exc) from exc
+
+    def execute_batch(self, model_url: str, prompts):
+        """
+        Answer prompts through the Batch API, as inline requests polled until
+        the job ends. Prompts without an answer get None.
+        """
+        client = self._configured(self.client)
+        if client is None:
+            return [None] * len(prompts)
+        try:
+            job = client.batches.create(
+                model=model_url,
+                src=[
+                    {"contents": [{"role": "user", "parts": [{"text": prompt}]}]}
+                    for prompt in prompts
+                ],
+            )
+            print(
+                f"[INFO] gemini: batch {job.name} of {len(prompts)} requests "
+                f"to {model_url} submitted"
+            )
+            job = wait_for_batch(
+                f"gemini batch {job.name}",
+                lambda: client.batches.get(name=job.name),
+                lambda status: _job_state(status) in _BATCH_FINAL_STATES,
+            )
+        except BatchError:
+            raise
+        except Exception as exc:
+            raise provider_error("gemini", exc) from exc
+        if _job_state(job) not in _BATCH_SUCCESS_STATES or job.dest is None:
+            raise BatchError(f"gemini batch {job.name} {_job_state(job)}")
+        # Inline responses come back in the order of the requests
+        answers = [None] * len(prompts)
+        for index, result in enumerate(job.dest.inlined_responses or []):
+            if result.error is None and result.response is not None:
+                answers[index] = result.response.text
+        return answers
+
+    @staticmethod
+    def _configured(client):
+        if client is None:
+            print("[ERROR] gemini_execute_prompt: Gemini client is not configured")
+        return client
@@ -0,0 +1,63 @@
+import os
+import threading
+import weakref
+from typing import Any, Callable, Dict
+
+# Connections kept alive per provider host; also the most used concurrently
+LLM_HTTP_POOL_SIZE = int(os.getenv("LLM_HTTP_POOL_SIZE", "16"))
+
+
+def httpx_limits():
+    import httpx
+
+    return httpx.Limits(
+        max_connections=LLM_HTTP_POOL_SIZE,
+        max_keepalive_connections=LLM_HTTP_POOL_SIZE,
+    )
+
+
+class ClientPool:
+    """
+    Long-lived HTTP clients keyed by host. Each client is created on first use
+    and then shared by every thread, so its connections (and TLS sessions) are
+    reused across prompts.
+    """
+
+    def __init__(self, factory: Callable[[str], Any]):
+        self.factory = factory
+        self._clients: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, host: str) -> Any:
+        client = self._clients.get(host)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(host)
+                if client is None:
+                    client = self.factory(host)
+                    self._clients[host] = client
+        return client
+
+
+class LoopClientPool:
+    """
+    Async counterpart of ClientPool. Async connections belong to the event
+    loop that opened them, so clients are kept per running loop and per host.
+    """
+
+    def __init__(self, factory: Callable[[str], Any]):
+        self.factory = factory
+        self._clients: "weakref.WeakKeyDictionary[Any, Dict[str, Any]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+
+    def get(self, host: str) -> Any:
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = self._clients.setdefault(loop, {})
+            if host not in clients:
+                clients[host] = self.factory(host)
+            return clients[host]
@@ -0,0 +1,114 @@
+import importlib.util
+import os
+
+from llmservice.providers.errors import provider_error
+from llmservice.providers.http_pool import LLM_HTTP_POOL_SIZE
+from llmservice.providers.lazy_client import LazyClientProvider
+from llmservice.providers.registry import PROVIDERS
+from llmservice.streaming import read_until
+
+
+def _new_hf_session():
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_maxsize=LLM_HTTP_POOL_SIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# Every model not claimed by another provider is served by Hugging Face
+@PROVIDERS.register(
+    "huggingface",
+    matches=lambda model_id: True,
+    default_model="Llama323Instruct",
+    catch_all=True,
+)
+class HuggingFaceProvider(LazyClientProvider):
+    def _build_client(self):
+        # Without a key the Inference API is still used, anonymously
+        api_key = os.environ.get("API_KEY_HUGGINGFACE")
+        if not api_key:
+            print(
+                "API_KEY_HUGGINGFACE not set. Hugging Face API will not be configured."
+            )
+        from huggingface_hub import InferenceClient, configure_http_backend
+
+        # huggingface_hub keeps one keep-alive session per thread; size its pool
+        configure_http_backend(backend_factory=_new_hf_session)
+        return InferenceClient(provider="auto", api_key=api_key)
+
+    def _build_async_client(self):
+        # AsyncInferenceClient needs aiohttp, which is an optional dependency
+        if importlib.util.find_spec("aiohttp") is None:
+            return None
+        if self.client is None:
+            return None
+        from huggingface_hub import AsyncInferenceClient
+
+        return AsyncInferenceClient(
+            provider="auto", api_key=os.environ.get("API_KEY_HUGGINGFACE")
+        )
+
+    def execute(self, model_url: str, prompt: str):
+        from pydantic import ValidationError
+
+        try:
+            completion = self.client.chat.completions.create(
+                model=model_url,
+                messages=[{"role": "user", "content": prompt}],
+            )
+            return self._generated_text(completion)
+        except ValidationError as err:
+            print("[ERROR] hf_execute_prompt:ValidationError: ", err)
+            return None
+        except Exception as exc:
+            raise provider_error("huggingface", exc) from exc
+
+    def execute_stream(self, model_url: str, prompt: str, detector):
+        """Stream the response until detector is satisfied."""
+        try:
+            stream = self.client.chat.completions.create(
+                model=model_url,
+                messages=[{"role": "user", "content": prompt}],
+                stream=True,
+            )
+            deltas = (
+                chunk.choices[0].delta.content for chunk in stream if chunk.choices
+            )
+            return read_until(deltas, detector, getattr(stream, "close", None))
+        except Exception as exc:
+            raise provider_error("huggingface", exc) from exc
+
+    async def execute_async(self, model_url: str, prompt: str):
+        import asyncio
+
+        client = self.async_client
+        if client is None:
+            # Without aiohttp the blocking client runs in a worker thread
+            return await asyncio.to_thread(self.execute, model_url, prompt)
+
+        from pydantic import ValidationError
+
+        try:
+            completion = await client.chat.completions.create(
+                model=model_url,
+                messages=[{"role": "user", "content": prompt}],
+            )
+            return self._generated_text(completion)
+        except ValidationError as err:
+            print("[ERROR] hf_execute_prompt:ValidationError: ", err)
+            return None
+        except Exception as exc:
+            raise provider_error("huggingface", exc) from exc
+
+    @staticmethod
+    def _generated_text(completion):
+        generated_text = completion.choices[0].message.content
+        if generated_text is not None and "error" in generated_text:
+            print("[ERROR] hf_execute_prompt: ", generated_text)
+            return None
+        else:
+            return generated_text
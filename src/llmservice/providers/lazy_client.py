@@ -0,0 +1,43 @@
+import threading
+from typing import Any, Optional
+
+from llmservice.providers.http_pool import LoopClientPool
+
+
+class LazyClientProvider:
+    """
+    Base class for provider adapters whose SDK is imported and whose client is
+    built on first use, so that commands which never call the provider do not
+    pay for it.
+    """
+
+    # Remote APIs serve a duplicate request on other capacity, so their slow
+    # requests may be hedged
+    hedgeable = True
+
+    def __init__(self):
+        self._client: Optional[Any] = None
+        self._initialized = False
+        self._lock = threading.Lock()
+        self._async_clients = LoopClientPool(lambda _: self._build_async_client())
+
+    @property
+    def client(self) -> Optional[Any]:
+        """The provider client, or None when the provider is not configured."""
+        if not self._initialized:
+            with self._lock:
+                if not self._initialized:
+                    self._client = self._build_client()
+                    self._initialized = True
+        return self._client
+
+    @property
+    def async_client(self) -> Optional[Any]:
+        """The async client for the running event loop, or None."""
+        return self._async_clients.get("default")
+
+    def _build_client(self) -> Optional[Any]:
+        raise NotImplementedError
+
+    def _build_async_client(self) -> Optional[Any]:
+        raise NotImplementedError
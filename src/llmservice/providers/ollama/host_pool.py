@@ -0,0 +1,148 @@
+import os
+import threading
+import time
+from typing import List, Optional, Set, Tuple
+
+DEFAULT_OLLAMA_HOST = "http://localhost:11434"
+# Seconds between two discoveries of the models of every host
+OLLAMA_DISCOVERY_INTERVAL = float(os.getenv("OLLAMA_DISCOVERY_INTERVAL", "30"))
+_DISCOVERY_TIMEOUT = 5.0  # in seconds
+
+
+def configured_hosts(value: Optional[str] = None) -> List[str]:
+    """The endpoints of OLLAMA_HOST, which may list several comma-separated."""
+    if value is None:
+        value = os.getenv("OLLAMA_HOST", DEFAULT_OLLAMA_HOST)
+    hosts = []
+    for host in value.split(","):
+        host = host.strip().rstrip("/")
+        if not host:
+            continue
+        if "://" not in host:
+            host = f"http://{host}"
+        if host not in hosts:
+            hosts.append(host)
+    return hosts or [DEFAULT_OLLAMA_HOST]
+
+
+def _model_name(name: str) -> str:
+    # Ollama reports "phi4" as "phi4:latest"
+    return name[: -len(":latest")] if name.endswith(":latest") else name
+
+
+class OllamaHost:
+    def __init__(self, url: str):
+        self.url = url
+        self.in_flight = 0
+        self.healthy = True
+        # Models loaded in memory (/api/ps) and pulled (/api/tags); None
+        # until the host has been discovered
+        self.resident: Set[str] = set()
+        self.available: Optional[Set[str]] = None
+
+    def __repr__(self) -> str:
+        return f"OllamaHost({self.url}, in_flight={self.in_flight})"
+
+
+class OllamaHostPool:
+    """
+    Routes each request to the least-loaded healthy host that already has the
+    model loaded, otherwise to one that has it pulled, otherwise to any
+    healthy host.
+
+    The models of every host are discovered through /api/ps and /api/tags by a
+    background thread every OLLAMA_DISCOVERY_INTERVAL seconds. A host that
+    fails discovery or drops a connection is avoided until it answers a
+    discovery again. With a single host there is nothing to choose and no
+    discovery is done.
+    """
+
+    def __init__(
+        self, urls: List[str], discovery_interval: float = OLLAMA_DISCOVERY_INTERVAL
+    ):
+        self.hosts = [OllamaHost(url) for url in urls]
+        self.discovery_interval = discovery_interval
+        self._lock = threading.Lock()
+        self._discovery_started = False
+        self._discovered = threading.Event()
+
+    def acquire(self, model: str) -> OllamaHost:
+        """Pick the host for a request to model and count it as in flight."""
+        self._start_discovery()
+        name = _model_name(model)
+        with self._lock:
+            host = min(self.hosts, key=lambda host: self._rank(host, name))
+            host.in_flight += 1
+            return host
+
+    def release(
+        self, host: OllamaHost, model: str, served: bool, reachable: bool = True
+    ) -> None:
+        with self._lock:
+            host.in_flight -= 1
+            if served:
+                host.resident.add(_model_name(model))
+            if not reachable:
+                host.healthy = False
+
+    def discover(self) -> None:
+        """Refresh the health and the models of every host."""
+        for host in self.hosts:
+            try:
+                resident = self._fetch_models(host.url, "/api/ps")
+                available = self._fetch_models(host.url, "/api/tags")
+            except Exception as e:
+                if host.healthy:
+                    print(f"[WARN] ollama: host {host.url} is unreachable: {e}")
+                with self._lock:
+                    host.healthy = False
+                continue
+            with self._lock:
+                if not host.healthy:
+                    print(f"[INFO] ollama: host {host.url} is back")
+                host.healthy = True
+                host.resident = resident
+                host.available = available | resident
+
+    @staticmethod
+    def _rank(host: OllamaHost, model: str) -> Tuple[int, int]:
+        if not host.healthy:
+            tier = 3
+        elif model in host.resident:
+            tier = 0
+        elif host.available is None or model in host.available:
+            tier = 1
+        else:
+            tier = 2
+        return tier, host.in_flight
+
+    @staticmethod
+    def _fetch_models(url: str, path: str) -> Set[str]:
+        import httpx
+
+        response = httpx.get(f"{url}{path}", timeout=_DISCOVERY_TIMEOUT)
+        response.raise_for_status()
+        return {
+            _model_name(model.get("model") or model["name"])
+            for model in response.json().get("models", [])
+        }
+
+    def _start_discovery(self) -> None:
+        if len(self.hosts) == 1 or self._discovered.is_set():
+            return
+        with self._lock:
+            started, self._discovery_started = self._discovery_started, True
+        if started:
+            # The first requests are routed with the discovered models too
+            self._discovered.wait(timeout=2 * _DISCOVERY_TIMEOUT * len(self.hosts))
+            return
+        self.discover()
+        self._discovered.set()
+        threading.Thread(
+            target=self._discovery_loop, name="ollama-discovery", daemon=True
+        ).start()
+
+    def _discovery_loop(self) -> None:
+        while True:
+            time.sleep(self.discovery_interval)
+            self.discover()
@@ -1,25 +1,118 @@
 import logging
 import os
 
-import requests
+from llmservice.providers.errors import provider_error
+from llmservice.providers.http_pool import (
+    LLM_HTTP_POOL_SIZE,
+    ClientPool,
+    LoopClientPool,
+    httpx_limits,
+)
+from llmservice.providers.ollama.host_pool import OllamaHostPool, configured_hosts
+from llmservice.providers.registry import PROVIDERS
+from llmservice.streaming import read_until
 
-try:
-    from ollama import ChatResponse as OllamaChatResponse
-    from ollama import Client, ResponseError
-except ImportError as exc:
-    msg = "Ollama library is not installed. Please install."
-    raise ImportError(msg) from exc
+CCAD_CHAT_URL = "https://chat.ccad.unc.edu.ar/api/chat/completions"
+# How long Ollama keeps a model loaded after a request. The dispatcher sends
+# the requests of one model back to back, so it stays resident until the
+# queue is drained, even while responses are being compiled.
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
 
 
+def _import_ollama():
+    # Imported on first use: the SDK is only needed when a local model runs
+    try:
+        import ollama
+    except ImportError as exc:
+        msg = "Ollama library is not installed. Please install."
+        raise ImportError(msg) from exc
+    return ollama
+
+
+def _new_ollama_client(host: str):
+    return _import_ollama().Client(host=host, timeout=None, limits=httpx_limits())
+
+
+def _new_ccad_session(url: str):
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=LLM_HTTP_POOL_SIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _new_ollama_async_client(host: str):
+    return _import_ollama().AsyncClient(host=host, timeout=None, limits=httpx_limits())
+
+
+def _new_ccad_async_client(url: str):
+    import httpx
+
+    return httpx.AsyncClient(timeout=None, limits=httpx_limits())
+
+
+# One pooled client per Ollama host and one session for CCAD, shared by threads
+_OLLAMA_CLIENTS = ClientPool(_new_ollama_client)
+_CCAD_SESSIONS = ClientPool(_new_ccad_session)
+# Their async counterparts, one per event loop
+_OLLAMA_ASYNC_CLIENTS = LoopClientPool(_new_ollama_async_client)
+_CCAD_ASYNC_CLIENTS = LoopClientPool(_new_ccad_async_client)
+
+
+@PROVIDERS.register(
+    "ollama",
+    matches=lambda model_id: model_id.startswith("L_"),
+    default_model="L_Phi4",
+)
 class OllamaProvider:
     def __init__(self):
-        self.url = os.getenv("OLLAMA_HOST", "http://localhost:11434")
+        # OLLAMA_HOST may list several hosts; each request goes to the best one
+        self.hosts = OllamaHostPool(configured_hosts())
         self.ccad_token = os.environ.get("CCAD_API_KEY")
         self.with_ccad = os.getenv("WITH_CCAD", "false").lower() == "true"
         if self.with_ccad and not self.ccad_token:
             msg = "CCAD integration is enabled (WITH_CCAD=true) but CCAD_API_KEY environment variable is not set."
             raise RuntimeError(msg)
 
+    @property
+    def backend_count(self) -> int:
+        """Number of hosts serving requests independently."""
+        return 1 if self.with_ccad else len(self.hosts.hosts)
+
+    @property
+    def hedgeable(self) -> bool:
+        """Only CCAD is hedged: a local duplicate competes for the same GPU."""
+        return self.with_ccad
+
+    def execute(self, model_url: str, prompt: str):
+        return self.ollama_execute_prompt(model_url, prompt)
+
+    def execute_stream(self, model_url: str, prompt: str, detector):
+        """Stream the response until detector is satisfied (not with CCAD)."""
+        if self.with_ccad:
+            return self.execute(model_url, prompt)
+        try:
+            return self.chat_with_ollama_model(model_url, prompt, detector)
+        except Exception as exc:
+            raise provider_error("ollama", exc) from exc
+
+    async def execute_async(self, model_url: str, prompt: str):
+        try:
+            if self.with_ccad:
+                response = await self.chat_with_ccad_model_async(model_url, prompt)
+            else:
+                response = await self.chat_with_ollama_model_async(model_url, prompt)
+
+            if response is None:
+                logging.warning(f"OllamaProvider: No response from model {model_url}")
+
+            return response
+        except Exception as exc:
+            raise provider_error("ollama", exc) from exc
+
     def ollama_execute_prompt(self, model, prompt: str, format_instructions=""):
         try:
             response = None
@@ -34,40 +127,105 @@ class OllamaProvider:
 
             return response
         except Exception as exc:
-            print("[ERROR] ollama: general exception: ", exc)
-            return None
+            raise provider_error("ollama", exc) from exc
 
-    def chat_with_ollama_model(self, model, prompt):
-        client = Client(host=self.url, timeout=None)
+    def chat_with_ollama_model(self, model, prompt, detector=None):
+        ollama = _import_ollama()
+        host = self.hosts.acquire(str(model))
+        served = reachable = False
         try:
-            response: OllamaChatResponse = client.chat(
+            response = _OLLAMA_CLIENTS.get(host.url).chat(
                 model=str(model),
                 messages=[{"role": "user", "content": prompt}],
+                keep_alive=OLLAMA_KEEP_ALIVE,
+                stream=detector is not None,
             )
-        except ResponseError as e:
+            if detector is None:
+                content = response.message.content
+            else:
+                # Leaving the stream early closes the connection, which
+                # stops the generation on the Ollama host
+                content = read_until(
+                    (chunk.message.content for chunk in response),
+                    detector,
+                    response.close,
+                )
+            served = reachable = True
+        except ollama.ResponseError as e:
+            reachable = True
             logging.error(
                 f"[ERROR] ollama: {model} error: {e.error} (status={e.status_code})"
             )
-            print(f"[ERROR] ollama: {model} error: {e}")
-            return None
+            raise provider_error("ollama", e) from e
+        finally:
+            self.hosts.release(host, str(model), served, reachable)
+        return content
+
+    async def chat_with_ollama_model_async(self, model, prompt):
+        ollama = _import_ollama()
+        host = self.hosts.acquire(str(model))
+        served = reachable = False
+        try:
+            response = await _OLLAMA_ASYNC_CLIENTS.get(host.url).chat(
+                model=str(model),
+                messages=[{"role": "user", "content": prompt}],
+                keep_alive=OLLAMA_KEEP_ALIVE,
+            )
+            served = reachable = True
+        except ollama.ResponseError as e:
+            reachable = True
+            logging.error(
+                f"[ERROR] ollama: {model} error: {e.error} (status={e.status_code})"
+            )
+            raise provider_error("ollama", e) from e
+        finally:
+            self.hosts.release(host, str(model), served, reachable)
         return response.message.content
 
     def chat_with_ccad_model(self, model, prompt):
-        url = "https://chat.ccad.unc.edu.ar/api/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {self.ccad_token}",
-            "Content-Type": "application/json",
-        }
-        payload = {"model": model, "messages": [{"role": "user", "content": prompt}]}
+        import requests
 
+        url = CCAD_CHAT_URL
         try:
-            response = requests.post(url, headers=headers, json=payload)
+            response = _CCAD_SESSIONS.get(url).post(
+                url,
+                headers=self._ccad_headers(),
+                json=self._ccad_payload(model, prompt),
+            )
             response.raise_for_status()
         except requests.RequestException as e:
             logging.error(f"[ERROR] ccad: {model} error: {e}")
-            print(f"[ERROR] ccad: {model} error: {e}")
-            return None
+            raise provider_error("ccad", e) from e
+        return self._ccad_content(model, response)
+
+    async def chat_with_ccad_model_async(self, model, prompt):
+        import httpx
+
+        url = CCAD_CHAT_URL
+        try:
+            response = await _CCAD_ASYNC_CLIENTS.get(url).post(
+                url,
+                headers=self._ccad_headers(),
+                json=self._ccad_payload(model, prompt),
+            )
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            logging.error(f"[ERROR] ccad: {model} error: {e}")
+            raise provider_error("ccad", e) from e
+        return self._ccad_content(model, response)
+
+    def _ccad_headers(self):
+        return {
+            "Authorization": f"Bearer {self.ccad_token}",
+            "Content-Type": "application/json",
+        }
+
+    @staticmethod
+    def _ccad_payload(model, prompt):
+        return {"model": model, "messages": [{"role": "user", "content": prompt}]}
 
+    @staticmethod
+    def _ccad_content(model, response):
         try:
             data = response.json()
             return data["choices"][0]["message"]["content"]
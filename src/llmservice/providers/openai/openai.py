@@ -0,0 +1,251 @@
+import io
+import json
+import os
+
+from llmservice.batch import BatchError, wait_for_batch
+from llmservice.providers.errors import provider_error
+from llmservice.providers.http_pool import httpx_limits
+from llmservice.providers.lazy_client import LazyClientProvider
+from llmservice.providers.registry import PROVIDERS
+from llmservice.streaming import read_until
+
+TIMEOUT = 600  # in seconds
+
+# Models only served through the legacy chat completions API
+_CHAT_COMPLETION_MODELS = {"gpt-3.5-turbo-instruct"}
+
+_BATCH_FINAL_STATES = {"completed", "failed", "expired", "cancelled"}
+
+
+@PROVIDERS.register(
+    "openai",
+    matches=lambda model_id: model_id.startswith("GPT"),
+    default_model="GPT4oMini",
+)
+class OpenAIProvider(LazyClientProvider):
+    def __init__(self, timeout: int = TIMEOUT):
+        super().__init__()
+        self.timeout = timeout
+
+    def _build_client(self):
+        api_key = os.environ.get("OPENAI_API_KEY")
+        if not api_key:
+            print("OPENAI_API_KEY not set. GPT API will not be configured.")
+            return None
+        try:
+            from openai import DefaultHttpxClient, OpenAI
+
+            # 429s and 5xx reach LLMService, whose rate limiter handles them
+            return OpenAI(
+                api_key=api_key,
+                timeout=self.timeout,
+                max_retries=0,
+                http_client=DefaultHttpxClient(limits=httpx_limits()),
+            )
+        except Exception as e:
+            print(f"Error initializing OpenAI client: {e}")
+            return None
+
+    def _build_async_client(self):
+        if self.client is None:
+            return None
+        from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+        return AsyncOpenAI(
+            api_key=os.environ.get("OPENAI_API_KEY"),
+            timeout=self.timeout,
+            max_retries=0,
+            http_client=DefaultAsyncHttpxClient(limits=httpx_limits()),
+        )
+
+    def execute(self, model_url: str, prompt: str):
+        if model_url in _CHAT_COMPLETION_MODELS:
+            return self.execute_chat_prompt(model_url, prompt)
+        return self.execute_prompt(model_url, prompt)
+
+    def execute_stream(self, model_url: str, prompt: str, detector):
+        """Stream the response until detector is satisfied."""
+        client = self._configured(self.client)
+        if client is None:
+            return None
+        try:
+            if model_url in _CHAT_COMPLETION_MODELS:
+                stream = client.chat.completions.create(
+                    model=model_url,
+                    messages=[{"role": "user", "content": prompt}],
+                    stream=True,
+                )
+                deltas = (
+                    chunk.choices[0].delta.content for chunk in stream if chunk.choices
+                )
+            else:
+                stream = client.responses.create(
+                    model=model_url, input=prompt, stream=True
+                )
+                deltas = (
+                    event.delta
+                    for event in stream
+                    if event.type == "response.output_text.delta"
+                )
+            return read_until(deltas, detector, stream.close)
+        except Exception as e:
+            raise provider_error("openai", e) from e
+
+    async def execute_async(self, model_url: str, prompt: str):
+        if model_url in _CHAT_COMPLETION_MODELS:
+            return await self.execute_chat_prompt_async(model_url, prompt)
+        client = self._configured(self.async_client)
+        if client is None:
+            return None
+        try:
+            response = await client.responses.create(model=model_url, input=prompt)
+        except Exception as e:
+            raise provider_error("openai", e) from e
+        return response.output_text
+
+    async def execute_chat_prompt_async(self, model_url: str, prompt: str):
+        from pydantic import ValidationError
+
+        client = self._configured(self.async_client)
+        if client is None:
+            return None
+        try:
+            messages = [{"role": "user", "content": prompt}]
+            completion = await client.chat.completions.create(
+                model=model_url, messages=messages
+            )
+            return self._chat_content(completion)
+        except ValidationError as err:
+            print("gpt_execute_prompt:ValidationError: ", err)
+            return None
+        except Exception as exc:
+            raise provider_error("openai", exc) from exc
+
+    def execute_prompt(self, model_url: str, prompt: str):
+        client = self._configured(self.client)
+        if client is None:
+            return None
+        try:
+            response = client.responses.create(model=model_url, input=prompt)
+        except Exception as e:
+            raise provider_error("openai", e) from e
+        return response.output_text
+
+    def execute_chat_prompt(self, model_url: str, prompt: str):
+        from pydantic import ValidationError
+
+        client = self._configured(self.client)
+        if client is None:
+            return None
+        try:
+            messages = [{"role": "user", "content": prompt}]
+            completion = client.chat.completions.create(
+                model=model_url, messages=messages
+            )
+            return self._chat_content(completion)
+        except ValidationError as err:
+            print("gpt_execute_prompt:ValidationError: ", err)
+            return None
+        except Exception as exc:
+            raise provider_error("openai", exc) from exc
+
+    def execute_batch(self, model_url: str, prompts):
+        """
+        Answer prompts through the Batch API: they are uploaded as one JSONL
+        file and the batch is polled until it ends. Prompts without an answer
+        get None.
+        """
+        client = self._configured(self.client)
+        if client is None:
+            return [None] * len(prompts)
+        chat = model_url in _CHAT_COMPLETION_MODELS
+        endpoint = "/v1/chat/completions" if chat else "/v1/responses"
+        lines = []
+        for index, prompt in enumerate(prompts):
+            if chat:
+                body = {
+                    "model": model_url,
+                    "messages": [{"role": "user", "content": prompt}],
+                }
+            else:
+                body = {"model": model_url, "input": prompt}
+            request = {
+                "custom_id": str(index),
+                "method": "POST",
+                "url": endpoint,
+                "body": body,
+            }
+            lines.append(json.dumps(request))
+        try:
+            batch_file = client.files.create(
+                file=("batch.jsonl", io.BytesIO("\n".join(lines).encode())),
+                purpose="batch",
+            )
+            batch = client.batches.create(
+                input_file_id=batch_file.id,
+                endpoint=endpoint,
+                completion_window="24h",
+            )
+            print(
+                f"[INFO] openai: batch {batch.id} of {len(prompts)} requests "
+                f"to {model_url} submitted"
+            )
+            batch = wait_for_batch(
+                f"openai batch {batch.id}",
+                lambda: client.batches.retrieve(batch.id),
+                lambda status: status.status in _BATCH_FINAL_STATES,
+            )
+            if batch.status != "completed" or not batch.output_file_id:
+                raise BatchError(f"openai batch {batch.id} {batch.status}")
+            output = client.files.content(batch.output_file_id).text
+        except BatchError:
+            raise
+        except Exception as e:
+            raise provider_error("openai", e) from e
+        answers = [None] * len(prompts)
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            result = json.loads(line)
+            response = result.get("response") or {}
+            if response.get("status_code") != 200:
+                continue
+            body = response.get("body") or {}
+            answers[int(result["custom_id"])] = (
+                self._chat_body_content(body) if chat else self._output_text(body)
+            )
+        return answers
+
+    @staticmethod
+    def _chat_body_content(body):
+        choices = body.get("choices") or []
+        if not choices or choices[0]["message"].get("refusal"):
+            return None
+        return choices[0]["message"].get("content")
+
+    @staticmethod
+    def _output_text(body):
+        # The JSON counterpart of Response.output_text
+        texts = [
+            content["text"]
+            for item in body.get("output") or []
+            if item.get("type") == "message"
+            for content in item.get("content") or []
+            if content.get("type") == "output_text"
+        ]
+        return "".join(texts) if texts else None
+
+    @staticmethod
+    def _chat_content(completion):
+        gpt_response = completion.choices[0].message
+        if gpt_response.refusal:
+            print("gpt_execute_prompt:gpt_response.refusal: ", gpt_response.refusal)
+            return None
+        else:
+            return gpt_response.content
+
+    @staticmethod
+    def _configured(client):
+        if client is None:
+            print("gpt_execute_prompt: OpenAI client is not configured")
+        return client
@@ -0,0 +1,101 @@
+import threading
+from typing import Any, Callable, Dict, List
+
+
+class ModelRecord:
+    """Where a model is served: the registered provider and the model's URL."""
+
+    def __init__(self, model_id: str, model_url: str, provider_name: str):
+        self.model_id = model_id
+        self.model_url = model_url
+        self.provider_name = provider_name
+
+
+class _ProviderEntry:
+    def __init__(
+        self,
+        name: str,
+        factory: Callable[[], Any],
+        matches: Callable[[str], bool],
+        default_model: str,
+        catch_all: bool,
+    ):
+        self.name = name
+        self.factory = factory
+        self.matches = matches
+        self.default_model = default_model
+        self.catch_all = catch_all
+
+
+class ProviderRegistry:
+    """
+    Providers register themselves with a predicate over model ids. The
+    supported models are then indexed once, case-insensitively, so routing a
+    prompt is a single dict lookup. Provider instances are created on first
+    use and shared afterwards.
+
+    A provider must implement execute(model_url, prompt) -> Optional[str].
+    """
+
+    def __init__(self):
+        self._entries: List[_ProviderEntry] = []
+        self._instances: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def register(
+        self,
+        name: str,
+        matches: Callable[[str], bool],
+        default_model: str,
+        catch_all: bool = False,
+    ):
+        """
+        Class decorator registering a provider. catch_all providers serve the
+        models that no other provider claims.
+        """
+
+        def decorator(factory):
+            self._entries.append(
+                _ProviderEntry(name, factory, matches, default_model, catch_all)
+            )
+            return factory
+
+        return decorator
+
+    def provider_name_for(self, model_id: str) -> str:
+        entries = sorted(self._entries, key=lambda entry: entry.catch_all)
+        for entry in entries:
+            if entry.catch_all or entry.matches(model_id):
+                return entry.name
+        raise ValueError(f"No provider registered for model {model_id}")
+
+    def build_index(self, models: Dict[str, str]) -> Dict[str, ModelRecord]:
+        """Index {model id: model url} by upper-cased model id."""
+        return {
+            model_id.upper(): ModelRecord(
+                model_id, model_url, self.provider_name_for(model_id)
+            )
+            for model_id, model_url in models.items()
+        }
+
+    def default_model(self, provider_name: str) -> str:
+        return self._entry(provider_name).default_model
+
+    def provider(self, provider_name: str) -> Any:
+        instance = self._instances.get(provider_name)
+        if instance is None:
+            with self._lock:
+                instance = self._instances.get(provider_name)
+                if instance is None:
+                    instance = self._entry(provider_name).factory()
+                    self._instances[provider_name] = instance
+        return instance
+
+    def _entry(self, provider_name: str) -> _ProviderEntry:
+        for entry in self._entries:
+            if entry.name == provider_name:
+                return entry
+        raise ValueError(f"Unknown provider: {provider_name}")
+
+
+PROVIDERS = ProviderRegistry()
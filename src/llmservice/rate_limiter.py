@@ -0,0 +1,222 @@
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from exceptions.provider_error import ProviderError
+
+# (requests per minute, tokens per minute) accepted by each provider, 0 meaning
+# unlimited. Each value can be overridden with LLM_RPM_<PROVIDER> and
+# LLM_TPM_<PROVIDER> (e.g. LLM_TPM_OPENAI=2000000).
+DEFAULT_PROVIDER_RATE_LIMITS = {
+    "ollama": (0, 0),
+    "openai": (500, 200000),
+    "gemini": (60, 250000),
+    "huggingface": (300, 0),
+}
+
+# A response slower than this multiple of the average latency is a sign of
+# congestion and shrinks the concurrency window like a 429 does
+LATENCY_SPIKE_FACTOR = float(os.getenv("LLM_LATENCY_SPIKE_FACTOR", "3"))
+# Pause, in seconds, after a 429 that carries no Retry-After header
+THROTTLE_PAUSE = float(os.getenv("LLM_THROTTLE_PAUSE", "1"))
+
+_LATENCY_WEIGHT = 0.2  # weight of the newest sample in the average latency
+_LATENCY_MIN_SAMPLES = 5
+_SLOT_WAIT = 1.0  # fallback wake-up while waiting for a released slot
+_ASYNC_POLL = 0.05
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Rough token count of text, at about four characters per token."""
+    return len(text) // 4 + 1 if text else 0
+
+
+def _budget_from_env(provider: str, kind: str, default: int) -> int:
+    value = os.getenv(f"LLM_{kind}_{provider.upper()}")
+    if value is None:
+        return default
+    return max(0, int(value))
+
+
+class TokenBucket:
+    """Refills rate_per_minute units per minute and holds a minute's worth."""
+
+    def __init__(self, rate_per_minute: int):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(rate_per_minute)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def delay(self, cost: float, now: float) -> float:
+        """Seconds until cost units are available, 0 if they already are."""
+        self._refill(now)
+        # A request larger than the whole bucket only waits for a full bucket
+        missing = min(cost, self.capacity) - self.level
+        return max(0.0, missing / self.rate)
+
+    def consume(self, cost: float, now: float) -> None:
+        # The level may go negative when output tokens are charged afterwards
+        self._refill(now)
+        self.level -= cost
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self.updated)
+        self.level = min(self.capacity, self.level + elapsed * self.rate)
+        self.updated = now
+
+
+class ProviderLimiter:
+    """
+    Admission control for the requests sent to one provider.
+
+    A request is admitted when the requests/min and tokens/min buckets can pay
+    for it and the number of in-flight requests is below the concurrency
+    window. The window follows AIMD: it grows by about one request per window
+    of successful responses and is halved on a 429, a 5xx, a failed connection
+    or a latency spike, so throughput settles at what the backend sustains.
+    A Retry-After received from the provider pauses every admission.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        max_concurrency: int,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+    ):
+        self.provider = provider
+        self.max_concurrency = max_concurrency
+        self.window = float(max_concurrency)
+        self.in_flight = 0
+        self.requests = (
+            TokenBucket(requests_per_minute) if requests_per_minute else None
+        )
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.paused_until = 0.0
+        self.average_latency: Optional[float] = None
+        self.latency_samples = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self, prompt_tokens: int) -> None:
+        """Block until a request of prompt_tokens tokens may be sent."""
+        with self._condition:
+            while True:
+                delay = self._try_admit(prompt_tokens)
+                if delay is None:
+                    return
+                self._condition.wait(timeout=delay)
+
+    def try_acquire(self, prompt_tokens: int) -> bool:
+        """Admit the request only if it may be sent right away."""
+        with self._condition:
+            return self._try_admit(prompt_tokens) is None
+
+    async def acquire_async(self, prompt_tokens: int) -> None:
+        import asyncio
+
+        while True:
+            with self._condition:
+                delay = self._try_admit(prompt_tokens)
+            if delay is None:
+                return
+            await asyncio.sleep(min(delay, _ASYNC_POLL))
+
+    def release(
+        self,
+        latency: float,
+        output_tokens: int = 0,
+        error: Optional[ProviderError] = None,
+    ) -> None:
+        """Record the outcome of an admitted request and free its slot."""
+        with self._condition:
+            now = time.monotonic()
+            self.in_flight -= 1
+            if self.tokens is not None and output_tokens:
+                self.tokens.consume(output_tokens, now)
+            if error is not None:
+                if error.overloaded:
+                    self._decrease(now)
+                pause = error.retry_after
+                if pause is None and error.throttled:
+                    pause = THROTTLE_PAUSE
+                if pause:
+                    self.paused_until = max(self.paused_until, now + pause)
+            else:
+                if self._is_latency_spike(latency):
+                    self._decrease(now)
+                else:
+                    self.window = min(
+                        float(self.max_concurrency), self.window + 1.0 / self.window
+                    )
+                self._record_latency(latency)
+            self._condition.notify_all()
+
+    def _try_admit(self, prompt_tokens: int) -> Optional[float]:
+        """Admit the request, or return the seconds to wait before retrying."""
+        now = time.monotonic()
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.in_flight >= int(self.window):
+            return _SLOT_WAIT
+        delay = 0.0
+        if self.requests is not None:
+            delay = self.requests.delay(1, now)
+        if self.tokens is not None:
+            delay = max(delay, self.tokens.delay(prompt_tokens, now))
+        if delay > 0:
+            return delay
+        if self.requests is not None:
+            self.requests.consume(1, now)
+        if self.tokens is not None:
+            self.tokens.consume(prompt_tokens, now)
+        self.in_flight += 1
+        return None
+
+    def _decrease(self, now: float) -> None:
+        # Requests in flight when congestion started fail together; they
+        # shrink the window once, not once each
+        if now - self._last_decrease < (self.average_latency or THROTTLE_PAUSE):
+            return
+        self.window = max(1.0, self.window / 2)
+        self._last_decrease = now
+
+    def _is_latency_spike(self, latency: float) -> bool:
+        return (
+            self.latency_samples >= _LATENCY_MIN_SAMPLES
+            and latency > LATENCY_SPIKE_FACTOR * self.average_latency
+        )
+
+    def _record_latency(self, latency: float) -> None:
+        if self.average_latency is None:
+            self.average_latency = latency
+        else:
+            self.average_latency += _LATENCY_WEIGHT * (latency - self.average_latency)
+        self.latency_samples += 1
+
+
+class RateLimiter:
+    """The ProviderLimiter of each provider, created on first use."""
+
+    def __init__(self, rate_limits: Optional[Dict[str, Tuple[int, int]]] = None):
+        self.rate_limits = dict(DEFAULT_PROVIDER_RATE_LIMITS)
+        self.rate_limits.update(rate_limits or {})
+        self._limiters: Dict[str, ProviderLimiter] = {}
+        self._lock = threading.Lock()
+
+    def for_provider(self, provider: str) -> ProviderLimiter:
+        from llmservice.dispatcher import provider_concurrency
+
+        with self._lock:
+            limiter = self._limiters.get(provider)
+            if limiter is None:
+                rpm, tpm = self.rate_limits.get(provider, (0, 0))
+                limiter = ProviderLimiter(
+                    provider,
+                    provider_concurrency(provider),
+                    _budget_from_env(provider, "RPM", rpm),
+                    _budget_from_env(provider, "TPM", tpm),
+                )
+                self._limiters[provider] = limiter
+            return limiter
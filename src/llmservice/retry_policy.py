@@ -0,0 +1,103 @@
+import os
+import random
+import threading
+from typing import Dict, Optional
+
+from exceptions.provider_error import ProviderError
+
+LLM_RETRY_MAX_ATTEMPTS = int(os.getenv("LLM_RETRY_MAX_ATTEMPTS", "5"))
+LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "1"))  # in seconds
+LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", "60"))  # in seconds
+# Time budget of a request across all of its attempts, in seconds
+LLM_RETRY_DEADLINE = float(os.getenv("LLM_RETRY_DEADLINE", "1800"))
+
+# Statuses worth retrying besides 5xx; any other 4xx (bad request, missing
+# key, unknown model...) fails the same way every time
+_TRANSIENT_STATUSES = {408, 409, 425, 429}
+
+_COUNTERS = ("requests", "retries", "recovered", "failed", "skipped")
+
+
+class RetryPolicy:
+    """
+    Decides whether a failed request is sent again and when.
+
+    Timeouts, failed connections, 429 and 5xx are transient; the delay before
+    retry n is drawn uniformly from [0, min(max_delay, base_delay * 2^n)]
+    (full jitter, so concurrent requests do not retry in lockstep) and is
+    never shorter than the provider's Retry-After. A request is abandoned after
+    max_attempts attempts or when the next one would start past the deadline.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = LLM_RETRY_MAX_ATTEMPTS,
+        base_delay: float = LLM_RETRY_BASE_DELAY,
+        max_delay: float = LLM_RETRY_MAX_DELAY,
+        deadline: float = LLM_RETRY_DEADLINE,
+        rng: Optional[random.Random] = None,
+    ):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.rng = rng or random.Random()
+
+    @staticmethod
+    def is_transient(error: ProviderError) -> bool:
+        if error.timed_out or error.connection_failed:
+            return True
+        # Without a status the request failed on our side (a response that
+        # could not be parsed, an SDK bug...) and would fail again
+        if error.status is None:
+            return False
+        return error.status >= 500 or error.status in _TRANSIENT_STATUSES
+
+    def backoff(self, retry: int) -> float:
+        cap = min(self.max_delay, self.base_delay * (2**retry))
+        return self.rng.uniform(0, cap)
+
+    def next_delay(
+        self, error: ProviderError, attempt: int, elapsed: float
+    ) -> Optional[float]:
+        """
+        Seconds to wait before retrying after the failed attempt number
+        attempt (0 for the first one), or None to give up.
+        """
+        if not self.is_transient(error) or attempt + 1 >= self.max_attempts:
+            return None
+        delay = max(self.backoff(attempt), error.retry_after or 0.0)
+        if elapsed + delay >= self.deadline:
+            return None
+        return delay
+
+
+class RetryStats:
+    """
+    Per-model counts of requests, retries, requests given up on and requests
+    skipped because the model's circuit breaker was open.
+    """
+
+    def __init__(self):
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self, model_id: str, retries: int, succeeded: bool, skipped: bool = False
+    ) -> None:
+        with self._lock:
+            stats = self._stats.get(model_id)
+            if stats is None:
+                stats = self._stats[model_id] = dict.fromkeys(_COUNTERS, 0)
+            stats["requests"] += 1
+            stats["retries"] += retries
+            if skipped:
+                stats["skipped"] += 1
+            elif not succeeded:
+                stats["failed"] += 1
+            elif retries:
+                stats["recovered"] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {model_id: dict(stats) for model_id, stats in self._stats.items()}
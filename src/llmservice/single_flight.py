@@ -0,0 +1,65 @@
+import threading
+from typing import Any, Awaitable, Callable, Dict, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that have the same key: the first caller runs
+    the function and the callers arriving while it runs get its result, or
+    its exception. Nothing is kept once the call has returned.
+    """
+
+    def __init__(self):
+        self.shared = 0  # calls answered by another caller's call
+        # key -> the concurrent.futures.Future of the call
+        self._calls: Dict[str, Any] = {}
+        # (event loop, key) -> the asyncio task of the call
+        self._tasks: Dict[Tuple[object, str], Awaitable] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        from concurrent.futures import Future
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+            else:
+                self.shared += 1
+        if not leader:
+            return call.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    async def do_async(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        import asyncio
+
+        # Tasks cannot be awaited from another event loop, so each loop
+        # coalesces its own calls
+        flight = (asyncio.get_running_loop(), key)
+        with self._lock:
+            task = self._tasks.get(flight)
+            if task is None:
+                task = self._tasks[flight] = asyncio.ensure_future(fn())
+                task.add_done_callback(lambda _: self._forget(flight, task))
+            else:
+                self.shared += 1
+        # A cancelled caller does not cancel the call the others wait for
+        return await asyncio.shield(task)
+
+    def _forget(self, flight, task) -> None:
+        with self._lock:
+            if self._tasks.get(flight) is task:
+                del self._tasks[flight]
@@ -0,0 +1,74 @@
+from typing import Callable, Iterable, Optional
+
+# A stop detector is fed the streamed response chunk by chunk; feed returns
+# True once the response holds everything the caller needs, and the request
+# is then cancelled. Callers pass a factory (usually the detector class), so
+# every attempt of a request starts with a fresh detector.
+StopDetectorFactory = Callable[[], object]
+
+_THINK_OPEN = "<think>"
+_THINK_CLOSE = "</think>"
+
+
+class ThinkBlockFilter:
+    """
+    Removes the <think>...</think> reasoning of models such as DeepSeek-R1
+    from a streamed response, so code and verdicts drafted while reasoning
+    are not taken for the answer. Tags split across chunks are handled.
+    """
+
+    def __init__(self):
+        self._pending = ""
+        self._in_think = False
+
+    def feed(self, chunk: str) -> str:
+        """Return the part of chunk that lies outside think blocks."""
+        text = self._pending + chunk
+        self._pending = ""
+        visible = []
+        while text:
+            tag = _THINK_CLOSE if self._in_think else _THINK_OPEN
+            index = text.find(tag)
+            if index == -1:
+                # Hold back a possible partial tag until the next chunk
+                keep = _partial_tag_length(text, tag)
+                if not self._in_think:
+                    visible.append(text[: len(text) - keep])
+                self._pending = text[len(text) - keep :]
+                break
+            if not self._in_think:
+                visible.append(text[:index])
+            text = text[index + len(tag) :]
+            self._in_think = not self._in_think
+        return "".join(visible)
+
+
+def _partial_tag_length(text: str, tag: str) -> int:
+    for length in range(min(len(tag) - 1, len(text)), 0, -1):
+        if text.endswith(tag[:length]):
+            return length
+    return 0
+
+
+def read_until(
+    deltas: Iterable[Optional[str]],
+    detector,
+    close: Optional[Callable[[], None]] = None,
+) -> str:
+    """
+    Concatenate the streamed deltas until the detector is satisfied or the
+    stream ends. close is called in both cases; closing the stream early
+    drops the connection, which makes the server stop generating.
+    """
+    parts = []
+    try:
+        for delta in deltas:
+            if not delta:
+                continue
+            parts.append(delta)
+            if detector.feed(delta):
+                break
+    finally:
+        if close is not None:
+            close()
+    return "".join(parts)
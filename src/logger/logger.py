@@ -36,6 +36,19 @@ class Logger:
     def log_debug(self, message: str) -> None:
         self.logger.debug(message)
 
+    def append_file(self, path: str) -> None:
+        """Copy the contents of another log file verbatim into this log."""
+        with open(path, "r") as file:
+            content = file.read()
+        for handler in self.logger.handlers:
+            if isinstance(handler, logging.StreamHandler):
+                handler.acquire()
+                try:
+                    handler.stream.write(content)
+                    handler.flush()
+                finally:
+                    handler.release()
+
     def close(self) -> None:
         # Close all handlers for this specific logger
         for handler in self.logger.handlers:
@@ -1,7 +1,10 @@
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 from subject.subject import Subject
 from testgen.java_test_generator import JavaTestGenerator
+from testgen.model_test_processor import ModelTestProcessor
+from testgen.pipeline import TestGenPipeline
 from logger.logger import Logger
 
 
@@ -17,40 +20,104 @@ class JavaLLMTestGenService:
         self.test_generator = test_generator
         self.logger = logger
         self.timestamp_logger = timestamp_logger
-        self.assertions_from_specfuzzer = self.subject.collect_specs()
+        # Sorted so that the merged test suite does not depend on set ordering
+        self.assertions_from_specfuzzer = sorted(self.subject.collect_specs())
 
     def run(self, prompts: list, models: list):
         self.logger.log(f"Starting test generation for {self.subject}...")
-        total_time = 0.0
+        start_time = time.time()
 
-        for assertion in self.assertions_from_specfuzzer:
-            test_assertion = self.subject.specs.transform_specification_vars(assertion)
-            self.logger.log(f"Generating test for assertion: {test_assertion}")
-            start_time = time.time()
-
-            # Use LLMs to generate tests that invalidate the assertion
-            generated_tests_by_model = self.test_generator.generate_test(
-                class_code=self.subject.class_code,
-                method_code=self.subject.method_code,
-                spec=test_assertion,
-                raw_spec=assertion,
-                prompt_ids=prompts,
-                models_ids=models,
+        # Every request is submitted up front so the dispatcher can keep each
+        # provider busy; the responses of each assertion are then processed
+        # concurrently. The dispatcher bounds the in-flight requests.
+        submitted = [
+            (
+                assertion,
+                time.time(),
+                self._submit_for_assertion(assertion, prompts, models),
             )
-            elapsed_time = time.time() - start_time
-            total_time += elapsed_time
+            for assertion in self.assertions_from_specfuzzer
+        ]
+        max_workers = max(1, self.test_generator.dispatcher.max_concurrency)
+        with ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="testgen-spec"
+        ) as executor:
+            futures = [
+                executor.submit(
+                    self._collect_for_assertion, assertion, start, requests, models
+                )
+                for assertion, start, requests in submitted
+            ]
 
-            # Add tests organized by model
-            for model_id, tests in generated_tests_by_model.items():
-                for test in tests:
-                    self.subject.test_suite.add_test_by_model(model_id, test)
-
-            self.timestamp_logger.log(
-                f"Test generation for assertion '{test_assertion}' took "
-                f"{elapsed_time:.2f} seconds"
-            )
+            # Merge results in assertion order to keep the suite deterministic
+            for future in futures:
+                generated_tests_by_model = future.result()
+                for model_id, tests in generated_tests_by_model.items():
+                    for test in tests:
+                        self.subject.test_suite.add_test_by_model(model_id, test)
 
+        total_time = time.time() - start_time
         self.timestamp_logger.log(
             f"Total test generation time: {total_time:.2f} seconds"
         )
         self.logger.log(f"Finished test generation for {self.subject}.")
+
+    def run_pipeline(
+        self, prompts: list, models: list, model_processor: ModelTestProcessor
+    ) -> dict:
+        """Generate, fix and compile tests as overlapping streaming stages."""
+        pipeline = TestGenPipeline(
+            self.subject,
+            self.test_generator,
+            model_processor,
+            self.logger,
+            self.timestamp_logger,
+        )
+        return pipeline.run(prompts, models)
+
+    def prefetch_batch(self, prompts: list, models: list) -> None:
+        """Render every test generation prompt and submit them as batches."""
+        requests = []
+        for assertion in self.assertions_from_specfuzzer:
+            test_assertion = self.subject.specs.transform_specification_vars(assertion)
+            for pid in prompts:
+                prompt = self.test_generator._generate_prompt(
+                    pid,
+                    self.subject.class_code,
+                    self.subject.method_code,
+                    test_assertion,
+                )
+                for mid in models:
+                    requests.append(
+                        (mid, prompt.generate_prompt(), prompt.format_instructions)
+                    )
+        self.logger.log(f"Submitting {len(requests)} LLM requests as batches...")
+        self.test_generator.llm_service.prefetch_batch(requests)
+
+    def _submit_for_assertion(self, assertion: str, prompts: list, models: list):
+        test_assertion = self.subject.specs.transform_specification_vars(assertion)
+        self.logger.log(f"Generating test for assertion: {test_assertion}")
+
+        # Use LLMs to generate tests that invalidate the assertion
+        return self.test_generator.submit_test(
+            class_code=self.subject.class_code,
+            method_code=self.subject.method_code,
+            spec=test_assertion,
+            prompt_ids=prompts,
+            models_ids=models,
+        )
+
+    def _collect_for_assertion(
+        self, assertion: str, start_time: float, requests: list, models: list
+    ):
+        test_assertion = self.subject.specs.transform_specification_vars(assertion)
+        generated_tests_by_model = self.test_generator.collect_tests(
+            requests, models, test_assertion, raw_spec=assertion
+        )
+        elapsed_time = time.time() - start_time
+
+        self.timestamp_logger.log(
+            f"Test generation for assertion '{test_assertion}' took "
+            f"{elapsed_time:.2f} seconds"
+        )
+        return generated_tests_by_model
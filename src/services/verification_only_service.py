@@ -4,6 +4,7 @@ from collections import defaultdict
 from generators.verification_only import VerificationOnlyGenerator
 from logger.logger import Logger
 from prompt.prompt_template import PromptID
+from prompt.template_factory import PromptTemplateFactory
 from subject.subject import Subject
 from verification.verdict_parser import VerificationVerdict
 
@@ -20,6 +21,27 @@ class VerificationOnlyService:
         self.logger = logger
         self.assertions_from_specfuzzer = sorted(self.subject.collect_specs())
 
+    def prefetch_batch(self, prompts: list[PromptID], models: list[str]) -> None:
+        """Render every verification prompt and submit them as batches."""
+        requests = []
+        for assertion in self.assertions_from_specfuzzer:
+            transformed_spec = self.subject.specs.transform_specification_vars(
+                assertion
+            )
+            for pid in prompts:
+                prompt = PromptTemplateFactory.create_prompt(
+                    pid,
+                    self.subject.class_code,
+                    self.subject.method_code,
+                    transformed_spec,
+                )
+                for mid in models:
+                    requests.append(
+                        (mid, prompt.generate_prompt(), prompt.format_instructions)
+                    )
+        self.logger.log(f"Submitting {len(requests)} LLM requests as batches...")
+        self.generator.llm_service.prefetch_batch(requests)
+
     def run(
         self, prompts: list[PromptID], models: list[str]
     ) -> dict[str, list[VerificationVerdict]]:
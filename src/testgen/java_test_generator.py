@@ -1,9 +1,13 @@
 import os
 from typing import List
 
-from java_code_extractor.java_code_extractor import JavaCodeExtractor
+from java_code_extractor.java_code_extractor import (
+    JavaCodeExtractor,
+    StreamingTestDetector,
+)
 from java_test_compiler.java_test_compiler import JavaTestCompiler
 from java_test_fixer.java_test_fixer import JavaTestFixer
+from llmservice.dispatcher import LLMDispatcher
 from llmservice.llm_service import LLMService
 from logger.logger import Logger
 from prompt.prompt_template import PromptID
@@ -15,11 +19,20 @@ MAX_COMPILE_ATTEMPTS = int(os.getenv("MAX_COMPILE_ATTEMPTS", "3"))
 
 
 class JavaTestGenerator:
-    def __init__(self, subject: Subject, logger: Logger):
-        self.llm_service = LLMService()
+    def __init__(
+        self,
+        subject: Subject,
+        logger: Logger,
+        llm_service: LLMService | None = None,
+        compiler: JavaTestCompiler | None = None,
+        stream: bool = False,
+    ):
+        self.llm_service = llm_service or LLMService()
+        # When streaming, responses are cut once they hold a complete @Test
+        self.stop_detector = StreamingTestDetector if stream else None
+        self.dispatcher = LLMDispatcher(self.llm_service)
         self.subject = subject
-        self.prompts = []
-        self.compiler = JavaTestCompiler(str(self.subject.class_path_src))
+        self.compiler = compiler or JavaTestCompiler(str(self.subject.class_path_src))
         self.logger = logger
 
     def generate_test(
@@ -31,66 +44,92 @@ class JavaTestGenerator:
         prompt_ids=None,
         models_ids=None,
     ):
-        prompt_ids = prompt_ids or PromptID.all()
         models_ids = models_ids or []
+        requests = self.submit_test(
+            class_code, method_code, spec, prompt_ids, models_ids
+        )
+        return self.collect_tests(requests, models_ids, spec, raw_spec)
 
-        generated_test_cases_by_model = {}
-        self.prompts = []
+    def submit_test(
+        self, class_code, method_code, spec, prompt_ids=None, models_ids=None
+    ) -> list:
+        """Send every (model, prompt) request for spec to the dispatcher."""
+        prompt_ids = prompt_ids or PromptID.all()
+        models_ids = models_ids or []
 
-        for pid in prompt_ids:
-            self._generate_prompts(pid, class_code, method_code, spec)
+        prompts = [
+            self._generate_prompt(pid, class_code, method_code, spec)
+            for pid in prompt_ids
+        ]
 
+        # Fan out every (model, prompt) pair; results come back in job order
+        requests = []
         for mid in models_ids:
-            if mid not in generated_test_cases_by_model:
-                generated_test_cases_by_model[mid] = []
-
             for pid in prompt_ids:
-                llm_generated_cases = self._execute(pid, mid, spec, raw_spec)
-                generated_test_cases_by_model[mid].extend(llm_generated_cases)
+                for prompt in prompts:
+                    if prompt.id != pid:
+                        continue
+                    requests.append(
+                        (
+                            mid,
+                            prompt,
+                            self.dispatcher.submit(mid, self._execute, prompt, mid),
+                        )
+                    )
+        return requests
+
+    def collect_tests(self, requests: list, models_ids, spec, raw_spec: str = ""):
+        """Wait for the requests of submit_test and process their responses."""
+        # Responses are processed here rather than on the dispatcher threads:
+        # fixing a test sends new prompts through the dispatcher
+        generated_test_cases_by_model = {mid: [] for mid in models_ids or []}
+        for mid, prompt, future in requests:
+            generated_test_cases_by_model[mid].extend(
+                self.process_response(future.result(), prompt.id, mid, spec, raw_spec)
+            )
 
         return generated_test_cases_by_model
 
-    def _generate_prompts(self, prompt_id, class_code, method_code, spec):
-        # if not any(p.id == prompt_id for p in self.prompts):
-        prompt = PromptTemplateFactory.create_prompt(
+    def _generate_prompt(self, prompt_id, class_code, method_code, spec):
+        return PromptTemplateFactory.create_prompt(
             prompt_id, class_code, method_code, spec
         )
-        self.prompts.append(prompt)
 
-    def _execute(self, pid, mid, spec, raw_spec: str) -> List[str]:
-        responses = []
-        for prompt in self.prompts:
-            if prompt.id != pid:
-                continue
+    def _execute(self, prompt, mid):
+        return self.llm_service.execute_prompt(
+            mid,
+            prompt.generate_prompt(),
+            prompt.format_instructions,
+            stop_detector=self.stop_detector,
+        )
 
-            response = self.llm_service.execute_prompt(
-                mid, prompt.generate_prompt(), prompt.format_instructions
+    def process_response(self, response, pid, mid, spec, raw_spec: str) -> List[str]:
+        """Extract, validate and annotate the tests contained in an LLM response."""
+        responses = []
+        if response is not None:
+            self.logger.log(
+                f"LLM response for prompt {pid} and model {mid}: {response}"
             )
 
-            if response is not None:
-                self.logger.log(
-                    f"LLM response for prompt {pid} and model {mid}: {response}"
-                )
-
-                tests_from_response = self._prepare_tests_from_response(response)
+            tests_from_response = self._prepare_tests_from_response(response)
 
-                if tests_from_response:
-                    for test in tests_from_response:
-                        # Validate and fix the test
-                        validated_test = self._reprompt_until_validate(mid, test)
+            if tests_from_response:
+                for test in tests_from_response:
+                    # Validate and fix the test
+                    validated_test = self._reprompt_until_validate(mid, test)
 
-                        # Version with spec annotation
-                        test_with_spec = Specs.add_spec_annotation(validated_test, spec)
-                        test_with_specs = Specs.add_spec_annotation(
-                            test_with_spec, raw_spec
-                        )
-                        responses.append(test_with_specs)
+                    # Version with spec annotation
+                    test_with_spec = Specs.add_spec_annotation(validated_test, spec)
+                    test_with_specs = Specs.add_spec_annotation(
+                        test_with_spec, raw_spec
+                    )
+                    responses.append(test_with_specs)
 
-                        # Version without assert wrappers
-                        test_without_wrappers = (
-                            JavaTestFixer.remove_assertions_from_test(test_with_specs)
-                        )
-                        responses.append(test_without_wrappers)
+                    # Version without assert wrappers
+                    test_without_wrappers = JavaTestFixer.remove_assertions_from_test(
+                        test_with_specs
+                    )
+                    responses.append(test_without_wrappers)
         return responses
 
     def _reprompt_until_validate(self, model_id: str, test: str) -> str:
@@ -109,7 +148,16 @@ class JavaTestGenerator:
             prompt = PromptTemplateFactory.create_fix_prompt(
                 test, compilation["errors"][0], self.subject
             )
-            response = self.llm_service.execute_prompt(model_id, prompt, "")
+            # Sent through the dispatcher, within the provider's concurrency
+            # limit; this runs on a caller thread, never on a dispatcher one
+            response = self.dispatcher.submit(
+                model_id,
+                self.llm_service.execute_prompt,
+                model_id,
+                prompt,
+                "",
+                stop_detector=self.stop_detector,
+            ).result()
 
             if response is not None:
                 extracted_tests = self._prepare_tests_from_response(response)
@@ -139,32 +187,3 @@ class JavaTestGenerator:
             test = self.subject.test_suite.java_test_fixer.repair_java_test(test)
             cleaned_tests.append(test)
         return cleaned_tests
-
-    # def generate_test(
-    #     self, class_code, method_code, spec, prompt_ids=PromptID.all(), models_ids=[]
-    # ):
-    #     if not prompt_ids or not models_ids:
-    #         raise ValueError("prompt_ids and models_ids required.")
-    #     self.prompts = []
-    #     generated_test_cases_by_model = {mid: [] for mid in models_ids}
-
-    #     for pid in set(prompt_ids):
-    #         self._generate_prompts(pid, class_code, method_code, spec)
-
-    #     with concurrent.futures.ThreadPoolExecutor() as executor:
-    #         futures = {
-    #             executor.submit(self._process_model, mid, prompt_ids, spec): mid
-    #             for mid in models_ids
-    #         }
-    #         for future in concurrent.futures.as_completed(futures):
-    #             mid = futures[future]
-    #             generated_test_cases_by_model[mid].extend(future.result())
-
-    #     return generated_test_cases_by_model
-
-    # def _process_model(self, mid, prompt_ids, spec):
-    #     responses = []
-    #     for pid in prompt_ids:
-    #         llm_generated_cases = self._execute(pid, mid, spec)
-    #         responses.extend(llm_generated_cases)
-    #     return responses
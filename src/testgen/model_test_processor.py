@@ -1,8 +1,7 @@
 import os
 import json
-from typing import Dict, List
+from typing import Dict, List, Optional
 from java_test_compiler.java_test_compiler import JavaTestCompiler
-from exceptions.java_test_compilation_exception import JavaTestCompilationException
 from file_operations.file_ops import FileOperations
 from logger.logger import Logger
 
@@ -13,9 +12,14 @@ class ModelTestProcessor:
     raw -> fixed -> compiled
     """
 
-    def __init__(self, logger: Logger, java_class_src: str):
+    def __init__(
+        self,
+        logger: Logger,
+        java_class_src: str,
+        compiler: JavaTestCompiler | None = None,
+    ):
         self.logger = logger
-        self.compiler = JavaTestCompiler(java_class_src)
+        self.compiler = compiler or JavaTestCompiler(java_class_src)
 
     def process_tests_by_model(self, test_suite, output_dir: str) -> Dict:
         """
@@ -57,32 +61,39 @@ class ModelTestProcessor:
         """Fix/repair tests using the test suite's repair functionality"""
         fixed_tests = []
         for test in raw_tests:
-            try:
-                # Remove assertions and apply fixes
-                fixed_test = test_suite.remove_assertions_from_test(test)
-                fixed_test = test_suite.java_test_fixer.repair_java_test(fixed_test)
+            fixed_test = self.fix_test(test, test_suite)
+            if fixed_test is not None:
                 fixed_tests.append(fixed_test)
-            except Exception as e:
-                self.logger.log_warning(f"Failed to fix test: {e}")
         return fixed_tests
 
+    def fix_test(self, test: str, test_suite) -> Optional[str]:
+        """Fix a single test, returning None if it cannot be repaired"""
+        try:
+            # Remove assertions and apply fixes
+            fixed_test = test_suite.remove_assertions_from_test(test)
+            return test_suite.java_test_fixer.repair_java_test(fixed_test)
+        except Exception as e:
+            self.logger.log_warning(f"Failed to fix test: {e}")
+            return None
+
     def _compile_tests(self, fixed_tests: List[str], model_id: str) -> List[str]:
-        """Compile tests and return only those that compile successfully"""
+        """Compile tests in batches and return only those that compile successfully"""
         compiled_tests = []
-        for i, test in enumerate(fixed_tests):
-            try:
-                self.compiler.compile(test, with_tool=True)
+        errors = self.compiler.compile_batch(fixed_tests)
+        for i, (test, error) in enumerate(zip(fixed_tests, errors)):
+            if error is None:
                 compiled_tests.append(test)
-            except JavaTestCompilationException as e:
-                self.logger.log_warning(
-                    f"Model {model_id} - Test {i+1} discarded - Compilation error: {e}"
-                )
-            except Exception as e:
+            else:
                 self.logger.log_warning(
-                    f"Model {model_id} - Test {i+1} discarded - Unexpected error: {e}"
+                    f"Model {model_id} - Test {i+1} discarded - Compilation error: {error}"
                 )
         return compiled_tests
 
+    def write_model_stats(self, model_stats: Dict, output_dir: str):
+        """Write the phase files of every model in model_stats"""
+        for model_id, stats in model_stats.items():
+            self._write_model_phase_files(model_id, output_dir, stats)
+
     def _write_model_phase_files(
         self, model_id: str, output_dir: str, model_data: Dict
     ):
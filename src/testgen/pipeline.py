@@ -0,0 +1,277 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import as_completed, wait
+from typing import Callable, Dict, List, Tuple
+
+from java_test_compiler.java_test_compiler import BATCH_COMPILE_SIZE
+from logger.logger import Logger
+from subject.subject import Subject
+from testgen.java_test_generator import JavaTestGenerator
+from testgen.model_test_processor import ModelTestProcessor
+
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "32"))
+PIPELINE_EXTRACT_WORKERS = int(os.getenv("PIPELINE_EXTRACT_WORKERS", "4"))
+PIPELINE_COMPILE_WORKERS = int(os.getenv("PIPELINE_COMPILE_WORKERS", "2"))
+
+# Position of an item in the final output: (assertion, model, prompt[, test])
+SortKey = Tuple[int, ...]
+
+_DONE = object()
+
+
+class _Stage:
+    """A pool of worker threads draining one bounded queue."""
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[queue.Queue, object], None],
+        workers: int,
+        on_error: Callable[[str, Exception], None],
+    ):
+        self.name = name
+        self.handler = handler
+        self.inbox: queue.Queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        self.on_error = on_error
+        self.threads = [
+            threading.Thread(
+                target=self._work, name=f"pipeline-{name}-{i}", daemon=True
+            )
+            for i in range(max(1, workers))
+        ]
+
+    def start(self) -> None:
+        for thread in self.threads:
+            thread.start()
+
+    def close(self) -> None:
+        """Let the workers finish the queued items, then wait for them."""
+        for _ in self.threads:
+            self.inbox.put(_DONE)
+        for thread in self.threads:
+            thread.join()
+
+    def _work(self) -> None:
+        while True:
+            item = self.inbox.get()
+            if item is _DONE:
+                return
+            try:
+                self.handler(self.inbox, item)
+            except Exception as e:
+                self.on_error(self.name, e)
+
+
+class TestGenPipeline:
+    """
+    Streams LLM responses through extraction, fixing and compilation.
+
+    generate -> extract -> fix -> compile run concurrently and are connected by
+    bounded queues, so compilation of early responses overlaps with prompts
+    still in flight and the amount of buffered work is capped by the queue
+    sizes. Results are reassembled in (assertion, model, prompt) order, so the
+    output matches the phase-by-phase flow.
+    """
+
+    def __init__(
+        self,
+        subject: Subject,
+        test_generator: JavaTestGenerator,
+        model_processor: ModelTestProcessor,
+        logger: Logger,
+        timestamp_logger: Logger,
+    ):
+        self.subject = subject
+        self.test_generator = test_generator
+        self.model_processor = model_processor
+        self.logger = logger
+        self.timestamp_logger = timestamp_logger
+
+        self._lock = threading.Lock()
+        self._raw: List[Tuple[SortKey, str, str]] = []
+        self._fixed: List[Tuple[SortKey, str, str]] = []
+        self._compiled: List[Tuple[SortKey, str, str]] = []
+        self._spec_times: Dict[int, List[float]] = {}
+        self._errors: List[Exception] = []
+
+        self.extract_stage = _Stage(
+            "extract", self._extract, PIPELINE_EXTRACT_WORKERS, self._on_error
+        )
+        self.fix_stage = _Stage("fix", self._fix, 1, self._on_error)
+        self.compile_stage = _Stage(
+            "compile", self._compile, PIPELINE_COMPILE_WORKERS, self._on_error
+        )
+
+    def run(self, prompts: list, models: list) -> Dict:
+        """
+        Returns:
+            Dict with model statistics: {model_id: {phase: stats}}, in the
+            format produced by ModelTestProcessor.process_tests_by_model.
+        """
+        self.logger.log(f"Starting streaming test generation for {self.subject}...")
+        start_time = time.time()
+
+        for stage in (self.extract_stage, self.fix_stage, self.compile_stage):
+            stage.start()
+
+        assertions = sorted(self.subject.collect_specs())
+        specs = [
+            self.subject.specs.transform_specification_vars(assertion)
+            for assertion in assertions
+        ]
+        futures = []
+        for a_idx, (assertion, spec) in enumerate(zip(assertions, specs)):
+            self.logger.log(f"Generating test for assertion: {spec}")
+            spec_prompts = [
+                self.test_generator._generate_prompt(
+                    pid, self.subject.class_code, self.subject.method_code, spec
+                )
+                for pid in prompts
+            ]
+            for m_idx, mid in enumerate(models):
+                p_idx = 0
+                for pid in prompts:
+                    for prompt in spec_prompts:
+                        if prompt.id != pid:
+                            continue
+                        futures.append(
+                            self.test_generator.dispatcher.submit(
+                                mid,
+                                self._generate,
+                                (a_idx, m_idx, p_idx),
+                                prompt,
+                                mid,
+                                spec,
+                                assertion,
+                            )
+                        )
+                        p_idx += 1
+
+        try:
+            # Responses are handed to the extract stage from this thread: a
+            # dispatcher thread blocked on the full queue could never run the
+            # fix reprompts the extract workers are waiting for
+            for future in as_completed(futures):
+                self.extract_stage.inbox.put(future.result())
+        except BaseException:
+            # Drop the queued requests and wait for the running ones
+            for future in futures:
+                future.cancel()
+            wait(futures)
+            raise
+        finally:
+            # Upstream stages are drained before downstream ones are closed
+            self.extract_stage.close()
+            self.fix_stage.close()
+            self.compile_stage.close()
+
+        total_time = time.time() - start_time
+        for a_idx, spec in enumerate(specs):
+            times = self._spec_times.get(a_idx)
+            if times:
+                self.timestamp_logger.log(
+                    f"Test generation for assertion '{spec}' took "
+                    f"{times[1] - times[0]:.2f} seconds"
+                )
+        self.timestamp_logger.log(
+            f"Total test generation time: {total_time:.2f} seconds"
+        )
+
+        if self._errors:
+            raise self._errors[0]
+
+        self.logger.log(f"Finished streaming test generation for {self.subject}.")
+        return self._collect_model_stats()
+
+    def _generate(self, key: SortKey, prompt, mid: str, spec: str, raw_spec: str):
+        """Send the prompt and return the item for the extract stage."""
+        started = time.time()
+        response = self.test_generator._execute(prompt, mid)
+        finished = time.time()
+        with self._lock:
+            times = self._spec_times.setdefault(key[0], [started, finished])
+            times[0] = min(times[0], started)
+            times[1] = max(times[1], finished)
+        return key, prompt.id, mid, spec, raw_spec, response
+
+    def _extract(self, inbox: queue.Queue, item) -> None:
+        key, pid, mid, spec, raw_spec, response = item
+        tests = self.test_generator.process_response(response, pid, mid, spec, raw_spec)
+        for t_idx, test in enumerate(tests):
+            test_key = key + (t_idx,)
+            with self._lock:
+                self._raw.append((test_key, mid, test))
+            self.fix_stage.inbox.put((test_key, mid, test))
+
+    def _fix(self, inbox: queue.Queue, item) -> None:
+        key, mid, test = item
+        fixed_test = self.model_processor.fix_test(test, self.subject.test_suite)
+        if fixed_test is None:
+            return
+        with self._lock:
+            self._fixed.append((key, mid, fixed_test))
+        self.compile_stage.inbox.put((key, mid, fixed_test))
+
+    def _compile(self, inbox: queue.Queue, item) -> None:
+        # Compile whatever is already queued together as one batch
+        batch = [item]
+        done = False
+        while len(batch) < BATCH_COMPILE_SIZE:
+            try:
+                next_item = inbox.get_nowait()
+            except queue.Empty:
+                break
+            if next_item is _DONE:
+                done = True
+                break
+            batch.append(next_item)
+
+        errors = self.model_processor.compiler.compile_batch(
+            [test for _, _, test in batch]
+        )
+        with self._lock:
+            for (key, mid, test), error in zip(batch, errors):
+                if error is None:
+                    self._compiled.append((key, mid, test))
+                else:
+                    self.logger.log_warning(
+                        f"Model {mid} - Test {key} discarded - Compilation error: {error}"
+                    )
+
+        if done:
+            # Hand back the stop marker taken while batching
+            inbox.put(_DONE)
+
+    def _on_error(self, stage: str, error: Exception) -> None:
+        self.logger.log_error(f"Pipeline stage '{stage}' failed: {error}")
+        with self._lock:
+            self._errors.append(error)
+
+    def _collect_model_stats(self) -> Dict:
+        test_suite = self.subject.test_suite
+        for _, mid, test in sorted(self._raw, key=lambda entry: entry[0]):
+            test_suite.add_test_by_model(mid, test)
+
+        model_stats = {}
+        for model_id in test_suite.get_all_models():
+            raw_tests = test_suite.get_tests_by_model(model_id)
+            fixed_tests = self._tests_for_model(self._fixed, model_id)
+            compiled_tests = self._tests_for_model(self._compiled, model_id)
+            model_stats[model_id] = {
+                "raw": {"count": len(raw_tests), "tests": raw_tests},
+                "fixed": {"count": len(fixed_tests), "tests": fixed_tests},
+                "compiled": {"count": len(compiled_tests), "tests": compiled_tests},
+            }
+        return model_stats
+
+    @staticmethod
+    def _tests_for_model(
+        entries: List[Tuple[SortKey, str, str]], model_id: str
+    ) -> List[str]:
+        return [
+            test
+            for _, mid, test in sorted(entries, key=lambda entry: entry[0])
+            if mid == model_id
+        ]
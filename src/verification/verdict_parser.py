@@ -5,6 +5,7 @@ from typing import Literal
 
 from pydantic import BaseModel, RootModel, ValidationError
 
+from llmservice.streaming import ThinkBlockFilter
 from prompt.prompt_template import PromptID
 
 VerdictLiteral = Literal["VALID", "INVALID"]
@@ -27,6 +28,63 @@ class VerificationVerdict(BaseModel):
     raw_response: str
 
 
+class VerdictDetector:
+    """
+    Fed with a streamed LLM response, feed returns True as soon as a complete
+    JSON verdict object has been read outside the <think> blocks.
+    """
+
+    def __init__(self) -> None:
+        self.think_filter = ThinkBlockFilter()
+        self.complete = False
+        self._text = ""
+        # Where the search for the next JSON object resumes
+        self._scan_from = 0
+
+    def feed(self, chunk: str) -> bool:
+        self._text += self.think_filter.feed(chunk)
+        while not self.complete:
+            start = self._text.find("{", self._scan_from)
+            if start == -1:
+                self._scan_from = len(self._text)
+                break
+            end = _json_object_end(self._text, start)
+            if end is None:
+                # Incomplete object: scan it again once more text arrives
+                self._scan_from = start
+                break
+            try:
+                _SpecVerdictPayload.model_validate_json(self._text[start:end])
+                self.complete = True
+            except ValueError:
+                self._scan_from = start + 1
+        return self.complete
+
+
+def _json_object_end(text: str, start: int) -> int | None:
+    """Index just past the object opened at start, None if it is not closed."""
+    depth = 0
+    in_string = escaped = False
+    for index in range(start, len(text)):
+        char = text[index]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return index + 1
+    return None
+
+
 def _unwrap_json_candidate(response_text: str) -> str:
     """Remove common wrappers (e.g., code fences) around JSON payloads."""
 
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The packages live directly under src/, as when the CLI runs from there
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
@@ -0,0 +1,126 @@
+import pytest
+
+from exceptions.provider_error import ProviderError
+from llmservice.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitBreakers,
+)
+
+UNAVAILABLE = ProviderError("test", "bad gateway", status=502)
+
+
+def open_breaker(breaker):
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure(UNAVAILABLE)
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("model", failure_threshold=3, cooldown=60)
+    breaker.record_failure(UNAVAILABLE)
+    breaker.record_failure(UNAVAILABLE)
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+    breaker.record_failure(UNAVAILABLE)
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker("model", failure_threshold=2, cooldown=60)
+    breaker.record_failure(UNAVAILABLE)
+    breaker.record_success()
+    breaker.record_failure(UNAVAILABLE)
+    assert breaker.state == CLOSED
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        ProviderError("test", "slow down", status=429),
+        ProviderError("test", "bad request", status=400),
+        ProviderError("test", "KeyError('content')"),
+    ],
+)
+def test_errors_that_are_not_outages_do_not_count(error):
+    breaker = CircuitBreaker("model", failure_threshold=1, cooldown=60)
+    breaker.record_failure(error)
+    assert breaker.state == CLOSED
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        ProviderError("test", "timed out", timed_out=True),
+        ProviderError("test", "refused", connection_failed=True),
+        ProviderError("test", "unavailable", status=503),
+    ],
+)
+def test_outages_count(error):
+    breaker = CircuitBreaker("model", failure_threshold=1, cooldown=60)
+    breaker.record_failure(error)
+    assert breaker.state == OPEN
+
+
+def test_half_open_lets_a_single_probe_through():
+    breaker = CircuitBreaker("model", failure_threshold=1, cooldown=0)
+    open_breaker(breaker)
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+
+
+def test_successful_probe_closes_the_breaker():
+    breaker = CircuitBreaker("model", failure_threshold=1, cooldown=0)
+    open_breaker(breaker)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_failed_probe_opens_the_breaker_again():
+    breaker = CircuitBreaker("model", failure_threshold=3, cooldown=0)
+    open_breaker(breaker)
+    assert breaker.allow()
+    breaker.cooldown = 60
+    breaker.record_failure(UNAVAILABLE)
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+
+def test_probe_answered_with_a_client_error_frees_the_probe():
+    breaker = CircuitBreaker("model", failure_threshold=1, cooldown=0)
+    open_breaker(breaker)
+    assert breaker.allow()
+    breaker.record_failure(ProviderError("test", "slow down", status=429))
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+
+
+def test_breakers_list_open_models_by_cause():
+    cold, error, timeout = [], [], []
+    breakers = CircuitBreakers(cold, error, timeout, failure_threshold=1)
+    breakers.for_model("a").record_failure(ProviderError("t", "loading", status=503))
+    breakers.for_model("b").record_failure(ProviderError("t", "x", timed_out=True))
+    breakers.for_model("c").record_failure(ProviderError("t", "x", status=500))
+    assert (cold, timeout, error) == (["a"], ["b"], ["c"])
+
+
+def test_closing_a_breaker_unlists_its_model():
+    error = []
+    breakers = CircuitBreakers([], error, [], failure_threshold=1, cooldown=0)
+    breaker = breakers.for_model("a")
+    breaker.record_failure(UNAVAILABLE)
+    assert error == ["a"]
+    assert breaker.allow()
+    breaker.record_success()
+    assert error == []
+
+
+def test_listed_models_start_open():
+    breakers = CircuitBreakers([], ["a"], [], cooldown=60)
+    assert breakers.for_model("a").state == OPEN
+    assert not breakers.for_model("a").allow()
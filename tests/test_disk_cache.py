@@ -0,0 +1,75 @@
+import itertools
+
+import pytest
+
+from cache import disk_cache
+from cache.disk_cache import DiskCache
+
+
+class Clock:
+    """Strictly increasing time, so access order never ties."""
+
+    def __init__(self):
+        self._ticks = itertools.count(1)
+
+    def time(self):
+        return float(next(self._ticks))
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(disk_cache, "time", Clock())
+    cache = DiskCache("test", max_bytes=10, cache_dir=str(tmp_path))
+    yield cache
+    cache.close()
+
+
+def test_get_returns_what_was_put(cache):
+    cache.put("a", "value")
+    assert cache.get("a") == "value"
+    assert cache.get("b") is None
+
+
+def test_entries_survive_reopening(cache, tmp_path):
+    cache.put("a", "value")
+    cache.close()
+    assert DiskCache("test", 10, cache_dir=str(tmp_path)).get("a") == "value"
+
+
+def test_evicts_the_least_recently_used_entries(cache):
+    cache.put("a", "aaaa")
+    cache.put("b", "bbbb")
+    cache.put("c", "cccc")
+    assert cache.get("a") is None
+    assert cache.get("b") == "bbbb"
+    assert cache.get("c") == "cccc"
+
+
+def test_reading_an_entry_keeps_it(cache):
+    cache.put("a", "aaaa")
+    cache.put("b", "bbbb")
+    assert cache.get("a") == "aaaa"
+    cache.put("c", "cccc")
+    assert cache.get("a") == "aaaa"
+    assert cache.get("b") is None
+
+
+def test_replacing_an_entry_counts_its_new_size(cache):
+    cache.put("a", "aaaa")
+    cache.put("b", "bbbb")
+    cache.put("b", "bb")
+    cache.put("c", "cccc")
+    assert cache.get("a") == "aaaa"
+    assert cache.get("c") == "cccc"
+
+
+def test_values_larger_than_the_cache_are_not_stored(cache):
+    cache.put("a", "aaaa")
+    cache.put("big", "x" * 11)
+    assert cache.get("big") is None
+    assert cache.get("a") == "aaaa"
+
+
+def test_make_key_separates_the_parts():
+    assert DiskCache.make_key("ab", "c") != DiskCache.make_key("a", "bc")
+    assert DiskCache.make_key("a", None) == DiskCache.make_key("a", "")
@@ -0,0 +1,120 @@
+import gzip
+
+import pytest
+
+from daikon.dtrace_splitter import DTraceSplitter
+
+SUITE = "pkg.StackTestAugmented"
+
+DECLARATIONS = """decl-version 2.0
+var-comparability implicit
+
+ppt pkg.Stack.push(int):::ENTER
+ppt-type enter
+variable x
+  var-kind variable
+"""
+
+
+def sample(ppt, value=1):
+    return f"{ppt}\nthis_invocation_nonce\n{value}\nx\n{value}\n1\n"
+
+
+def run_test(name, *samples, exits=True):
+    records = [sample(f"{SUITE}.{name}():::ENTER")]
+    records += [sample(ppt) for ppt in samples]
+    if exits:
+        records.append(sample(f"{SUITE}.{name}():::EXIT12"))
+    return records
+
+
+PUSH = "pkg.Stack.push(int):::ENTER"
+POP = "pkg.Stack.pop():::EXIT5"
+
+
+def read(path):
+    with gzip.open(path, "rt") as trace:
+        return [block for block in trace.read().split("\n\n") if block.strip()]
+
+
+@pytest.fixture
+def split(tmp_path):
+    def split(records, owners=("0", "1")):
+        trace = tmp_path / "Driver.dtrace.gz"
+        with gzip.open(trace, "wt") as out:
+            out.write(DECLARATIONS + "\n" + "\n".join(records))
+        outputs = {owner: str(tmp_path / f"{owner}.dtrace.gz") for owner in owners}
+        samples = DTraceSplitter(SUITE, "llmTestM").split(str(trace), outputs)
+        return samples, {owner: read(path) for owner, path in outputs.items()}
+
+    return split
+
+
+def ppts(blocks):
+    return [block.splitlines()[0] for block in blocks]
+
+
+def test_tagged_tests_go_to_their_owner_only(split):
+    records = (
+        run_test("testBase", PUSH)
+        + run_test("llmTestM0_1", PUSH, POP)
+        + run_test("llmTestM1_1", POP)
+    )
+    samples, slices = split(records)
+
+    assert samples == {"0": 4, "1": 3}
+    assert ppts(slices["0"])[2:] == [
+        f"{SUITE}.testBase():::ENTER",
+        PUSH,
+        f"{SUITE}.testBase():::EXIT12",
+        f"{SUITE}.llmTestM0_1():::ENTER",
+        PUSH,
+        POP,
+        f"{SUITE}.llmTestM0_1():::EXIT12",
+    ]
+    assert ppts(slices["1"])[2:] == [
+        f"{SUITE}.testBase():::ENTER",
+        PUSH,
+        f"{SUITE}.testBase():::EXIT12",
+        f"{SUITE}.llmTestM1_1():::ENTER",
+        POP,
+        f"{SUITE}.llmTestM1_1():::EXIT12",
+    ]
+
+
+def test_declarations_go_to_every_slice(split):
+    _, slices = split(run_test("llmTestM0_1", PUSH))
+    for blocks in slices.values():
+        assert blocks[0].startswith("decl-version 2.0")
+        assert ppts(blocks)[1] == f"ppt {PUSH}"
+
+
+def test_a_test_that_throws_ends_at_the_next_test(split):
+    records = run_test("llmTestM0_1", PUSH, exits=False) + run_test("testBase", POP)
+    samples, slices = split(records)
+
+    assert samples == {"0": 2, "1": 0}
+    assert POP in ppts(slices["1"])
+    assert ppts(slices["0"])[-3:] == [
+        f"{SUITE}.testBase():::ENTER",
+        POP,
+        f"{SUITE}.testBase():::EXIT12",
+    ]
+
+
+def test_tests_of_untraced_owners_are_dropped(split):
+    records = run_test("llmTestM2_1", PUSH) + run_test("testBase", POP)
+    samples, slices = split(records)
+
+    assert samples == {"0": 0, "1": 0}
+    for blocks in slices.values():
+        assert PUSH not in ppts(blocks)[2:]
+        assert POP in ppts(blocks)
+
+
+def test_owner_tags_may_contain_underscores(split):
+    samples, _ = split(
+        run_test("llmTestM0_1", PUSH) + run_test("llmTestMgpt_4_2", PUSH),
+        owners=("0", "gpt_4"),
+    )
+    assert samples == {"0": 3, "gpt_4": 3}
@@ -0,0 +1,156 @@
+import os
+
+import pytest
+
+from invariant_filter.invariant_filter import InvariantFilter, InvariantsCsvReader
+
+pd = pytest.importorskip("pandas")
+
+CLASS = "org.example.Stack"
+METHOD = "push"
+
+INVS_CSV = '''ppt,invariant,type,samples
+org.example.Stack.push(int):::ENTER,x > 0,falsified,3
+org.example.Stack.push(int):::EXIT12,"this.size == old(this.size) + 1",falsified,7
+org.example.Stack.push(int):::EXIT12,"  this.elements[0] != null  ",falsified,2
+org.example.Stack.pop():::EXIT5,this.size >= 0,falsified,4
+org.example.Stack.Stack():::EXIT3,"this.elements.getClass().getName() == ""[I""",falsified,1
+org.example.Stack.Stack():::EXIT3,"daikon.Quant.size(this.elements) one of { 0, 10 }",falsified,1
+org.example.Other.pushAll(int[]):::EXIT,"a, b",falsified,9
+'''
+
+ASSERTIONS = """org.example.Stack.push(int):::EXIT12
+===========================================================================
+this.size == old(this.size) + 1
+this.elements[0] != null
+this.size >= 0
+daikon.Quant.size(this.elements) one of { 0, 10 }
+this.top == x
+org.example.Stack.Stack():::EXIT3
+"""
+
+
+def filter_invariants_of_interest_script(specs_file, output_directory):
+    """scripts/filter_invariants_of_interest.py before the streaming reader."""
+    class_name = CLASS.split(".")[-1]
+
+    def is_of_interest(ppt):
+        if "ENTER" in ppt:
+            return False
+        obj_spec = f"{CLASS}.{class_name}("
+        return (METHOD in ppt) or (obj_spec in ppt)
+
+    input_specifications = pd.read_csv(specs_file)
+    interest_ppts = list(filter(is_of_interest, input_specifications["ppt"].unique()))
+    interest_filtered_specs = input_specifications[
+        input_specifications["ppt"].isin(interest_ppts)
+    ]
+    interest_filtered_specs.to_csv(
+        f"{output_directory}/interest-specs.csv", index=False
+    )
+
+
+def extract_non_filtered_assertions_script(assertions_file, invalid_csv, out_dir):
+    """scripts/extract_non_filtered_assertions.py before the streaming reader."""
+    with open(assertions_file, "r") as file:
+        set1 = {line.strip() for line in file}
+    set1 = {
+        item
+        for item in set1
+        if item
+        and not item.startswith("=" * 75)
+        and ":::OBJECT" not in item
+        and ":::ENTER" not in item
+        and ":::EXIT" not in item
+    }
+    set2 = set(pd.read_csv(invalid_csv)["invariant"].str.strip())
+    filtered_specs = set1 & set2
+    difference = set1 - set2
+
+    lines = [f"Specs from {os.path.basename(assertions_file)}: {len(set1)}"]
+    lines.append(f"Filtered specs: {len(filtered_specs)}")
+    lines += [f"  {spec}" for spec in sorted(filtered_specs)]
+
+    os.makedirs(out_dir, exist_ok=True)
+    for specs, suffix in (
+        (difference, "specfuzzer-refined"),
+        (filtered_specs, "specvalid-filtered"),
+    ):
+        with open(f"{out_dir}/Stack-{METHOD}-{suffix}.assertions", "w") as file:
+            for spec in sorted(specs, reverse=True):
+                file.write(f"{spec}\n")
+    return "\n".join(lines) + "\n"
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    invs = tmp_path / "invs.csv"
+    invs.write_text(INVS_CSV)
+    assertions = tmp_path / "Stack-push.assertions"
+    assertions.write_text(ASSERTIONS)
+    return str(invs), str(assertions)
+
+
+def read_files(directory):
+    return {path.name: path.read_text() for path in directory.iterdir()}
+
+
+def test_reader_yields_ppt_invariant_and_row(inputs):
+    reader = InvariantsCsvReader(inputs[0])
+    rows = list(reader)
+    assert reader.header == ["ppt", "invariant", "type", "samples"]
+    assert len(rows) == 7
+    assert rows[4][1] == 'this.elements.getClass().getName() == "[I"'
+    assert rows[6] == (
+        "org.example.Other.pushAll(int[]):::EXIT",
+        "a, b",
+        ["org.example.Other.pushAll(int[]):::EXIT", "a, b", "falsified", "9"],
+    )
+
+
+def test_filter_matches_the_pandas_scripts(inputs, tmp_path):
+    invs, assertions = inputs
+    old_dir, new_dir = tmp_path / "old", tmp_path / "new"
+    old_dir.mkdir()
+    new_dir.mkdir()
+
+    filter_invariants_of_interest_script(invs, str(old_dir))
+    old_report = extract_non_filtered_assertions_script(
+        assertions, str(old_dir / "interest-specs.csv"), str(old_dir)
+    )
+    messages = InvariantFilter(CLASS, METHOD).run(invs, assertions, str(new_dir))
+
+    pd.testing.assert_frame_equal(
+        pd.read_csv(old_dir / "interest-specs.csv"),
+        pd.read_csv(new_dir / "interest-specs.csv"),
+    )
+    assert messages[1] == old_report
+    old_files, new_files = read_files(old_dir), read_files(new_dir)
+    assert old_files.keys() == new_files.keys()
+    for name in old_files:
+        if name.endswith(".assertions"):
+            assert new_files[name] == old_files[name], name
+
+
+def test_filter_keeps_the_method_and_constructor_exits(inputs, tmp_path):
+    invariants = InvariantFilter(CLASS, METHOD).filter_invariants_of_interest(
+        inputs[0], str(tmp_path)
+    )
+    assert invariants == {
+        "this.size == old(this.size) + 1",
+        "this.elements[0] != null",
+        'this.elements.getClass().getName() == "[I"',
+        "daikon.Quant.size(this.elements) one of { 0, 10 }",
+        "a, b",
+    }
+
+
+def test_no_rows_of_interest_still_writes_the_header(tmp_path):
+    invs = tmp_path / "invs.csv"
+    invs.write_text("ppt,invariant\norg.example.Stack.pop():::EXIT5,x > 0\n")
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    assert not InvariantFilter(CLASS, METHOD).filter_invariants_of_interest(
+        str(invs), str(out_dir)
+    )
+    assert (out_dir / "interest-specs.csv").read_text() == "ppt,invariant\n"
@@ -0,0 +1,136 @@
+import re
+
+import pytest
+
+from exceptions.java_test_compilation_exception import JavaTestCompilationException
+from java_test_compiler import java_test_compiler
+from java_test_compiler.java_test_compiler import (
+    _TEMPLATE_FIRST_TEST_LINE,
+    JavaTestCompiler,
+    parse_compilation_errors,
+)
+
+
+def make_test(name, *statements):
+    body = "".join(f"        {statement}\n" for statement in statements)
+    return f"@Test\n    public void {name}() {{\n{body}    }}"
+
+
+OK = make_test("testOk", "int x = 1;", "assertEquals(1, x);")
+TYPE_ERROR = make_test("testTypo", "int x = 1;", "assertEquals(1, size(x));")
+SYNTAX_ERROR = make_test("testSyntax", "int x = ;")
+
+
+class FakeJavac:
+    """
+    Reports the errors javac would for the generated class: an unknown call
+    to size() is a type error, "= ;" a parse error that also breaks
+    everything after it.
+    """
+
+    def __init__(self):
+        self.sources = []
+
+    def __call__(self, source, with_tool):
+        self.sources.append(source)
+        errors = []
+        method = None
+        lines = source.split("\n")
+        for offset, code in enumerate(lines):
+            line = _TEMPLATE_FIRST_TEST_LINE + offset
+            name = re.search(r"void (\w+)\(", code)
+            if name is not None:
+                method = name.group(1)
+            if "size(" in code:
+                errors.append(
+                    f"GeneratedTest.java:{line}: error: cannot find symbol\n"
+                    f"{code}\n  symbol:   method size(int)\n"
+                    f"  location: method {method}()"
+                )
+            if "= ;" in code:
+                errors.append(
+                    f"GeneratedTest.java:{line}: error: illegal start of expression"
+                    f"\n{code}"
+                )
+                last = _TEMPLATE_FIRST_TEST_LINE + len(lines) + 1
+                errors.append(
+                    f"GeneratedTest.java:{last}: error: reached end of file "
+                    "while parsing"
+                )
+                break
+        if errors:
+            raise JavaTestCompilationException("\n".join(errors) + "\n")
+
+
+@pytest.fixture
+def compiler(tmp_path, monkeypatch):
+    compiler = JavaTestCompiler(str(tmp_path), with_tool=False, use_cache=False)
+    javac = FakeJavac()
+    monkeypatch.setattr(compiler, "_compile_uncached", javac)
+    return compiler, javac
+
+
+def test_a_batch_that_compiles_takes_one_invocation(compiler):
+    compiler, javac = compiler
+    assert compiler.compile_batch([OK] * 5) == [None] * 5
+    assert len(javac.sources) == 1
+
+
+def test_type_errors_go_to_the_test_that_has_them(compiler):
+    compiler, javac = compiler
+    results = compiler.compile_batch([OK, TYPE_ERROR, OK, TYPE_ERROR])
+
+    assert results[0] is None and results[2] is None
+    assert results[1] == results[3]
+    # Reported as if the test had been compiled on its own
+    assert results[1].startswith(
+        f"GeneratedTest.java:{_TEMPLATE_FIRST_TEST_LINE + 3}: error: cannot find symbol"
+    )
+    assert "location: method testTypo()" in results[1]
+    assert "batchTest" not in results[1]
+    # The batch, then the tests left once the broken ones are removed
+    assert len(javac.sources) == 2
+    assert javac.sources[1].count("@Test") == 2
+
+
+def test_single_test_errors_match_the_batched_ones(compiler):
+    compiler, _ = compiler
+    alone = compiler.compile_batch([TYPE_ERROR])[0]
+    batched = compiler.compile_batch([OK, OK, TYPE_ERROR])[2]
+    assert parse_compilation_errors(batched) == parse_compilation_errors(alone)
+
+
+def test_syntax_errors_are_bisected(compiler):
+    compiler, javac = compiler
+    tests = [OK, OK, SYNTAX_ERROR, OK, OK, TYPE_ERROR]
+    results = compiler.compile_batch(tests)
+
+    assert [result is None for result in results] == [
+        True,
+        True,
+        False,
+        True,
+        True,
+        False,
+    ]
+    assert "illegal start of expression" in results[2]
+    assert "cannot find symbol" in results[5]
+    assert len(javac.sources) > 2
+
+
+def test_infrastructure_failures_fail_the_whole_batch(compiler, monkeypatch):
+    compiler, _ = compiler
+
+    def broken(source, with_tool):
+        raise OSError("compile server died")
+
+    monkeypatch.setattr(compiler, "_compile_uncached", broken)
+    results = compiler.compile_batch([OK, OK])
+    assert results == ["Unexpected error: compile server died"] * 2
+
+
+def test_batches_are_capped(compiler, monkeypatch):
+    monkeypatch.setattr(java_test_compiler, "BATCH_COMPILE_SIZE", 2)
+    compiler, javac = compiler
+    assert compiler.compile_batch([OK] * 5) == [None] * 5
+    assert [source.count("@Test") for source in javac.sources] == [2, 2, 1]
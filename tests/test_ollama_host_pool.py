@@ -0,0 +1,96 @@
+import pytest
+
+from llmservice.providers.ollama.host_pool import OllamaHostPool, configured_hosts
+
+A, B, C = "http://a:11434", "http://b:11434", "http://c:11434"
+
+
+@pytest.fixture
+def models(monkeypatch):
+    """url -> {path: models}; a url missing from it is unreachable."""
+    hosts = {}
+
+    def fetch_models(url, path):
+        if url not in hosts:
+            raise ConnectionError("refused")
+        return set(hosts[url].get(path, ()))
+
+    monkeypatch.setattr(OllamaHostPool, "_fetch_models", staticmethod(fetch_models))
+    return hosts
+
+
+def discovered_pool(urls):
+    pool = OllamaHostPool(urls, discovery_interval=3600)
+    pool.discover()
+    # Discovered by hand: no background thread
+    pool._discovered.set()
+    return pool
+
+
+def test_configured_hosts():
+    assert configured_hosts("a:11434, http://b:11434/,a:11434,") == [
+        "http://a:11434",
+        "http://b:11434",
+    ]
+    assert configured_hosts("") == ["http://localhost:11434"]
+
+
+def test_prefers_the_host_with_the_model_loaded(models):
+    models[A] = {"/api/tags": ["phi4"]}
+    models[B] = {"/api/ps": ["phi4"], "/api/tags": ["phi4"]}
+    pool = discovered_pool([A, B])
+    pool.hosts[1].in_flight = 5
+    assert pool.acquire("phi4").url == B
+
+
+def test_prefers_a_host_with_the_model_pulled(models):
+    models[A] = {"/api/tags": ["llama3"]}
+    models[B] = {"/api/tags": ["phi4"]}
+    pool = discovered_pool([A, B])
+    pool.hosts[1].in_flight = 5
+    assert pool.acquire("phi4").url == B
+
+
+def test_least_loaded_host_among_equals(models):
+    models[A] = models[B] = models[C] = {"/api/tags": ["phi4"]}
+    pool = discovered_pool([A, B, C])
+    picked = [pool.acquire("phi4").url for _ in range(3)]
+    assert sorted(picked) == [A, B, C]
+    assert all(host.in_flight == 1 for host in pool.hosts)
+
+
+def test_unreachable_hosts_come_last(models):
+    models[B] = {"/api/tags": ["llama3"]}
+    pool = discovered_pool([A, B])
+    assert not pool.hosts[0].healthy
+    assert pool.acquire("phi4").url == B
+
+
+def test_dropped_connection_avoids_the_host_until_rediscovered(models):
+    models[A] = models[B] = {"/api/ps": ["phi4"]}
+    pool = discovered_pool([A, B])
+    host = pool.acquire("phi4")
+    pool.release(host, "phi4", served=False, reachable=False)
+    other = pool.acquire("phi4")
+    assert other is not host
+    pool.release(other, "phi4", served=True)
+
+    pool.discover()
+    assert host.healthy
+    assert host.in_flight == other.in_flight == 0
+
+
+def test_served_model_becomes_resident(models):
+    models[A] = models[B] = {"/api/tags": ["phi4"]}
+    pool = discovered_pool([A, B])
+    host = pool.acquire("phi4:latest")
+    pool.release(host, "phi4:latest", served=True)
+    assert "phi4" in host.resident
+    host.in_flight = 3
+    assert pool.acquire("phi4") is host
+
+
+def test_single_host_skips_discovery(models):
+    pool = OllamaHostPool([A])
+    assert pool.acquire("phi4").url == A
+    assert pool.hosts[0].available is None
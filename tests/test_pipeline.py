@@ -0,0 +1,141 @@
+import itertools
+import threading
+
+import pytest
+
+from testgen import pipeline
+from llmservice.dispatcher import LLMDispatcher
+from prompt.prompt_template import PromptID
+from testgen.java_test_generator import JavaTestGenerator
+
+RESPONSE = """```java
+@Test
+public void testGenerated%d() {
+    assertTrue(true);
+}
+```"""
+
+
+class StubLLMService:
+    def __init__(self):
+        self.responses = itertools.count()
+
+    def get_provider(self, model_id):
+        return "openai"
+
+    def execute_prompt(self, model_id, prompt, format_instructions="", **kwargs):
+        # Distinct tests, so that every one of them fails its first compilation
+        return RESPONSE % next(self.responses)
+
+
+class FailFirstCompiler:
+    """Rejects the first compilation of every test, so each one is reprompted."""
+
+    def __init__(self):
+        self.seen = set()
+        self.lock = threading.Lock()
+
+    def _attempt_test_compilation(self, tests):
+        with self.lock:
+            first = tests[0] not in self.seen
+            self.seen.add(tests[0])
+        if first:
+            return {"success": False, "errors": ["error: cannot find symbol"]}
+        return {"success": True, "errors": []}
+
+    def compile_batch(self, tests):
+        return [None] * len(tests)
+
+
+class StubFixer:
+    def repair_java_test(self, test):
+        return test
+
+
+class StubSuite:
+    java_test_fixer = StubFixer()
+
+    def __init__(self):
+        self.tests = {}
+
+    def add_test_by_model(self, model_id, test):
+        self.tests.setdefault(model_id, []).append(test)
+
+    def get_all_models(self):
+        return list(self.tests)
+
+    def get_tests_by_model(self, model_id):
+        return self.tests[model_id]
+
+
+class StubSpecs:
+    def transform_specification_vars(self, assertion):
+        return assertion
+
+
+class StubSubject:
+    class_path_src = "."
+    class_code = "class Subject {}"
+    method_code = "void m() {}"
+    method_sig = "m()"
+    class_name = "Subject"
+    other_method_sigs = ""
+
+    def __init__(self, spec_count):
+        self.spec_count = spec_count
+        self.specs = StubSpecs()
+        self.test_suite = StubSuite()
+
+    def collect_specs(self):
+        return {f"x > {i}" for i in range(self.spec_count)}
+
+
+class StubModelProcessor:
+    def __init__(self, compiler):
+        self.compiler = compiler
+
+    def fix_test(self, test, test_suite):
+        return test
+
+
+class StubLogger:
+    def log(self, *args):
+        pass
+
+    log_error = log_warning = log
+
+
+@pytest.mark.parametrize(
+    "spec_count, queue_size, concurrency", [(60, 32, 8), (40, 4, 2)]
+)
+def test_fix_reprompts_do_not_deadlock(
+    monkeypatch, spec_count, queue_size, concurrency
+):
+    monkeypatch.setattr(pipeline, "PIPELINE_QUEUE_SIZE", queue_size)
+    subject = StubSubject(spec_count)
+    compiler = FailFirstCompiler()
+    generator = JavaTestGenerator(
+        subject, StubLogger(), llm_service=StubLLMService(), compiler=compiler
+    )
+    generator.dispatcher = LLMDispatcher(
+        generator.llm_service, provider_limits={"openai": concurrency}
+    )
+    testgen = pipeline.TestGenPipeline(
+        subject, generator, StubModelProcessor(compiler), StubLogger(), StubLogger()
+    )
+
+    result = {}
+    runner = threading.Thread(
+        target=lambda: result.update(
+            testgen.run([PromptID.General_V1], ["GPT4oMini", "GPT4o"])
+        ),
+        daemon=True,
+    )
+    runner.start()
+    runner.join(timeout=60)
+    generator.dispatcher.shutdown(wait=False)
+
+    assert not runner.is_alive(), "pipeline deadlocked"
+    # One test per response, plus its version without assert wrappers
+    assert result["GPT4oMini"]["raw"]["count"] == 2 * spec_count
+    assert result["GPT4o"]["compiled"]["count"] == 2 * spec_count
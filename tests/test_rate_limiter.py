@@ -0,0 +1,121 @@
+import time
+
+import pytest
+
+from exceptions.provider_error import ProviderError
+from llmservice import rate_limiter
+from llmservice.rate_limiter import ProviderLimiter, TokenBucket
+
+
+def test_token_bucket_starts_full():
+    bucket = TokenBucket(60)
+    assert bucket.delay(60, bucket.updated) == 0.0
+
+
+def test_token_bucket_waits_for_the_refill():
+    bucket = TokenBucket(60)  # one unit per second
+    now = bucket.updated
+    bucket.consume(60, now)
+    assert bucket.delay(1, now) == pytest.approx(1.0)
+    assert bucket.delay(1, now + 0.5) == pytest.approx(0.5)
+    assert bucket.delay(1, now + 1) == 0.0
+
+
+def test_token_bucket_never_holds_more_than_a_minute():
+    bucket = TokenBucket(60)
+    now = bucket.updated
+    assert bucket.delay(1, now + 3600) == 0.0
+    assert bucket.level == 60
+
+
+def test_token_bucket_oversized_cost_only_waits_for_a_full_bucket():
+    bucket = TokenBucket(60)
+    now = bucket.updated
+    assert bucket.delay(600, now) == 0.0
+    bucket.consume(600, now)
+    # 600 - 60 units in debt: a full bucket again takes ten minutes
+    assert bucket.delay(600, now) == pytest.approx(600.0)
+
+
+def test_limiter_admits_up_to_the_window():
+    limiter = ProviderLimiter("test", 2)
+    assert limiter.try_acquire(10)
+    assert limiter.try_acquire(10)
+    assert not limiter.try_acquire(10)
+    limiter.release(0.1)
+    assert limiter.try_acquire(10)
+    assert limiter.in_flight == 2
+
+
+def test_limiter_requests_per_minute():
+    limiter = ProviderLimiter("test", 10, requests_per_minute=2)
+    assert limiter.try_acquire(1)
+    assert limiter.try_acquire(1)
+    assert not limiter.try_acquire(1)
+
+
+def test_limiter_tokens_per_minute_include_output_tokens():
+    limiter = ProviderLimiter("test", 10, tokens_per_minute=100)
+    assert limiter.try_acquire(40)
+    limiter.release(0.1, output_tokens=60)
+    assert not limiter.try_acquire(10)
+
+
+def test_throttling_halves_the_window_and_pauses(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "THROTTLE_PAUSE", 30)
+    limiter = ProviderLimiter("test", 8)
+    assert limiter.try_acquire(1)
+    limiter.release(0.1, error=ProviderError("test", "slow down", status=429))
+    assert limiter.window == 4
+    assert not limiter.try_acquire(1)
+
+
+def test_retry_after_pauses_admissions():
+    limiter = ProviderLimiter("test", 8)
+    assert limiter.try_acquire(1)
+    limiter.release(
+        0.1, error=ProviderError("test", "slow down", status=429, retry_after=60)
+    )
+    assert limiter.paused_until > time.monotonic() + 59
+    assert not limiter.try_acquire(1)
+
+
+def test_failures_of_one_congestion_shrink_the_window_once():
+    limiter = ProviderLimiter("test", 8)
+    for _ in range(3):
+        assert limiter.try_acquire(1)
+    for _ in range(3):
+        limiter.release(0.1, error=ProviderError("test", "overloaded", status=503))
+    assert limiter.window == 4
+
+
+def test_client_errors_do_not_shrink_the_window():
+    limiter = ProviderLimiter("test", 8)
+    assert limiter.try_acquire(1)
+    limiter.release(0.1, error=ProviderError("test", "bad request", status=400))
+    limiter.try_acquire(1)
+    limiter.release(0.1, error=ProviderError("test", "KeyError('content')"))
+    assert limiter.window == 8
+
+
+def test_successes_grow_the_window_up_to_the_maximum():
+    limiter = ProviderLimiter("test", 4)
+    limiter.window = 2.0
+    for _ in range(2):
+        limiter.try_acquire(1)
+        limiter.release(0.1)
+    assert limiter.window > 2.0
+    for _ in range(50):
+        limiter.try_acquire(1)
+        limiter.release(0.1)
+    assert limiter.window == 4
+
+
+def test_latency_spike_shrinks_the_window():
+    limiter = ProviderLimiter("test", 8)
+    for _ in range(5):
+        limiter.try_acquire(1)
+        limiter.release(0.1)
+    limiter.try_acquire(1)
+    limiter.release(0.1 * (rate_limiter.LATENCY_SPIKE_FACTOR + 1))
+    assert limiter.window == 4
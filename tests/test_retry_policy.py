@@ -0,0 +1,74 @@
+import random
+
+import pytest
+
+from exceptions.provider_error import ProviderError
+from llmservice.providers.errors import provider_error
+from llmservice.retry_policy import RetryPolicy
+
+
+@pytest.mark.parametrize(
+    "error, transient",
+    [
+        (ProviderError("t", "timed out", timed_out=True), True),
+        (ProviderError("t", "refused", connection_failed=True), True),
+        (ProviderError("t", "x", status=500), True),
+        (ProviderError("t", "x", status=503), True),
+        (ProviderError("t", "x", status=429), True),
+        (ProviderError("t", "x", status=408), True),
+        (ProviderError("t", "x", status=400), False),
+        (ProviderError("t", "x", status=401), False),
+        (ProviderError("t", "x", status=404), False),
+        (ProviderError("t", "x"), False),
+    ],
+)
+def test_retry_policy_classification(error, transient):
+    assert RetryPolicy.is_transient(error) is transient
+
+
+@pytest.mark.parametrize(
+    "exc, transient",
+    [
+        (TimeoutError(), True),
+        (ConnectionRefusedError(), True),
+        (KeyError("content"), False),
+        (AttributeError("choices"), False),
+        (TypeError("unexpected argument"), False),
+    ],
+)
+def test_retry_policy_classifies_wrapped_exceptions(exc, transient):
+    assert RetryPolicy.is_transient(provider_error("test", exc)) is transient
+
+
+def test_timeout_found_in_the_cause_chain():
+    try:
+        try:
+            raise TimeoutError()
+        except TimeoutError as cause:
+            raise RuntimeError("request failed") from cause
+    except RuntimeError as exc:
+        assert RetryPolicy.is_transient(provider_error("test", exc))
+
+
+def test_retry_policy_gives_up_on_permanent_errors():
+    policy = RetryPolicy(rng=random.Random(0))
+    assert policy.next_delay(ProviderError("t", "x", status=400), 0, 0) is None
+
+
+def test_retry_policy_stops_after_max_attempts():
+    policy = RetryPolicy(max_attempts=3, rng=random.Random(0))
+    error = ProviderError("t", "x", status=503)
+    assert policy.next_delay(error, 1, 0) is not None
+    assert policy.next_delay(error, 2, 0) is None
+
+
+def test_retry_policy_honours_retry_after_and_the_deadline():
+    policy = RetryPolicy(base_delay=0.01, deadline=100, rng=random.Random(0))
+    error = ProviderError("t", "x", status=429, retry_after=30)
+    assert policy.next_delay(error, 0, 0) == 30
+    assert policy.next_delay(error, 0, 80) is None
+
+
+def test_retry_policy_backoff_is_capped():
+    policy = RetryPolicy(base_delay=1, max_delay=5, rng=random.Random(0))
+    assert all(0 <= policy.backoff(retry) <= 5 for retry in range(20))
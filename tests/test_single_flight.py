@@ -0,0 +1,102 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from llmservice.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_call():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        release.wait(5)
+        return "response"
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        leader = executor.submit(flight.do, "key", slow)
+        while not calls:
+            pass
+        followers = [executor.submit(flight.do, "key", slow) for _ in range(3)]
+        while flight.shared < 3:
+            pass
+        release.set()
+        results = [leader.result()] + [f.result() for f in followers]
+
+    assert results == ["response"] * 4
+    assert calls == [1]
+    assert flight.shared == 3
+
+
+def test_followers_get_the_exception():
+    flight = SingleFlight()
+    release = threading.Event()
+    started = threading.Event()
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise ValueError("boom")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(flight.do, "key", failing)
+        started.wait(5)
+        follower = executor.submit(flight.do, "key", failing)
+        while flight.shared < 1:
+            pass
+        release.set()
+        for future in (leader, follower):
+            with pytest.raises(ValueError):
+                future.result()
+
+
+def test_nothing_is_kept_once_the_call_returned():
+    flight = SingleFlight()
+    assert flight.do("key", lambda: 1) == 1
+    assert flight.do("key", lambda: 2) == 2
+    assert flight.shared == 0
+
+
+def test_different_keys_do_not_share():
+    flight = SingleFlight()
+    assert flight.do("a", lambda: "a") == "a"
+    assert flight.do("b", lambda: "b") == "b"
+
+
+def test_async_calls_share_one_call():
+    flight = SingleFlight()
+    calls = []
+
+    async def slow():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "response"
+
+    async def main():
+        return await asyncio.gather(*(flight.do_async("key", slow) for _ in range(4)))
+
+    assert asyncio.run(main()) == ["response"] * 4
+    assert calls == [1]
+    assert flight.shared == 3
+    assert not flight._tasks
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_call():
+    flight = SingleFlight()
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        return "response"
+
+    async def main():
+        first = asyncio.ensure_future(flight.do_async("key", slow))
+        second = asyncio.ensure_future(flight.do_async("key", slow))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == "response"
@@ -0,0 +1,106 @@
+from java_code_extractor.java_code_extractor import StreamingTestDetector
+from llmservice.streaming import ThinkBlockFilter, read_until
+from verification.verdict_parser import VerdictDetector
+
+TEST = """Here is the test:
+```java
+@Test
+public void testPush() {
+    Stack s = new Stack();
+    if (s.isEmpty()) {
+        s.push(1);
+    }
+    assertEquals(1, s.size());
+}
+```
+"""
+
+
+def feed_all(detector, chunks):
+    """Feed chunks one by one; the index of the chunk that completed, or None."""
+    for index, chunk in enumerate(chunks):
+        if detector.feed(chunk):
+            return index
+    return None
+
+
+def split_every(text, size):
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+def test_think_filter_drops_reasoning():
+    think = ThinkBlockFilter()
+    assert think.feed("<think>draft</think>answer") == "answer"
+
+
+def test_think_filter_handles_tags_split_across_chunks():
+    text = "before<think>reasoning {}</think>after<think>more</think>end"
+    for size in range(1, 10):
+        think = ThinkBlockFilter()
+        visible = "".join(think.feed(chunk) for chunk in split_every(text, size))
+        assert visible == "beforeafterend"
+
+
+def test_think_filter_releases_text_that_only_looks_like_a_tag():
+    think = ThinkBlockFilter()
+    assert think.feed("a <thi") == "a "
+    assert think.feed("ng>") == "<thing>"
+
+
+def test_test_detector_completes_on_the_closing_brace():
+    lines = TEST.splitlines(keepends=True)
+    closing = next(i for i, line in enumerate(lines) if line == "}\n")
+    assert feed_all(StreamingTestDetector(), lines) == closing
+
+
+def test_test_detector_with_small_chunks():
+    detector = StreamingTestDetector()
+    assert feed_all(detector, split_every(TEST, 3)) is not None
+    assert detector.complete
+
+
+def test_test_detector_ignores_incomplete_tests():
+    partial = TEST[: TEST.index("assertEquals")]
+    assert feed_all(StreamingTestDetector(), split_every(partial, 5)) is None
+
+
+def test_test_detector_ignores_tests_drafted_while_thinking():
+    detector = StreamingTestDetector()
+    assert not detector.feed("<think>\n" + TEST + "</think>\nLet me write it.\n")
+    assert detector.feed(TEST)
+
+
+def test_verdict_detector_completes_on_a_valid_object():
+    response = 'Verdicts: {"x > 0": "VALID", "y != null": "INVALID"} done'
+    detector = VerdictDetector()
+    index = feed_all(detector, split_every(response, 4))
+    assert index == (response.index("}") // 4)
+
+
+def test_verdict_detector_handles_braces_in_strings():
+    detector = VerdictDetector()
+    assert detector.feed('{"a.equals(\\"}\\")": "VALID"}')
+    detector = VerdictDetector()
+    assert not detector.feed('{"a.equals(\\"}\\")": "VAL')
+    assert detector.feed('ID"}')
+
+
+def test_verdict_detector_skips_objects_that_are_not_verdicts():
+    detector = VerdictDetector()
+    assert not detector.feed('{"x": 1} and {"x > 0": "MAYBE"}')
+    assert detector.feed(' finally {"x > 0": "INVALID"}')
+
+
+def test_verdict_detector_ignores_reasoning():
+    detector = VerdictDetector()
+    assert not detector.feed('<think>maybe {"x > 0": "VALID"}</think>')
+    assert detector.feed('{"x > 0": "INVALID"}')
+
+
+def test_read_until_stops_at_the_detector_and_closes():
+    closed = []
+    chunks = TEST.splitlines(keepends=True) + ["trailing chatter\n"]
+    text = read_until(iter(chunks), StreamingTestDetector(), lambda: closed.append(1))
+    assert text.rstrip().endswith("}")
+    assert "trailing chatter" not in text
+    assert closed == [1]